@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import SesionCarga, ArchivoContenido
+
+
+@admin.register(SesionCarga)
+class SesionCargaAdmin(admin.ModelAdmin):
+    list_display = ['nombre_archivo', 'usuario', 'destino', 'objeto_id', 'tamano', 'estatus', 'fecha_creacion']
+    list_filter = ['estatus', 'destino', 'fecha_creacion']
+    search_fields = ['nombre_archivo', 'usuario__nombre', 'sha256']
+    readonly_fields = ['id', 'sha256', 'fecha_creacion', 'fecha_completada']
+
+
+@admin.register(ArchivoContenido)
+class ArchivoContenidoAdmin(admin.ModelAdmin):
+    list_display = ['ruta', 'tamano', 'referencias', 'fecha_creacion', 'fecha_ultimo_uso']
+    search_fields = ['sha256', 'ruta']
+    readonly_fields = ['sha256', 'ruta', 'tamano', 'referencias', 'fecha_creacion', 'fecha_ultimo_uso']
@@ -0,0 +1,213 @@
+"""
+Almacenamiento direccionado por contenido.
+
+Cada archivo se guarda una sola vez en MEDIA_ROOT/cas/ab/cd/<sha256><ext>; si
+el mismo comprobante se sube para varios tickets, todos apuntan al mismo blob.
+ArchivoContenido lleva el conteo de referencias, que se mantiene con señales
+(ver signals.py) al guardar o borrar registros; los blobs que se quedan sin
+referencias se purgan pasado un periodo de gracia. Los QuerySet.update() sobre
+campos de archivo no disparan señales: después de usarlos hay que correr
+`python manage.py deduplicar_media --recontar`.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+def es_ruta_contenido(nombre):
+    return bool(nombre) and nombre.startswith(f'{settings.ALMACENAMIENTO_CONTENIDO_DIRECTORIO}/')
+
+
+def ruta_para(sha256, extension):
+    directorio = settings.ALMACENAMIENTO_CONTENIDO_DIRECTORIO
+    return f'{directorio}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}'
+
+
+def hash_archivo(ruta):
+    sha = hashlib.sha256()
+    tamano = 0
+    with open(ruta, 'rb') as archivo:
+        while True:
+            bloque = archivo.read(TAMANO_BLOQUE)
+            if not bloque:
+                break
+            sha.update(bloque)
+            tamano += len(bloque)
+    return sha.hexdigest(), tamano
+
+
+class AlmacenamientoContenido(FileSystemStorage):
+    """
+    FileSystemStorage que ignora el nombre propuesto (upload_to) y guarda por
+    SHA-256. Los nombres que no están bajo cas/ (archivos anteriores) se siguen
+    leyendo y borrando normalmente.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre final lo decide _save; evita los exists() de la versión base
+        return name
+
+    def _save(self, name, content):
+        from .models import ArchivoContenido
+
+        extension = os.path.splitext(name)[1].lower()[:10]
+        temporal = None
+        if hasattr(content, 'temporary_file_path'):
+            # Ya está en disco (TemporaryUploadedFile, carga en partes)
+            origen = content.temporary_file_path()
+            sha256 = getattr(content, 'sha256', None)
+            if sha256:
+                tamano = os.path.getsize(origen)
+            else:
+                sha256, tamano = hash_archivo(origen)
+        else:
+            sha256, tamano, temporal = self._escribir_temporal(content)
+            origen = temporal
+
+        try:
+            # Con la fila bloqueada la purga no puede borrar el blob entre que
+            # se comprueba el archivo y se registra el uso (ver purgar_sin_referencias)
+            with transaction.atomic():
+                blob = ArchivoContenido.objects.select_for_update().filter(sha256=sha256).first()
+                if blob is None:
+                    blob, _ = ArchivoContenido.objects.get_or_create(
+                        sha256=sha256,
+                        defaults={'ruta': ruta_para(sha256, extension), 'tamano': tamano}
+                    )
+                else:
+                    # Aleja el blob de la purga mientras el registro que lo usará se guarda
+                    ArchivoContenido.objects.filter(pk=blob.pk).update(fecha_ultimo_uso=timezone.now())
+                destino = self.path(blob.ruta)
+                if not os.path.exists(destino):
+                    os.makedirs(os.path.dirname(destino), exist_ok=True)
+                    file_move_safe(origen, destino, allow_overwrite=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(destino, self.file_permissions_mode)
+        finally:
+            if temporal and os.path.exists(temporal):
+                os.remove(temporal)
+        return blob.ruta
+
+    def _escribir_temporal(self, content):
+        """Escribe el contenido a un temporal junto a MEDIA_ROOT calculando el hash"""
+        directorio = self.path(f'{settings.ALMACENAMIENTO_CONTENIDO_DIRECTORIO}/tmp')
+        os.makedirs(directorio, exist_ok=True)
+        sha = hashlib.sha256()
+        tamano = 0
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        descriptor, temporal = tempfile.mkstemp(dir=directorio)
+        with os.fdopen(descriptor, 'wb') as salida:
+            for bloque in content.chunks():
+                if isinstance(bloque, str):
+                    bloque = bloque.encode()
+                sha.update(bloque)
+                salida.write(bloque)
+                tamano += len(bloque)
+        return sha.hexdigest(), tamano, temporal
+
+    def delete(self, name):
+        # Un blob puede estar compartido: se libera vía referencias (signals.py)
+        # cuando el campo se guarda vacío o el registro se borra.
+        if not es_ruta_contenido(name):
+            super().delete(name)
+
+
+def almacenamiento_contenido():
+    """Callable para `storage=` de los FileField (mantiene estables las migraciones)"""
+    return _almacenamiento
+
+
+_almacenamiento = AlmacenamientoContenido()
+
+
+# ============ REFERENCIAS ============
+
+def referenciar(ruta):
+    from .models import ArchivoContenido
+    ArchivoContenido.objects.filter(ruta=ruta).update(
+        referencias=F('referencias') + 1, fecha_ultimo_uso=timezone.now()
+    )
+
+
+def liberar(ruta):
+    from .models import ArchivoContenido
+    ArchivoContenido.objects.filter(ruta=ruta, referencias__gt=0).update(
+        referencias=F('referencias') - 1, fecha_ultimo_uso=timezone.now()
+    )
+
+
+def purgar_sin_referencias(antiguedad, ejecutar=True, tamano_lote=1000):
+    """
+    Borra los blobs sin referencias cuyo último uso es anterior a `antiguedad`
+    (timedelta). Devuelve (cantidad, bytes).
+    """
+    from .models import ArchivoContenido
+
+    limite = timezone.now() - antiguedad
+    candidatos = ArchivoContenido.objects.filter(referencias=0, fecha_ultimo_uso__lt=limite)
+    total = liberados = 0
+    for blob in candidatos.only('id', 'ruta', 'tamano').iterator(chunk_size=tamano_lote):
+        total += 1
+        liberados += blob.tamano
+        if ejecutar:
+            # Se vuelve a filtrar por si alguien lo tomó mientras tanto, con la
+            # fila bloqueada hasta borrar también el archivo: un _save del
+            # mismo contenido espera y después crea el blob de nuevo.
+            with transaction.atomic():
+                vigente = ArchivoContenido.objects.select_for_update().filter(
+                    pk=blob.pk, referencias=0, fecha_ultimo_uso__lt=limite
+                ).values_list('pk', flat=True).first()
+                if vigente is not None:
+                    ArchivoContenido.objects.filter(pk=vigente).delete()
+                    FileSystemStorage.delete(_almacenamiento, blob.ruta)
+    return total, liberados
+
+
+def campos_contenido():
+    """(modelo, nombre_campo) de todos los FileField que usan este almacenamiento"""
+    from django.apps import apps
+    from django.db.models import FileField
+
+    for modelo in apps.get_models():
+        for campo in modelo._meta.concrete_fields:
+            if isinstance(campo, FileField) and isinstance(campo.storage, AlmacenamientoContenido):
+                yield modelo, campo.name
+
+
+def recontar_referencias(tamano_lote=1000):
+    """Recalcula `referencias` a partir de lo que realmente hay en la base"""
+    from .models import ArchivoContenido
+
+    conteos = {}
+    for modelo, campo in campos_contenido():
+        filas = (
+            modelo._base_manager
+            .filter(**{f'{campo}__startswith': f'{settings.ALMACENAMIENTO_CONTENIDO_DIRECTORIO}/'})
+            .values(campo).annotate(n=Count('pk')).order_by()
+        )
+        for fila in filas.iterator(chunk_size=tamano_lote):
+            conteos[fila[campo]] = conteos.get(fila[campo], 0) + fila['n']
+
+    cambiados = []
+    for blob in ArchivoContenido.objects.only('id', 'ruta', 'referencias').iterator(chunk_size=tamano_lote):
+        referencias = conteos.get(blob.ruta, 0)
+        if blob.referencias != referencias:
+            blob.referencias = referencias
+            cambiados.append(blob)
+        if len(cambiados) >= tamano_lote:
+            ArchivoContenido.objects.bulk_update(cambiados, ['referencias'])
+            cambiados = []
+    if cambiados:
+        ArchivoContenido.objects.bulk_update(cambiados, ['referencias'])
+    return ArchivoContenido.objects.filter(referencias=0).count()
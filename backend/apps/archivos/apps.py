@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class ArchivosConfig(AppConfig):
+    """Cargas en partes y almacenamiento de archivos por contenido"""
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.archivos'
+    verbose_name = 'Archivos'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()
@@ -0,0 +1,218 @@
+"""
+Cargas de archivos en partes.
+
+Cada parte se escribe en disco por bloques conforme llega (nunca se lee el
+cuerpo completo en memoria) y se calcula su SHA-256 de forma incremental. Al
+finalizar, las partes se concatenan en un solo archivo calculando el SHA-256
+total en la misma pasada, y el archivo se asigna al FileField destino
+moviéndolo (sin copiarlo) cuando el storage es local.
+"""
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SesionCarga
+
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+class ErrorCarga(Exception):
+    """Error de validación de una carga (se responde como 400)"""
+
+
+# destino -> (modelo, campo de archivo, campo de puerto para filtrar_por_puerto)
+DESTINOS = {
+    SesionCarga.Destino.TICKET: ('operaciones.Ticket', 'comprobante_pago', 'puerto'),
+    SesionCarga.Destino.GARANTIA: ('operaciones.Garantia', 'comprobante', 'contenedor__puerto'),
+    SesionCarga.Destino.PAGO_LOGISTICA: (
+        'pagos.PagoLogistica', 'comprobante', 'operacion__contenedor__puerto'
+    ),
+    SesionCarga.Destino.DOCUMENTO: ('operaciones.Documento', 'archivo', 'contenedor__puerto'),
+}
+
+
+class _ArchivoEnsamblado(File):
+    """
+    Archivo ya escrito en disco. FileSystemStorage detecta temporary_file_path()
+    y lo mueve a MEDIA_ROOT en lugar de copiarlo.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def directorio_sesion(sesion):
+    return Path(settings.CARGAS_DIRECTORIO) / str(sesion.id)
+
+
+def ruta_parte(sesion, indice):
+    return directorio_sesion(sesion) / f'{indice:06d}.parte'
+
+
+def partes_recibidas(sesion):
+    """Índices de las partes completas en disco (fuente de verdad para reanudar)"""
+    directorio = directorio_sesion(sesion)
+    if not directorio.exists():
+        return []
+    return sorted(
+        int(nombre.split('.')[0])
+        for nombre in os.listdir(directorio)
+        if nombre.endswith('.parte')
+    )
+
+
+def modelo_destino(destino):
+    etiqueta, campo, campo_puerto = DESTINOS[destino]
+    return apps.get_model(etiqueta), campo, campo_puerto
+
+
+def validar_destino(usuario, destino, objeto_id):
+    """Verifica que el registro destino exista y sea visible para el usuario"""
+    if destino == SesionCarga.Destino.PAGO_LOGISTICA and not usuario.puede_registrar_pagos:
+        raise ErrorCarga('No tienes permiso para registrar pagos')
+
+    modelo, _, campo_puerto = modelo_destino(destino)
+    queryset = usuario.filtrar_por_puerto(modelo.objects.filter(pk=objeto_id), campo_puerto=campo_puerto)
+    if not queryset.exists():
+        raise ErrorCarga('El registro destino no existe o no tienes acceso a él')
+
+
+def guardar_parte(sesion, indice, stream, sha256_esperado=None):
+    """
+    Escribe la parte `indice` leyendo `stream` por bloques.
+    Se escribe a un archivo temporal y se renombra al terminar, de modo que una
+    parte interrumpida nunca cuenta como recibida. Devuelve (tamaño, sha256).
+    """
+    if sesion.estatus != SesionCarga.Estatus.ABIERTA:
+        raise ErrorCarga('La sesión de carga ya no está abierta')
+    if not 0 <= indice < sesion.total_partes:
+        raise ErrorCarga(f'Índice de parte inválido (0 a {sesion.total_partes - 1})')
+
+    esperado = sesion.tamano_de_parte(indice)
+    destino = ruta_parte(sesion, indice)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporal = destino.with_suffix(f'.{os.getpid()}.tmp')
+
+    sha = hashlib.sha256()
+    recibido = 0
+    try:
+        with open(temporal, 'wb') as salida:
+            while True:
+                bloque = stream.read(min(TAMANO_BLOQUE, esperado - recibido + 1))
+                if not bloque:
+                    break
+                recibido += len(bloque)
+                if recibido > esperado:
+                    raise ErrorCarga(f'La parte {indice} excede {esperado} bytes')
+                sha.update(bloque)
+                salida.write(bloque)
+
+        if recibido != esperado:
+            raise ErrorCarga(f'La parte {indice} debe medir {esperado} bytes (se recibieron {recibido})')
+        digest = sha.hexdigest()
+        if sha256_esperado and sha256_esperado.lower() != digest:
+            raise ErrorCarga(f'SHA-256 de la parte {indice} no coincide')
+        os.replace(temporal, destino)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+    return recibido, digest
+
+
+def _ensamblar(sesion):
+    """Concatena las partes en un solo archivo y calcula su SHA-256 en la misma pasada"""
+    faltantes = sorted(set(range(sesion.total_partes)) - set(partes_recibidas(sesion)))
+    if faltantes:
+        raise ErrorCarga(f'Faltan partes: {faltantes[:20]}')
+
+    directorio = directorio_sesion(sesion)
+    ruta_final = directorio / 'archivo'
+    sha = hashlib.sha256()
+    with open(ruta_final, 'wb') as salida:
+        for indice in range(sesion.total_partes):
+            with open(ruta_parte(sesion, indice), 'rb') as parte:
+                while True:
+                    bloque = parte.read(TAMANO_BLOQUE)
+                    if not bloque:
+                        break
+                    sha.update(bloque)
+                    salida.write(bloque)
+
+    digest = sha.hexdigest()
+    if sesion.sha256_esperado and sesion.sha256_esperado.lower() != digest:
+        os.remove(ruta_final)
+        raise ErrorCarga('El SHA-256 del archivo no coincide con el esperado')
+    return ruta_final, digest
+
+
+def finalizar(sesion, usuario):
+    """
+    Ensambla el archivo y lo asigna al campo destino.
+    Devuelve (registro, nombre del archivo anterior, si esta llamada lo asignó).
+
+    La sesión se bloquea (FOR UPDATE) durante todo el proceso: si dos
+    peticiones finalizan a la vez (p. ej. un reintento del cliente), la
+    segunda espera y devuelve el registro que ya asignó la primera.
+    """
+    modelo, campo, _ = modelo_destino(sesion.destino)
+
+    with transaction.atomic():
+        SesionCarga.objects.select_for_update().get(pk=sesion.pk)
+        sesion.refresh_from_db()
+        if sesion.estatus == SesionCarga.Estatus.COMPLETADA:
+            return modelo.objects.get(pk=sesion.objeto_id), '', False
+        if sesion.estatus != SesionCarga.Estatus.ABIERTA:
+            raise ErrorCarga('La sesión de carga ya no está abierta')
+
+        ruta_final, digest = _ensamblar(sesion)
+
+        if sesion.objeto_id:
+            instancia = modelo.objects.select_for_update().get(pk=sesion.objeto_id)
+            anterior = getattr(instancia, campo)
+            anterior_nombre = anterior.name if anterior else ''
+        else:
+            # Documento nuevo: el archivo es obligatorio, se crea junto con él
+            instancia = modelo(
+                contenedor_id=sesion.metadatos.get('contenedor'),
+                tipo=sesion.metadatos.get('tipo'),
+                descripcion=sesion.metadatos.get('descripcion', ''),
+                nombre_archivo=sesion.nombre_archivo,
+                subido_por=usuario,
+            )
+            anterior_nombre = ''
+
+        with open(ruta_final, 'rb') as archivo:
+            ensamblado = _ArchivoEnsamblado(archivo)
+            ensamblado.sha256 = digest  # El almacenamiento por contenido no vuelve a calcularlo
+            getattr(instancia, campo).save(sesion.nombre_archivo, ensamblado, save=False)
+        if instancia.pk:
+            instancia.save(update_fields=[campo])
+        else:
+            instancia.save()
+
+        sesion.estatus = SesionCarga.Estatus.COMPLETADA
+        sesion.sha256 = digest
+        sesion.objeto_id = instancia.pk
+        sesion.fecha_completada = timezone.now()
+        sesion.save(update_fields=['estatus', 'sha256', 'objeto_id', 'fecha_completada'])
+
+    limpiar(sesion)
+    return instancia, anterior_nombre, True
+
+
+def cancelar(sesion):
+    sesion.estatus = SesionCarga.Estatus.CANCELADA
+    sesion.save(update_fields=['estatus'])
+    limpiar(sesion)
+
+
+def limpiar(sesion):
+    shutil.rmtree(directorio_sesion(sesion), ignore_errors=True)
@@ -0,0 +1,160 @@
+"""
+Descarga protegida de comprobantes y documentos.
+
+Después de validar el acceso por puerto, la transferencia se delega al
+servidor web de enfrente (settings.MEDIA_ENVIO):
+- 'x-accel'    nginx:  X-Accel-Redirect a settings.MEDIA_INTERNA_URL (location internal)
+- 'x-sendfile' Apache/lighttpd: X-Sendfile con la ruta absoluta
+- ''           sin servidor de enfrente: FileResponse (sendfile vía wsgi.file_wrapper)
+               con soporte de Range para reanudar descargas o ver PDFs por páginas.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.apps import apps
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+
+TAMANO_BLOQUE = 64 * 1024
+RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# tipo -> (modelo, campo de archivo, rutas de atributos hasta el puerto en orden de preferencia)
+ARCHIVOS_PROTEGIDOS = {
+    'ticket.comprobante_pago': ('operaciones.Ticket', 'comprobante_pago', ('puerto_id',)),
+    'garantia.comprobante': ('operaciones.Garantia', 'comprobante', ('contenedor.puerto_id',)),
+    'documento.archivo': (
+        'operaciones.Documento', 'archivo',
+        ('contenedor.puerto_id', 'clasificacion.contenedor.puerto_id')
+    ),
+    'pago.comprobante': (
+        'pagos.Pago', 'comprobante',
+        # Pago genérico: la operación puede ser logística, revalidación o ticket
+        ('operacion.contenedor.puerto_id', 'operacion.puerto_id')
+    ),
+    'pago_logistica.comprobante': ('pagos.PagoLogistica', 'comprobante', ('operacion.contenedor.puerto_id',)),
+    'pago_revalidacion.comprobante': (
+        'pagos.PagoRevalidacion', 'comprobante', ('operacion.contenedor.puerto_id',)
+    ),
+}
+_TIPO_POR_CAMPO = {(etiqueta, campo): tipo for tipo, (etiqueta, campo, _) in ARCHIVOS_PROTEGIDOS.items()}
+
+
+def tipo_protegido(archivo):
+    """Tipo de ARCHIVOS_PROTEGIDOS de un FieldFile, o None si su campo no se descarga protegido"""
+    return _TIPO_POR_CAMPO.get((archivo.instance._meta.label, archivo.field.name))
+
+
+def _resolver(instancia, ruta):
+    valor = instancia
+    for atributo in ruta.split('.'):
+        valor = getattr(valor, atributo, None)
+        if valor is None:
+            return None
+    return valor
+
+
+def obtener_archivo(usuario, tipo, objeto_id):
+    """
+    FieldFile de un registro si el usuario puede verlo por su puerto.
+    Devuelve None si no existe, no tiene archivo o el usuario no tiene acceso.
+    """
+    etiqueta, campo, rutas_puerto = ARCHIVOS_PROTEGIDOS[tipo]
+    instancia = apps.get_model(etiqueta)._default_manager.filter(pk=objeto_id).first()
+    if instancia is None:
+        return None
+    archivo = getattr(instancia, campo)
+    if not archivo:
+        return None
+
+    puerto_id = next(
+        (p for p in (_resolver(instancia, ruta) for ruta in rutas_puerto) if p is not None),
+        None
+    )
+    if not usuario.puede_ver_operacion_por_puerto(puerto_id):
+        return None
+    return archivo
+
+
+class _Segmento:
+    """Lector limitado a `longitud` bytes desde la posición actual del archivo"""
+
+    def __init__(self, archivo, longitud):
+        self.archivo = archivo
+        self.restante = longitud
+
+    def read(self, tamano=-1):
+        if self.restante <= 0:
+            return b''
+        if tamano < 0 or tamano > self.restante:
+            tamano = self.restante
+        datos = self.archivo.read(tamano)
+        self.restante -= len(datos)
+        return datos
+
+    def close(self):
+        self.archivo.close()
+
+
+def _rango(encabezado, tamano):
+    """(inicio, fin) inclusivos del header Range; None si no aplica; False si es insatisfacible"""
+    coincidencia = RANGO.match(encabezado or '')
+    if not coincidencia:
+        # Sin Range, o con varios rangos: se responde el archivo completo
+        return None
+    inicio, fin = coincidencia.groups()
+    if not inicio and not fin:
+        return None
+    if not inicio:
+        # Sufijo: los últimos N bytes
+        longitud = int(fin)
+        if longitud == 0:
+            return False
+        return max(0, tamano - longitud), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or inicio > fin:
+        return False
+    return inicio, fin
+
+
+def respuesta_archivo(request, archivo, nombre_descarga=None, adjunto=False):
+    """Respuesta para servir un FieldFile local según settings.MEDIA_ENVIO"""
+    nombre_descarga = nombre_descarga or os.path.basename(archivo.name)
+    tipo_contenido = mimetypes.guess_type(nombre_descarga)[0] or 'application/octet-stream'
+    disposicion = 'attachment' if adjunto else 'inline'
+    disposicion = f"{disposicion}; filename*=UTF-8''{quote(nombre_descarga)}"
+
+    envio = getattr(settings, 'MEDIA_ENVIO', '')
+    if envio in ('x-accel', 'x-sendfile'):
+        response = HttpResponse(content_type=tipo_contenido)
+        if envio == 'x-accel':
+            response['X-Accel-Redirect'] = settings.MEDIA_INTERNA_URL + quote(archivo.name)
+        else:
+            response['X-Sendfile'] = archivo.path
+        response['Content-Disposition'] = disposicion
+        return response
+
+    tamano = archivo.size
+    rango = _rango(request.headers.get('Range'), tamano)
+    if rango is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{tamano}'
+        return response
+
+    descriptor = archivo.storage.open(archivo.name, 'rb')
+    if rango is None:
+        response = FileResponse(descriptor, content_type=tipo_contenido)
+        response['Content-Length'] = tamano
+    else:
+        inicio, fin = rango
+        descriptor.seek(inicio)
+        response = FileResponse(_Segmento(descriptor, fin - inicio + 1), content_type=tipo_contenido, status=206)
+        response['Content-Range'] = f'bytes {inicio}-{fin}/{tamano}'
+        response['Content-Length'] = fin - inicio + 1
+    response.block_size = TAMANO_BLOQUE
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposicion
+    return response
@@ -0,0 +1,123 @@
+import os
+import shutil
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.archivos.almacenamiento import (
+    _almacenamiento, campos_contenido, hash_archivo, ruta_para,
+    recontar_referencias, purgar_sin_referencias
+)
+from apps.archivos.models import ArchivoContenido
+
+
+class Command(BaseCommand):
+    help = (
+        'Migra los archivos existentes (operaciones y pagos) al almacenamiento por '
+        'contenido: cada archivo se enlaza en su lugar en cas/ y las copias idénticas '
+        'se eliminan, dejando a todos los registros apuntando al mismo blob.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo reportar, no mover ni borrar')
+        parser.add_argument('--lote', type=int, default=1000, help='Registros por consulta')
+        parser.add_argument(
+            '--recontar', action='store_true',
+            help='Solo recalcular las referencias (después de QuerySet.update() masivos)'
+        )
+        parser.add_argument(
+            '--purgar', action='store_true',
+            help='Además borrar los blobs sin referencias más viejos que el periodo de gracia'
+        )
+
+    def handle(self, *args, **options):
+        if options['recontar']:
+            sin_referencias = recontar_referencias(options['lote'])
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Referencias recalculadas ({sin_referencias} blobs sin referencias)'
+            ))
+            return
+
+        ejecutar = not options['dry_run']
+        # ruta anterior -> ruta en cas/ (un mismo archivo puede estar en varios registros)
+        migrados = {}
+        self.por_hash = {}
+        # Los originales se borran al final, cuando ningún registro apunta a ellos
+        por_borrar = []
+        archivos = duplicados = faltantes = bytes_ahorrados = 0
+
+        for modelo, campo in campos_contenido():
+            pendientes = (
+                modelo._base_manager
+                .exclude(**{f'{campo}__isnull': True})
+                .exclude(**{campo: ''})
+                .exclude(**{f'{campo}__startswith': f'{settings.ALMACENAMIENTO_CONTENIDO_DIRECTORIO}/'})
+                .values_list('pk', campo)
+                .order_by('pk')
+            )
+            for pk, nombre in pendientes.iterator(chunk_size=options['lote']):
+                nueva = migrados.get(nombre)
+                if nueva is None:
+                    ruta = _almacenamiento.path(nombre)
+                    if not os.path.exists(ruta):
+                        faltantes += 1
+                        self.stderr.write(f'  Falta en disco: {nombre} ({modelo.__name__} {pk})')
+                        continue
+                    nueva, duplicado, tamano = self._migrar_archivo(nombre, ruta, ejecutar)
+                    migrados[nombre] = nueva
+                    por_borrar.append(ruta)
+                    archivos += 1
+                    if duplicado:
+                        duplicados += 1
+                        bytes_ahorrados += tamano
+                if ejecutar:
+                    modelo._base_manager.filter(pk=pk).update(**{campo: nueva})
+
+        self.stdout.write(
+            f'{archivos} archivos procesados, {duplicados} duplicados '
+            f'({bytes_ahorrados / 1024 / 1024:,.1f} MB), {faltantes} faltantes'
+        )
+        if not ejecutar:
+            self.stdout.write(self.style.WARNING('Dry-run: no se modificó nada'))
+            return
+
+        for ruta in por_borrar:
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+        # Los update() no disparan señales: recontar desde la base
+        recontar_referencias(options['lote'])
+        if options['purgar']:
+            gracia = timedelta(hours=settings.ALMACENAMIENTO_CONTENIDO_GRACIA_HORAS)
+            total, liberados = purgar_sin_referencias(gracia, tamano_lote=options['lote'])
+            self.stdout.write(f'{total} blobs sin referencias purgados ({liberados / 1024 / 1024:,.1f} MB)')
+        self.stdout.write(self.style.SUCCESS('✓ Deduplicación completada'))
+
+    def _migrar_archivo(self, nombre, ruta, ejecutar):
+        """
+        Registra el blob de un archivo. El original se enlaza (hard link, sin
+        copiar datos) a su ruta en cas/ y se borra al final del comando.
+        Devuelve (ruta cas, duplicado, tamaño).
+        """
+        sha256, tamano = hash_archivo(ruta)
+        existente = self.por_hash.get(sha256) or (
+            ArchivoContenido.objects.filter(sha256=sha256).values_list('ruta', flat=True).first()
+        )
+        if existente:
+            self.por_hash[sha256] = existente
+            return existente, True, tamano
+
+        nueva = ruta_para(sha256, os.path.splitext(nombre)[1].lower()[:10])
+        self.por_hash[sha256] = nueva
+        if ejecutar:
+            destino = _almacenamiento.path(nueva)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            if not os.path.exists(destino):
+                try:
+                    os.link(ruta, destino)
+                except OSError:
+                    # Sistema de archivos sin hard links
+                    shutil.copyfile(ruta, destino)
+            ArchivoContenido.objects.create(sha256=sha256, ruta=nueva, tamano=tamano)
+        return nueva, False, tamano
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from PIL import UnidentifiedImageError
+
+from apps.archivos.almacenamiento import campos_contenido
+from apps.archivos.previews import generar, es_imagen
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera las miniaturas y vistas previas faltantes de las imágenes subidas '
+        '(comprobantes y documentos). Las nuevas cargas se procesan solas en segundo plano.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true', help='Regenerar aunque ya existan')
+        parser.add_argument('--lote', type=int, default=1000, help='Registros por consulta')
+
+    def handle(self, *args, **options):
+        vistos = set()
+        generadas = errores = 0
+        for modelo, campo in campos_contenido():
+            storage = modelo._meta.get_field(campo).storage
+            nombres = (
+                modelo._base_manager
+                .exclude(**{f'{campo}__isnull': True})
+                .exclude(**{campo: ''})
+                .values_list(campo, flat=True)
+                .distinct()
+                .order_by()
+            )
+            for nombre in nombres.iterator(chunk_size=options['lote']):
+                if nombre in vistos or not es_imagen(nombre):
+                    continue
+                vistos.add(nombre)
+                try:
+                    generadas += generar(nombre, storage, forzar=options['forzar'])
+                except (OSError, UnidentifiedImageError) as e:
+                    errores += 1
+                    self.stderr.write(f'  {nombre}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {len(vistos)} imágenes revisadas, {generadas} previews generadas, {errores} errores'
+        ))
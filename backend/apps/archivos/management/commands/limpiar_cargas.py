@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.archivos.cargas import cancelar
+from apps.archivos.models import SesionCarga
+
+
+class Command(BaseCommand):
+    help = (
+        'Cancela las cargas en partes abandonadas y borra sus partes del disco. '
+        'Pensado para ejecutarse diario (cron), p. ej.: '
+        '30 3 * * * python manage.py limpiar_cargas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horas',
+            type=int,
+            default=settings.CARGA_EXPIRACION_HORAS,
+            help='Antigüedad mínima de la sesión (default settings.CARGA_EXPIRACION_HORAS)'
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(hours=options['horas'])
+        sesiones = SesionCarga.objects.filter(
+            estatus=SesionCarga.Estatus.ABIERTA,
+            fecha_creacion__lt=limite
+        )
+        total = 0
+        for sesion in sesiones.iterator():
+            cancelar(sesion)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} cargas abandonadas canceladas'))
@@ -0,0 +1,153 @@
+import glob
+import os
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import FileField
+
+from apps.archivos.almacenamiento import purgar_sin_referencias
+from apps.archivos.models import ArchivoContenido
+from apps.archivos.previews import TIPOS as TIPOS_PREVIEW
+
+
+PREFIJO_CAS = f'{settings.ALMACENAMIENTO_CONTENIDO_DIRECTORIO}/'
+PREFIJO_PREVIEWS = 'previews/'
+# Directorios que administra otro mecanismo (caché de PDFs: se reemplaza sola)
+EXCLUIDOS = ('pdf_cache/',)
+
+
+def _recorrer(raiz):
+    """Genera (ruta relativa, mtime) de todos los archivos bajo `raiz` sin listarlos completos"""
+    pendientes = [raiz]
+    while pendientes:
+        directorio = pendientes.pop()
+        try:
+            with os.scandir(directorio) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir(follow_symlinks=False):
+                        pendientes.append(entrada.path)
+                    elif entrada.is_file(follow_symlinks=False):
+                        relativa = os.path.relpath(entrada.path, raiz).replace(os.sep, '/')
+                        yield relativa, entrada.stat(follow_symlinks=False).st_mtime
+        except FileNotFoundError:
+            continue
+
+
+def _campos_archivo():
+    """(modelo, campo) de todos los FileField que guardan en MEDIA_ROOT"""
+    raiz = os.path.abspath(settings.MEDIA_ROOT)
+    for modelo in apps.get_models():
+        for campo in modelo._meta.concrete_fields:
+            if isinstance(campo, FileField) and os.path.abspath(campo.storage.location) == raiz:
+                yield modelo, campo.name
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra los archivos de MEDIA_ROOT que ya no referencia ningún registro '
+        '(comprobantes reemplazados, documentos eliminados, previews huérfanas) y '
+        'los blobs del almacenamiento por contenido sin referencias. '
+        'Recorre el disco y consulta la base por lotes, sin cargar todo en memoria. '
+        'Ej. cron semanal: 0 4 * * 0 python manage.py limpiar_media'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo reportar, no borrar')
+        parser.add_argument(
+            '--dias', type=int, default=7,
+            help='Periodo de gracia: solo archivos sin modificar en N días (default 7)'
+        )
+        parser.add_argument('--lote', type=int, default=2000, help='Archivos por consulta a la base')
+        parser.add_argument('--listar', action='store_true', help='Listar cada archivo huérfano')
+
+    def handle(self, *args, **options):
+        self.ejecutar = not options['dry_run']
+        self.listar = options['listar']
+        self.campos = list(_campos_archivo())
+        self.raiz = str(settings.MEDIA_ROOT)
+        limite = time.time() - timedelta(days=options['dias']).total_seconds()
+
+        # Primero los blobs con 0 referencias (reemplazos y borrados vía señales),
+        # así sus previews ya salen como huérfanas en el recorrido
+        gracia = timedelta(days=options['dias'])
+        blobs, tamano_blobs = purgar_sin_referencias(gracia, ejecutar=self.ejecutar, tamano_lote=options['lote'])
+        self.stdout.write(
+            f'{blobs} blobs sin referencias ({tamano_blobs / 1024 / 1024:,.1f} MB)'
+        )
+
+        revisados = huerfanos = liberados = 0
+        lote = []
+        for relativa, mtime in _recorrer(self.raiz):
+            if relativa.startswith(EXCLUIDOS):
+                continue
+            revisados += 1
+            if mtime >= limite:
+                continue  # Reciente: puede pertenecer a una carga en curso
+            lote.append(relativa)
+            if len(lote) >= options['lote']:
+                cantidad, tamano = self._procesar(lote)
+                huerfanos += cantidad
+                liberados += tamano
+                lote = []
+        if lote:
+            cantidad, tamano = self._procesar(lote)
+            huerfanos += cantidad
+            liberados += tamano
+
+        self.stdout.write(
+            f'{revisados} archivos revisados, {huerfanos} huérfanos '
+            f'({liberados / 1024 / 1024:,.1f} MB)'
+        )
+
+        if self.ejecutar:
+            self.stdout.write(self.style.SUCCESS('✓ Limpieza completada'))
+        else:
+            self.stdout.write(self.style.WARNING('Dry-run: no se borró nada'))
+
+    def _referenciados(self, lote):
+        """Subconjunto de `lote` que sigue en uso"""
+        referenciados = set()
+        cas = [r for r in lote if r.startswith(PREFIJO_CAS)]
+        previews = [r for r in lote if r.startswith(PREFIJO_PREVIEWS)]
+        otros = [r for r in lote if not r.startswith((PREFIJO_CAS, PREFIJO_PREVIEWS))]
+
+        if cas:
+            # Los blobs los controla ArchivoContenido (los de 0 referencias se purgan aparte)
+            referenciados.update(
+                ArchivoContenido.objects.filter(ruta__in=cas).values_list('ruta', flat=True)
+            )
+        if otros:
+            for modelo, campo in self.campos:
+                referenciados.update(
+                    modelo._base_manager.filter(**{f'{campo}__in': otros}).values_list(campo, flat=True)
+                )
+        for preview in previews:
+            # previews/<original sin extensión>_<tipo>.jpg: vive mientras exista el original
+            sufijo = next((f'_{tipo}.jpg' for tipo in TIPOS_PREVIEW if preview.endswith(f'_{tipo}.jpg')), None)
+            if sufijo is None:
+                continue
+            original = preview[len(PREFIJO_PREVIEWS):-len(sufijo)]
+            if glob.glob(glob.escape(os.path.join(self.raiz, original)) + '.*'):
+                referenciados.add(preview)
+        return referenciados
+
+    def _procesar(self, lote):
+        referenciados = self._referenciados(lote)
+        cantidad = tamano = 0
+        for relativa in lote:
+            if relativa in referenciados:
+                continue
+            ruta = os.path.join(self.raiz, relativa)
+            try:
+                tamano += os.path.getsize(ruta)
+                if self.ejecutar:
+                    os.remove(ruta)
+            except FileNotFoundError:
+                continue
+            cantidad += 1
+            if self.listar:
+                self.stdout.write(f'  {relativa}')
+        return cantidad, tamano
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SesionCarga',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('destino', models.CharField(choices=[('ticket.comprobante_pago', 'Comprobante de pago de ticket'), ('garantia.comprobante', 'Comprobante de garantía'), ('pago_logistica.comprobante', 'Comprobante de pago de logística'), ('documento.archivo', 'Documento')], max_length=30, verbose_name='Destino')),
+                ('objeto_id', models.PositiveIntegerField(blank=True, help_text='Vacío solo para documentos nuevos (ver metadatos)', null=True, verbose_name='ID del registro destino')),
+                ('metadatos', models.JSONField(blank=True, default=dict, help_text='Datos para crear el documento: contenedor, tipo, descripcion', verbose_name='Metadatos')),
+                ('nombre_archivo', models.CharField(max_length=255, verbose_name='Nombre del archivo')),
+                ('tipo_contenido', models.CharField(blank=True, max_length=100, verbose_name='Tipo de contenido')),
+                ('tamano', models.PositiveBigIntegerField(verbose_name='Tamaño total (bytes)')),
+                ('tamano_parte', models.PositiveIntegerField(verbose_name='Tamaño de parte (bytes)')),
+                ('sha256_esperado', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 esperado')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256')),
+                ('estatus', models.CharField(choices=[('abierta', 'Abierta'), ('completada', 'Completada'), ('cancelada', 'Cancelada')], default='abierta', max_length=20, verbose_name='Estatus')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('fecha_completada', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de completado')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sesiones_carga', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Sesión de carga',
+                'verbose_name_plural': 'Sesiones de carga',
+                'db_table': 'sesiones_carga',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archivos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivoContenido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('ruta', models.CharField(max_length=255, unique=True, verbose_name='Ruta')),
+                ('tamano', models.PositiveBigIntegerField(verbose_name='Tamaño (bytes)')),
+                ('referencias', models.PositiveIntegerField(default=0, verbose_name='Referencias')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('fecha_ultimo_uso', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Último uso')),
+            ],
+            options={
+                'verbose_name': 'Archivo por contenido',
+                'verbose_name_plural': 'Archivos por contenido',
+                'db_table': 'archivos_contenido',
+            },
+        ),
+    ]
@@ -0,0 +1,111 @@
+import uuid
+
+from django.db import models
+from django.conf import settings
+
+
+class SesionCarga(models.Model):
+    """
+    Carga de un archivo en partes (reanudable).
+
+    El cliente crea la sesión indicando el destino (campo de archivo de un
+    registro existente), sube las partes con PUT en cualquier orden y al
+    finalizar el archivo se ensambla y se asigna al campo destino.
+    Las partes viven en disco (settings.CARGAS_DIRECTORIO), no en la base.
+    """
+
+    class Destino(models.TextChoices):
+        TICKET = 'ticket.comprobante_pago', 'Comprobante de pago de ticket'
+        GARANTIA = 'garantia.comprobante', 'Comprobante de garantía'
+        PAGO_LOGISTICA = 'pago_logistica.comprobante', 'Comprobante de pago de logística'
+        DOCUMENTO = 'documento.archivo', 'Documento'
+
+    class Estatus(models.TextChoices):
+        ABIERTA = 'abierta', 'Abierta'
+        COMPLETADA = 'completada', 'Completada'
+        CANCELADA = 'cancelada', 'Cancelada'
+
+    # UUID para que la URL de la sesión no sea adivinable
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sesiones_carga',
+        verbose_name='Usuario'
+    )
+
+    # Destino del archivo
+    destino = models.CharField('Destino', max_length=30, choices=Destino.choices)
+    objeto_id = models.PositiveIntegerField(
+        'ID del registro destino',
+        null=True,
+        blank=True,
+        help_text='Vacío solo para documentos nuevos (ver metadatos)'
+    )
+    metadatos = models.JSONField(
+        'Metadatos',
+        default=dict,
+        blank=True,
+        help_text='Datos para crear el documento: contenedor, tipo, descripcion'
+    )
+
+    # Archivo
+    nombre_archivo = models.CharField('Nombre del archivo', max_length=255)
+    tipo_contenido = models.CharField('Tipo de contenido', max_length=100, blank=True)
+    tamano = models.PositiveBigIntegerField('Tamaño total (bytes)')
+    tamano_parte = models.PositiveIntegerField('Tamaño de parte (bytes)')
+    sha256_esperado = models.CharField('SHA-256 esperado', max_length=64, blank=True)
+    sha256 = models.CharField('SHA-256', max_length=64, blank=True)
+
+    estatus = models.CharField(
+        'Estatus',
+        max_length=20,
+        choices=Estatus.choices,
+        default=Estatus.ABIERTA
+    )
+    fecha_creacion = models.DateTimeField('Fecha de creación', auto_now_add=True)
+    fecha_completada = models.DateTimeField('Fecha de completado', null=True, blank=True)
+
+    class Meta:
+        db_table = 'sesiones_carga'
+        verbose_name = 'Sesión de carga'
+        verbose_name_plural = 'Sesiones de carga'
+        ordering = ['-fecha_creacion']
+
+    def __str__(self):
+        return f"{self.nombre_archivo} ({self.get_estatus_display()})"
+
+    @property
+    def total_partes(self):
+        return max(1, -(-self.tamano // self.tamano_parte))
+
+    def tamano_de_parte(self, indice):
+        """Tamaño exacto que debe tener la parte `indice` (la última puede ser menor)"""
+        if indice == self.total_partes - 1:
+            return self.tamano - self.tamano_parte * indice
+        return self.tamano_parte
+
+
+class ArchivoContenido(models.Model):
+    """
+    Blob único del almacenamiento por contenido (ver almacenamiento.py).
+
+    Varios registros (tickets, pagos, documentos...) pueden apuntar al mismo
+    archivo; `referencias` cuenta cuántos campos lo usan. Los blobs sin
+    referencias se borran después de un periodo de gracia (para no chocar con
+    una carga en curso que esté por reutilizarlos).
+    """
+    sha256 = models.CharField('SHA-256', max_length=64, unique=True)
+    ruta = models.CharField('Ruta', max_length=255, unique=True)
+    tamano = models.PositiveBigIntegerField('Tamaño (bytes)')
+    referencias = models.PositiveIntegerField('Referencias', default=0)
+    fecha_creacion = models.DateTimeField('Fecha de creación', auto_now_add=True)
+    fecha_ultimo_uso = models.DateTimeField('Último uso', auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'archivos_contenido'
+        verbose_name = 'Archivo por contenido'
+        verbose_name_plural = 'Archivos por contenido'
+
+    def __str__(self):
+        return f"{self.ruta} ({self.referencias} ref.)"
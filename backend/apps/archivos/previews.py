@@ -0,0 +1,144 @@
+"""
+Miniaturas y vistas previas de imágenes subidas (fotos de comprobantes).
+
+Por cada imagen se generan dos JPEG livianos junto a MEDIA_ROOT:
+    previews/<ruta sin extensión>_miniatura.jpg     (~200 px, para listados)
+    previews/<ruta sin extensión>_vista_previa.jpg  (~1280 px, para modales)
+Con el almacenamiento por contenido la ruta ya es el hash, así que un mismo
+comprobante subido varias veces comparte sus previews.
+
+Se generan en segundo plano (pool de hilos, después del commit) al guardar el
+registro; `python manage.py generar_previews` procesa los pendientes.
+
+Se sirven por la descarga protegida (/archivos/descargar/{tipo}/{id}/?preview=...),
+que valida el acceso por puerto; si la preview aún no existe sirve la imagen
+original, así los listados arman las URLs sin consultar el disco.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.urls import reverse
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .descargas import tipo_protegido
+
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONES_IMAGEN = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'}
+
+# tipo -> (lado mayor en px, calidad JPEG)
+TIPOS = {
+    'miniatura': (200, 70),
+    'vista_previa': (1280, 78),
+}
+
+_pool = None
+
+
+def es_imagen(nombre):
+    return bool(nombre) and os.path.splitext(nombre)[1].lower() in EXTENSIONES_IMAGEN
+
+
+def ruta_preview(nombre, tipo):
+    return f"previews/{os.path.splitext(nombre)[0]}_{tipo}.jpg"
+
+
+def generar(nombre, storage, forzar=False):
+    """
+    Genera las previews de una imagen leída de `storage` (el del FileField).
+    Las previews se escriben con default_storage. Devuelve cuántas se escribieron.
+    """
+    pendientes = {
+        tipo: ruta_preview(nombre, tipo) for tipo in TIPOS
+        if forzar or not default_storage.exists(ruta_preview(nombre, tipo))
+    }
+    if not pendientes:
+        return 0
+
+    with storage.open(nombre, 'rb') as archivo:
+        imagen = Image.open(archivo)
+        # En JPEG decodifica directamente a escala reducida (mucho más rápido)
+        imagen.draft('RGB', (max(lado for lado, _ in TIPOS.values()),) * 2)
+        imagen = ImageOps.exif_transpose(imagen)
+        if imagen.mode != 'RGB':
+            imagen = imagen.convert('RGB')
+
+        # De la más grande a la más chica, reutilizando la reducción anterior
+        for tipo, (lado, calidad) in sorted(TIPOS.items(), key=lambda t: -t[1][0]):
+            imagen.thumbnail((lado, lado), Image.LANCZOS)
+            if tipo not in pendientes:
+                continue
+            buffer = BytesIO()
+            imagen.save(buffer, 'JPEG', quality=calidad, optimize=True, progressive=True)
+            if default_storage.exists(pendientes[tipo]):
+                default_storage.delete(pendientes[tipo])
+            default_storage.save(pendientes[tipo], ContentFile(buffer.getvalue()))
+    return len(pendientes)
+
+
+def _generar_seguro(nombre, storage):
+    try:
+        generar(nombre, storage)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+        logger.warning('No se pudo generar la vista previa de %s: %s', nombre, e)
+
+
+def programar(nombre, storage):
+    """Encola la generación para después del commit (no bloquea la respuesta)"""
+    global _pool
+    if not es_imagen(nombre):
+        return
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=settings.PREVIEWS_HILOS, thread_name_prefix='previews'
+        )
+    transaction.on_commit(lambda: _pool.submit(_generar_seguro, nombre, storage))
+
+
+class ArchivoPreview:
+    """Lo que descargas.respuesta_archivo usa de un FieldFile, para una preview de default_storage"""
+    storage = default_storage
+
+    def __init__(self, nombre):
+        self.name = nombre
+
+    @property
+    def path(self):
+        return default_storage.path(self.name)
+
+    @property
+    def size(self):
+        return default_storage.size(self.name)
+
+
+def archivo_preview(archivo, tipo):
+    """Preview `tipo` de un FieldFile de imagen; el mismo archivo si no es imagen o aún no hay"""
+    if not es_imagen(archivo.name):
+        return archivo
+    ruta = ruta_preview(archivo.name, tipo)
+    if not default_storage.exists(ruta):
+        return archivo
+    return ArchivoPreview(ruta)
+
+
+def urls_preview(archivo, request=None):
+    """
+    {'miniatura': url, 'vista_previa': url} de un FieldFile, por la descarga
+    protegida; None si no es imagen o su modelo no tiene descarga protegida.
+    """
+    if not archivo or not es_imagen(archivo.name):
+        return None
+    tipo_archivo = tipo_protegido(archivo)
+    if tipo_archivo is None:
+        return None
+    url = reverse('descargar-archivo', kwargs={'tipo': tipo_archivo, 'objeto_id': archivo.instance.pk})
+    if request:
+        url = request.build_absolute_uri(url)
+    return {tipo: f'{url}?preview={tipo}' for tipo in TIPOS}
@@ -0,0 +1,109 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from apps.operaciones.models import Contenedor, Documento
+from .models import SesionCarga
+from .cargas import partes_recibidas, validar_destino, ErrorCarga
+from .previews import urls_preview
+
+
+class PreviewsField(serializers.ReadOnlyField):
+    """
+    URLs (descarga protegida) de miniatura y vista previa de un archivo de
+    imagen; None si no es imagen. Se arman sin consultar el disco.
+    """
+
+    def to_representation(self, value):
+        return urls_preview(value, self.context.get('request'))
+
+
+class SesionCargaSerializer(serializers.ModelSerializer):
+    """Estado de una carga: el cliente reanuda subiendo las partes faltantes"""
+    destino_display = serializers.CharField(source='get_destino_display', read_only=True)
+    estatus_display = serializers.CharField(source='get_estatus_display', read_only=True)
+    total_partes = serializers.IntegerField(read_only=True)
+    partes_recibidas = serializers.SerializerMethodField()
+    partes_faltantes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SesionCarga
+        fields = [
+            'id', 'destino', 'destino_display', 'objeto_id', 'metadatos',
+            'nombre_archivo', 'tipo_contenido', 'tamano', 'tamano_parte',
+            'total_partes', 'partes_recibidas', 'partes_faltantes',
+            'sha256_esperado', 'sha256', 'estatus', 'estatus_display',
+            'fecha_creacion', 'fecha_completada'
+        ]
+        read_only_fields = fields
+
+    def _recibidas(self, obj):
+        if not hasattr(obj, '_partes_recibidas'):
+            obj._partes_recibidas = partes_recibidas(obj)
+        return obj._partes_recibidas
+
+    def get_partes_recibidas(self, obj):
+        return self._recibidas(obj)
+
+    def get_partes_faltantes(self, obj):
+        if obj.estatus != SesionCarga.Estatus.ABIERTA:
+            return []
+        return sorted(set(range(obj.total_partes)) - set(self._recibidas(obj)))
+
+
+class SesionCargaCreateSerializer(serializers.ModelSerializer):
+    """Serializer para iniciar una carga en partes"""
+    tamano = serializers.IntegerField(min_value=1)
+    tamano_parte = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = SesionCarga
+        fields = [
+            'id', 'destino', 'objeto_id', 'metadatos', 'nombre_archivo',
+            'tipo_contenido', 'tamano', 'tamano_parte', 'sha256_esperado'
+        ]
+        read_only_fields = ['id']
+
+    def validate_tamano(self, value):
+        if value > settings.CARGA_TAMANO_MAXIMO:
+            raise serializers.ValidationError(
+                f'El archivo excede el máximo permitido ({settings.CARGA_TAMANO_MAXIMO} bytes)'
+            )
+        return value
+
+    def validate_tamano_parte(self, value):
+        if not settings.CARGA_TAMANO_PARTE_MINIMO <= value <= settings.CARGA_TAMANO_PARTE_MAXIMO:
+            raise serializers.ValidationError(
+                f'El tamaño de parte debe estar entre {settings.CARGA_TAMANO_PARTE_MINIMO} '
+                f'y {settings.CARGA_TAMANO_PARTE_MAXIMO} bytes'
+            )
+        return value
+
+    def validate_nombre_archivo(self, value):
+        # Solo el nombre, sin rutas
+        return value.replace('\\', '/').rsplit('/', 1)[-1]
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        destino = attrs['destino']
+        objeto_id = attrs.get('objeto_id')
+        attrs.setdefault('tamano_parte', settings.CARGA_TAMANO_PARTE)
+
+        if objeto_id is None:
+            if destino != SesionCarga.Destino.DOCUMENTO:
+                raise serializers.ValidationError({'objeto_id': 'Este campo es requerido.'})
+            self._validar_documento_nuevo(user, attrs.get('metadatos') or {})
+        else:
+            try:
+                validar_destino(user, destino, objeto_id)
+            except ErrorCarga as e:
+                raise serializers.ValidationError({'objeto_id': str(e)})
+        return attrs
+
+    def _validar_documento_nuevo(self, user, metadatos):
+        if metadatos.get('tipo') not in Documento.TipoDocumento.values:
+            raise serializers.ValidationError({'metadatos': 'Tipo de documento inválido'})
+        contenedores = user.filtrar_por_puerto(
+            Contenedor.objects.filter(pk=metadatos.get('contenedor')), campo_puerto='puerto'
+        )
+        if not metadatos.get('contenedor') or not contenedores.exists():
+            raise serializers.ValidationError({'metadatos': 'Contenedor inválido o sin acceso'})
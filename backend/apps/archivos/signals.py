@@ -0,0 +1,68 @@
+"""
+Conteo de referencias del almacenamiento por contenido.
+
+Al cargar un registro se recuerda el nombre de cada archivo; al guardarlo se
+compara con el actual para sumar la referencia nueva y liberar la anterior
+(y, si es imagen, encolar sus previews). Se lee el valor crudo de __dict__ para
+no disparar consultas en campos diferidos.
+"""
+from collections import defaultdict
+
+from django.db.models.signals import post_init, post_save, post_delete
+
+from .almacenamiento import campos_contenido, es_ruta_contenido, referenciar, liberar
+from .previews import programar as programar_previews
+
+
+def _nombre(instance, campo):
+    valor = instance.__dict__.get(campo)
+    return getattr(valor, 'name', valor) or ''
+
+
+def _receivers(campos):
+    def al_cargar(sender, instance, **kwargs):
+        instance._archivos_originales = {
+            campo: _nombre(instance, campo) for campo in campos if campo in instance.__dict__
+        }
+
+    def al_guardar(sender, instance, created, update_fields=None, **kwargs):
+        originales = getattr(instance, '_archivos_originales', {})
+        for campo in campos:
+            if campo not in instance.__dict__:
+                continue
+            if update_fields is not None and campo not in update_fields:
+                continue
+            nuevo = _nombre(instance, campo)
+            anterior = '' if created else originales.get(campo, '')
+            if nuevo == anterior:
+                continue
+            if es_ruta_contenido(nuevo):
+                referenciar(nuevo)
+            if es_ruta_contenido(anterior):
+                liberar(anterior)
+            if nuevo:
+                programar_previews(nuevo, sender._meta.get_field(campo).storage)
+            originales[campo] = nuevo
+        instance._archivos_originales = originales
+
+    def al_borrar(sender, instance, **kwargs):
+        for campo in campos:
+            nombre = _nombre(instance, campo)
+            if es_ruta_contenido(nombre):
+                liberar(nombre)
+
+    return al_cargar, al_guardar, al_borrar
+
+
+def conectar():
+    campos_por_modelo = defaultdict(list)
+    for modelo, campo in campos_contenido():
+        campos_por_modelo[modelo].append(campo)
+
+    for modelo, campos in campos_por_modelo.items():
+        al_cargar, al_guardar, al_borrar = _receivers(tuple(campos))
+        etiqueta = modelo._meta.label
+        # weak=False: los receivers son closures sin otra referencia
+        post_init.connect(al_cargar, sender=modelo, weak=False, dispatch_uid=f'archivos_init_{etiqueta}')
+        post_save.connect(al_guardar, sender=modelo, weak=False, dispatch_uid=f'archivos_save_{etiqueta}')
+        post_delete.connect(al_borrar, sender=modelo, weak=False, dispatch_uid=f'archivos_delete_{etiqueta}')
@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.archivos.almacenamiento import _almacenamiento, purgar_sin_referencias
+from apps.archivos.models import ArchivoContenido
+
+
+class PurgaSinReferenciasTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def crear_blob(self, contenido):
+        ruta = _almacenamiento.save('comprobante.pdf', ContentFile(contenido))
+        blob = ArchivoContenido.objects.get(ruta=ruta)
+        ArchivoContenido.objects.filter(pk=blob.pk).update(fecha_ultimo_uso=timezone.now() - timedelta(days=3))
+        return blob
+
+    def test_no_borra_un_blob_reutilizado_durante_la_purga(self):
+        primero = self.crear_blob(b'uno')
+        reutilizado = self.crear_blob(b'dos')
+        borrar = FileSystemStorage.delete
+
+        def borrar_y_reutilizar(storage, nombre):
+            # Mientras se purga el primero, otra carga reutiliza el segundo
+            borrar(storage, nombre)
+            _almacenamiento.save('otra.pdf', ContentFile(b'dos'))
+
+        with mock.patch.object(FileSystemStorage, 'delete', borrar_y_reutilizar):
+            total, _ = purgar_sin_referencias(timedelta(days=1), tamano_lote=1)
+
+        self.assertEqual(total, 2)
+        self.assertFalse(ArchivoContenido.objects.filter(pk=primero.pk).exists())
+        self.assertFalse(os.path.exists(_almacenamiento.path(primero.ruta)))
+        self.assertTrue(ArchivoContenido.objects.filter(pk=reutilizado.pk).exists())
+        self.assertTrue(os.path.exists(_almacenamiento.path(reutilizado.ruta)))
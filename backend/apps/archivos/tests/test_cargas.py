@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.test import TestCase, override_settings
+
+from apps.archivos.cargas import ErrorCarga, finalizar, guardar_parte
+from apps.archivos.models import SesionCarga
+from apps.operaciones.models import Documento
+from apps.operaciones.tests.datos import crear_catalogos, crear_contenedor, crear_usuario
+
+
+class FinalizarCargaTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media, CARGAS_DIRECTORIO=f'{media}/cargas')
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.usuario = crear_usuario('admin')
+        contenedor = crear_contenedor(crear_catalogos(), self.usuario)
+        self.sesion = SesionCarga.objects.create(
+            usuario=self.usuario,
+            destino=SesionCarga.Destino.DOCUMENTO,
+            metadatos={'contenedor': contenedor.id, 'tipo': 'factura'},
+            nombre_archivo='factura.pdf',
+            tamano=6,
+            tamano_parte=4,
+        )
+        guardar_parte(self.sesion, 0, BytesIO(b'%PDF'))
+        guardar_parte(self.sesion, 1, BytesIO(b'-1'))
+
+    def test_reintento_devuelve_el_mismo_registro(self):
+        # El reintento llega con la sesión leída antes de que terminara la primera
+        reintento = SesionCarga.objects.get(pk=self.sesion.pk)
+
+        documento, _, asignado = finalizar(self.sesion, self.usuario)
+        repetido, anterior, reasignado = finalizar(reintento, self.usuario)
+
+        self.assertTrue(asignado)
+        self.assertFalse(reasignado)
+        self.assertEqual(repetido.pk, documento.pk)
+        self.assertEqual(anterior, '')
+        self.assertEqual(Documento.objects.count(), 1)
+        self.assertEqual(reintento.estatus, SesionCarga.Estatus.COMPLETADA)
+
+    def test_sesion_cancelada_no_se_finaliza(self):
+        SesionCarga.objects.filter(pk=self.sesion.pk).update(estatus=SesionCarga.Estatus.CANCELADA)
+        with self.assertRaises(ErrorCarga):
+            finalizar(self.sesion, self.usuario)
+        self.assertFalse(Documento.objects.exists())
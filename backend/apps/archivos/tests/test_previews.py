@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from apps.archivos import previews
+from apps.operaciones.tests.datos import crear_catalogos, crear_contenedor, crear_logistica, crear_usuario
+from apps.pagos.models import PagoLogistica
+
+
+def imagen_png():
+    buffer = BytesIO()
+    Image.new('RGB', (1600, 900), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class PreviewsProtegidasTests(APITestCase):
+    """Las previews se sirven por la descarga protegida, sin consultar el disco al listar"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.catalogos = crear_catalogos()
+        self.usuario = crear_usuario('pagos', puerto=self.catalogos['puerto'])
+        contenedor = crear_contenedor(self.catalogos, self.usuario)
+        operacion = crear_logistica(contenedor, self.usuario, self.catalogos)
+        self.png = imagen_png()
+        ruta = default_storage.save('comprobantes/foto.png', ContentFile(self.png))
+        self.pago = PagoLogistica.objects.create(
+            operacion=operacion, usuario=self.usuario, monto=Decimal('100'), comprobante=ruta
+        )
+        self.url = f'/api/archivos/descargar/pago_logistica.comprobante/{self.pago.id}/'
+        self.client.force_authenticate(self.usuario)
+
+    def test_listado_apunta_a_la_descarga_protegida(self):
+        with mock.patch.object(previews, 'default_storage') as almacenamiento:
+            respuesta = self.client.get('/api/pagos/logistica/')
+        almacenamiento.exists.assert_not_called()
+        urls = respuesta.data['results'][0]['comprobante_previews']
+        self.assertEqual(urls['miniatura'], f'http://testserver{self.url}?preview=miniatura')
+        self.assertEqual(urls['vista_previa'], f'http://testserver{self.url}?preview=vista_previa')
+
+    def test_sin_preview_sirve_la_imagen_original(self):
+        respuesta = self.client.get(self.url, {'preview': 'miniatura'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Content-Type'], 'image/png')
+        self.assertEqual(b''.join(respuesta.streaming_content), self.png)
+
+    def test_con_preview_sirve_la_miniatura(self):
+        previews.generar(self.pago.comprobante.name, self.pago.comprobante.storage)
+        respuesta = self.client.get(self.url, {'preview': 'miniatura'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Content-Type'], 'image/jpeg')
+        miniatura = Image.open(BytesIO(b''.join(respuesta.streaming_content)))
+        self.assertEqual(max(miniatura.size), previews.TIPOS['miniatura'][0])
+
+    def test_preview_de_otro_puerto_o_tipo_invalido_es_404(self):
+        self.assertEqual(self.client.get(self.url, {'preview': 'original'}).status_code, 404)
+        ajeno = crear_usuario('pagos', puerto=self.catalogos['otro_puerto'], email='ajeno@prueba.com')
+        self.client.force_authenticate(ajeno)
+        self.assertEqual(self.client.get(self.url, {'preview': 'miniatura'}).status_code, 404)
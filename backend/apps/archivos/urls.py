@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import SesionCargaViewSet, DescargaArchivoView
+
+router = DefaultRouter()
+router.register(r'cargas', SesionCargaViewSet, basename='carga')
+
+urlpatterns = [
+    path('descargar/<str:tipo>/<int:objeto_id>/', DescargaArchivoView.as_view(), name='descargar-archivo'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,134 @@
+import os
+from io import BytesIO
+
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from django.http import Http404
+
+from .models import SesionCarga
+from .serializers import SesionCargaSerializer, SesionCargaCreateSerializer
+from .cargas import guardar_parte, finalizar, cancelar, ErrorCarga
+from .descargas import ARCHIVOS_PROTEGIDOS, obtener_archivo, respuesta_archivo
+from .previews import TIPOS as TIPOS_PREVIEW, archivo_preview
+from apps.auditoria.utils import registrar_accion, get_client_ip
+
+
+class SesionCargaViewSet(mixins.CreateModelMixin,
+                         mixins.RetrieveModelMixin,
+                         mixins.ListModelMixin,
+                         mixins.DestroyModelMixin,
+                         viewsets.GenericViewSet):
+    """
+    API de cargas reanudables en partes.
+
+    1. POST   /cargas/                        -> crea la sesión (destino, tamaño, ...)
+    2. PUT    /cargas/{id}/partes/{indice}/   -> cuerpo binario de la parte
+       (header opcional X-Checksum-SHA256 para verificarla)
+    3. GET    /cargas/{id}/                   -> partes recibidas/faltantes (reanudar)
+    4. POST   /cargas/{id}/finalizar/         -> ensambla y asigna el archivo
+    DELETE /cargas/{id}/ cancela la sesión y borra las partes.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        # Cada usuario solo ve sus propias cargas
+        return SesionCarga.objects.filter(usuario=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return SesionCargaCreateSerializer
+        return SesionCargaSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(usuario=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(SesionCargaSerializer(serializer.instance).data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        cancelar(instance)
+
+    @action(detail=True, methods=['put'], url_path=r'partes/(?P<indice>\d+)')
+    def parte(self, request, pk=None, indice=None):
+        """Recibe una parte como cuerpo binario; se escribe a disco por bloques"""
+        sesion = self.get_object()
+        try:
+            tamano, sha256 = guardar_parte(
+                sesion, int(indice), request.stream or BytesIO(),
+                sha256_esperado=request.headers.get('X-Checksum-SHA256')
+            )
+        except ErrorCarga as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'indice': int(indice), 'tamano': tamano, 'sha256': sha256})
+
+    @action(detail=True, methods=['post'])
+    def finalizar(self, request, pk=None):
+        """Ensambla las partes y asigna el archivo al registro destino"""
+        sesion = self.get_object()
+        try:
+            instancia, anterior, asignado = finalizar(sesion, request.user)
+        except ErrorCarga as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        campo = sesion.destino.split('.')[1]
+        archivo = getattr(instancia, campo)
+        if asignado:  # Un reintento sobre una sesión ya finalizada no se vuelve a registrar
+            registrar_accion(
+                usuario=request.user,
+                accion='SUBIR_ARCHIVO',
+                descripcion=f'Archivo subido: {sesion.nombre_archivo} ({sesion.get_destino_display()})',
+                modelo=instancia.__class__.__name__,
+                objeto_id=instancia.pk,
+                datos_anteriores={campo: anterior} if anterior else None,
+                datos_nuevos={campo: archivo.name, 'sha256': sesion.sha256, 'tamano': sesion.tamano},
+                ip_address=get_client_ip(request)
+            )
+        return Response({
+            **SesionCargaSerializer(sesion).data,
+            'url': request.build_absolute_uri(archivo.url),
+        })
+
+
+class DescargaArchivoView(APIView):
+    """
+    Descarga protegida: GET /archivos/descargar/{tipo}/{id}/
+    tipo: ticket.comprobante_pago, garantia.comprobante, documento.archivo,
+    pago.comprobante, pago_logistica.comprobante, pago_revalidacion.comprobante.
+    ?descargar=1 para forzar la descarga en lugar de abrirlo en el navegador.
+    ?preview=miniatura|vista_previa para la preview de una imagen (o la imagen
+    original si aún no se genera).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, tipo, objeto_id):
+        if tipo not in ARCHIVOS_PROTEGIDOS:
+            raise Http404
+        # Sin acceso se responde igual que si no existiera
+        archivo = obtener_archivo(request.user, tipo, objeto_id)
+        if archivo is None:
+            raise Http404
+
+        # Con el almacenamiento por contenido el nombre en disco es el hash
+        extension = os.path.splitext(archivo.name)[1]
+        nombre = getattr(archivo.instance, 'nombre_archivo', None) or f'{archivo.field.name}_{objeto_id}{extension}'
+
+        preview = request.query_params.get('preview')
+        if preview:
+            if preview not in TIPOS_PREVIEW:
+                raise Http404
+            imagen = archivo_preview(archivo, preview)
+            if imagen is not archivo:
+                nombre = f'{os.path.splitext(nombre)[0]}_{preview}.jpg'
+            archivo = imagen
+        return respuesta_archivo(
+            request, archivo,
+            nombre_descarga=nombre,
+            adjunto=request.query_params.get('descargar') == '1'
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditoria', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bitacora',
+            name='accion',
+            field=models.CharField(choices=[('LOGIN', 'Inicio de sesión'), ('LOGOUT', 'Cierre de sesión'), ('CREAR_TICKET', 'Crear ticket'), ('EDITAR_TICKET', 'Editar ticket'), ('EDITAR_ETA', 'Editar fecha ETA'), ('EDITAR_DIAS_LIBRES', 'Editar días libres'), ('REGISTRAR_PAGO', 'Registrar pago'), ('CERRAR_OPERACION', 'Cerrar operación'), ('SUBIR_ARCHIVO', 'Subir archivo'), ('CREAR_COTIZACION', 'Crear cotización'), ('CREAR_USUARIO', 'Crear usuario'), ('CAMBIAR_PASSWORD', 'Cambiar contraseña'), ('TOGGLE_USUARIO', 'Activar/Desactivar usuario'), ('CREAR_CATALOGO', 'Crear catálogo'), ('EDITAR_CATALOGO', 'Editar catálogo'), ('ELIMINAR_CATALOGO', 'Eliminar catálogo')], max_length=30, verbose_name='Tipo de acción'),
+        ),
+    ]
@@ -19,6 +19,7 @@ class Bitacora(models.Model):
         EDITAR_DIAS_LIBRES = 'EDITAR_DIAS_LIBRES', 'Editar días libres'
         REGISTRAR_PAGO = 'REGISTRAR_PAGO', 'Registrar pago'
         CERRAR_OPERACION = 'CERRAR_OPERACION', 'Cerrar operación'
+        SUBIR_ARCHIVO = 'SUBIR_ARCHIVO', 'Subir archivo'
         CREAR_COTIZACION = 'CREAR_COTIZACION', 'Crear cotización'
         CREAR_USUARIO = 'CREAR_USUARIO', 'Crear usuario'
         CAMBIAR_PASSWORD = 'CAMBIAR_PASSWORD', 'Cambiar contraseña'
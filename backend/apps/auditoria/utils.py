@@ -29,6 +29,24 @@ def registrar_accion(usuario, accion, descripcion, modelo='', objeto_id=None,
     )
 
 
+def registrar_acciones(usuario, accion, registros, modelo='', ip_address=None):
+    """
+    Registra varias acciones del mismo tipo con un solo INSERT.
+    `registros`: iterable de dicts con descripcion, objeto_id y opcionalmente
+    datos_anteriores / datos_nuevos.
+    """
+    return Bitacora.objects.bulk_create([
+        Bitacora(
+            usuario=usuario,
+            accion=accion,
+            modelo=modelo,
+            ip_address=ip_address,
+            **registro
+        )
+        for registro in registros
+    ])
+
+
 def get_client_ip(request):
     """Obtener IP del cliente desde el request"""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
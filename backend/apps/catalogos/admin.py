@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Empresa, Concepto, Proveedor, Naviera, Puerto, Terminal
+from .models import Empresa, Concepto, Proveedor, Naviera, Puerto, Terminal, TarifaDemora, TipoCambio
 
 
 @admin.register(Empresa)
@@ -30,6 +30,12 @@ class NavieraAdmin(admin.ModelAdmin):
     search_fields = ['nombre', 'codigo']
 
 
+@admin.register(TarifaDemora)
+class TarifaDemoraAdmin(admin.ModelAdmin):
+    list_display = ['naviera', 'dia_desde', 'costo_diario', 'moneda', 'activo']
+    list_filter = ['activo', 'moneda', 'naviera']
+
+
 @admin.register(Puerto)
 class PuertoAdmin(admin.ModelAdmin):
     list_display = ['nombre', 'codigo', 'activo']
@@ -42,3 +48,10 @@ class TerminalAdmin(admin.ModelAdmin):
     list_display = ['nombre', 'puerto', 'activo']
     list_filter = ['activo', 'puerto']
     search_fields = ['nombre']
+
+
+@admin.register(TipoCambio)
+class TipoCambioAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'valor', 'fuente', 'fecha_creacion']
+    list_filter = ['fuente']
+    date_hierarchy = 'fecha'
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalogos.tipo_cambio import PROVEEDORES, CSVProveedor, guardar_tipos_cambio, parsear_fecha
+
+
+class Command(BaseCommand):
+    help = (
+        'Actualiza el histórico de tipo de cambio USD/MXN. '
+        'Pensado para ejecutarse diario (cron), p. ej.: '
+        '0 13 * * 1-5 python manage.py actualizar_tipo_cambio'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--proveedor',
+            choices=sorted(PROVEEDORES),
+            default=None,
+            help='Fuente de datos (por defecto settings.TIPO_CAMBIO_PROVEEDOR)'
+        )
+        parser.add_argument('--desde', help='Fecha inicial (dd/mm/aaaa o aaaa-mm-dd). Default: hace 7 días')
+        parser.add_argument('--hasta', help='Fecha final. Default: hoy')
+        parser.add_argument('--archivo', help='Ruta del CSV (proveedor csv)')
+        parser.add_argument('--valor', help='Valor a usar (proveedor fijo)')
+
+    def handle(self, *args, **options):
+        nombre = options['proveedor'] or settings.TIPO_CAMBIO_PROVEEDOR
+        hasta = parsear_fecha(options['hasta']) if options['hasta'] else date.today()
+        desde = parsear_fecha(options['desde']) if options['desde'] else hasta - timedelta(days=7)
+        if desde > hasta:
+            raise CommandError('--desde debe ser anterior o igual a --hasta')
+
+        if nombre == 'csv':
+            if not options['archivo']:
+                raise CommandError('El proveedor csv requiere --archivo')
+            proveedor = CSVProveedor(options['archivo'])
+        elif nombre == 'fijo':
+            proveedor = PROVEEDORES['fijo'](options['valor'])
+        else:
+            proveedor = PROVEEDORES[nombre]()
+
+        try:
+            datos = proveedor.obtener(desde, hasta)
+        except Exception as e:
+            # Sin conexión o proveedor caído: las consultas siguen usando
+            # el último tipo de cambio guardado.
+            raise CommandError(f'Error al obtener tipo de cambio ({nombre}): {e}')
+
+        total = guardar_tipos_cambio(datos, proveedor.fuente)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {total} tipos de cambio guardados ({nombre}, {desde:%d/%m/%Y} - {hasta:%d/%m/%Y})'
+        ))
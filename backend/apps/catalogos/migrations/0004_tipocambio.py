@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogos', '0003_populate_naviera_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TipoCambio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True, verbose_name='Fecha')),
+                ('valor', models.DecimalField(decimal_places=4, help_text='Pesos mexicanos por dólar', max_digits=8, verbose_name='Tipo de cambio')),
+                ('fuente', models.CharField(choices=[('banxico', 'Banxico (FIX)'), ('csv', 'Importación CSV'), ('fijo', 'Valor fijo'), ('manual', 'Captura manual')], default='manual', max_length=20, verbose_name='Fuente')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+            ],
+            options={
+                'verbose_name': 'Tipo de cambio',
+                'verbose_name_plural': 'Tipos de cambio',
+                'db_table': 'cat_tipos_cambio',
+                'ordering': ['-fecha'],
+            },
+        ),
+    ]
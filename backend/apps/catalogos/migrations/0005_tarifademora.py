@@ -0,0 +1,33 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:18
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogos', '0004_tipocambio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarifaDemora',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia_desde', models.PositiveIntegerField(help_text='Primer día de demora al que aplica (1 = primer día sin días libres)', validators=[django.core.validators.MinValueValidator(1)], verbose_name='Desde el día')),
+                ('costo_diario', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Costo diario')),
+                ('moneda', models.CharField(choices=[('MXN', 'Pesos'), ('USD', 'Dólares')], default='USD', max_length=3, verbose_name='Moneda')),
+                ('activo', models.BooleanField(default=True, verbose_name='Activo')),
+                ('naviera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tarifas_demora', to='catalogos.naviera', verbose_name='Naviera')),
+            ],
+            options={
+                'verbose_name': 'Tarifa de demora',
+                'verbose_name_plural': 'Tarifas de demora',
+                'db_table': 'cat_tarifas_demora',
+                'ordering': ['naviera', 'dia_desde'],
+                'unique_together': {('naviera', 'dia_desde')},
+            },
+        ),
+    ]
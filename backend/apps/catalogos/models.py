@@ -1,3 +1,5 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
 
 
@@ -390,3 +392,110 @@ class Aduana(models.Model):
 
     def __str__(self):
         return self.nombre
+
+
+class TipoCambio(models.Model):
+    """
+    Histórico del tipo de cambio USD/MXN (un registro por día).
+    Se alimenta con el comando `actualizar_tipo_cambio` (Banxico, CSV o valor fijo).
+    Las consultas pasan por la caché versionada de `catalogos.tipo_cambio`;
+    guardar o borrar un registro incrementa la versión.
+    """
+    class Fuente(models.TextChoices):
+        BANXICO = 'banxico', 'Banxico (FIX)'
+        CSV = 'csv', 'Importación CSV'
+        FIJO = 'fijo', 'Valor fijo'
+        MANUAL = 'manual', 'Captura manual'
+
+    fecha = models.DateField('Fecha', unique=True)
+    valor = models.DecimalField(
+        'Tipo de cambio',
+        max_digits=8,
+        decimal_places=4,
+        help_text='Pesos mexicanos por dólar'
+    )
+    fuente = models.CharField(
+        'Fuente',
+        max_length=20,
+        choices=Fuente.choices,
+        default=Fuente.MANUAL
+    )
+    fecha_creacion = models.DateTimeField('Fecha de creación', auto_now_add=True)
+
+    class Meta:
+        db_table = 'cat_tipos_cambio'
+        verbose_name = 'Tipo de cambio'
+        verbose_name_plural = 'Tipos de cambio'
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} - ${self.valor} MXN/USD"
+
+    def save(self, *args, **kwargs):
+        from .tipo_cambio import limpiar_cache
+        super().save(*args, **kwargs)
+        limpiar_cache()
+
+    def delete(self, *args, **kwargs):
+        from .tipo_cambio import limpiar_cache
+        resultado = super().delete(*args, **kwargs)
+        limpiar_cache()
+        return resultado
+
+
+class TarifaDemora(models.Model):
+    """
+    Tarifa escalonada de demoras por naviera.
+    Cada tramo fija el costo diario a partir de un día de demora (contado desde
+    el primer día sin días libres) y aplica hasta que empieza el siguiente tramo.
+
+    Ejemplo (MAERSK):
+    - Desde el día 1 = $80 USD
+    - Desde el día 6 = $120 USD
+    - Desde el día 11 = $200 USD
+    """
+    naviera = models.ForeignKey(
+        Naviera,
+        on_delete=models.CASCADE,
+        related_name='tarifas_demora',
+        verbose_name='Naviera'
+    )
+    dia_desde = models.PositiveIntegerField(
+        'Desde el día',
+        validators=[MinValueValidator(1)],
+        help_text='Primer día de demora al que aplica (1 = primer día sin días libres)'
+    )
+    costo_diario = models.DecimalField(
+        'Costo diario',
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(0)]
+    )
+    moneda = models.CharField(
+        'Moneda',
+        max_length=3,
+        choices=[('MXN', 'Pesos'), ('USD', 'Dólares')],
+        default='USD'
+    )
+    activo = models.BooleanField('Activo', default=True)
+
+    class Meta:
+        db_table = 'cat_tarifas_demora'
+        verbose_name = 'Tarifa de demora'
+        verbose_name_plural = 'Tarifas de demora'
+        unique_together = ['naviera', 'dia_desde']
+        ordering = ['naviera', 'dia_desde']
+
+    def __str__(self):
+        return f"{self.naviera.nombre} desde día {self.dia_desde}: ${self.costo_diario} {self.moneda}"
+
+    def clean(self):
+        # El cálculo de demoras suma los tramos de una naviera en una sola divisa
+        if not self.activo or self.naviera_id is None:
+            return
+        otras_monedas = (
+            TarifaDemora.objects.filter(naviera_id=self.naviera_id, activo=True)
+            .exclude(pk=self.pk).exclude(moneda=self.moneda)
+        )
+        if otras_monedas.exists():
+            raise ValidationError({'moneda': 'Todos los tramos de una naviera deben usar la misma moneda'})
@@ -1,8 +1,9 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from .models import (
     Empresa, Concepto, Proveedor, Naviera, Puerto, Terminal,
     Cliente, AgenteAduanal, Comercializadora, NavieraCuenta, Aduana,
-    MontoFijoRevalidacion
+    MontoFijoRevalidacion, TarifaDemora, TipoCambio
 )
 
 
@@ -101,14 +102,39 @@ class MontoFijoRevalidacionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class TarifaDemoraSerializer(serializers.ModelSerializer):
+    """Serializer para tramos de tarifa de demoras por naviera"""
+    naviera_nombre = serializers.CharField(source='naviera.nombre', read_only=True)
+
+    class Meta:
+        model = TarifaDemora
+        fields = ['id', 'naviera', 'naviera_nombre', 'dia_desde', 'costo_diario', 'moneda', 'activo']
+        read_only_fields = ['id']
+
+    def validate(self, attrs):
+        actual = self.instance
+        tarifa = TarifaDemora(
+            pk=getattr(actual, 'pk', None),
+            naviera=attrs.get('naviera', getattr(actual, 'naviera', None)),
+            moneda=attrs.get('moneda', getattr(actual, 'moneda', 'USD')),
+            activo=attrs.get('activo', getattr(actual, 'activo', True)),
+        )
+        try:
+            tarifa.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict)
+        return attrs
+
+
 class NavieraConCuentasSerializer(serializers.ModelSerializer):
-    """Serializer para naviera con todas sus cuentas bancarias y montos fijos"""
+    """Serializer para naviera con todas sus cuentas bancarias, montos fijos y tarifas de demora"""
     cuentas = NavieraCuentaSerializer(many=True, read_only=True)
     montos_fijos = MontoFijoRevalidacionSerializer(many=True, read_only=True)
+    tarifas_demora = TarifaDemoraSerializer(many=True, read_only=True)
 
     class Meta:
         model = Naviera
-        fields = ['id', 'nombre', 'codigo', 'activo', 'cuentas', 'montos_fijos']
+        fields = ['id', 'nombre', 'codigo', 'activo', 'cuentas', 'montos_fijos', 'tarifas_demora']
         read_only_fields = ['id']
 
 
@@ -147,6 +173,15 @@ class AduanaSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class TipoCambioSerializer(serializers.ModelSerializer):
+    fuente_display = serializers.CharField(source='get_fuente_display', read_only=True)
+
+    class Meta:
+        model = TipoCambio
+        fields = ['id', 'fecha', 'valor', 'fuente', 'fuente_display', 'fecha_creacion']
+        read_only_fields = ['id', 'fecha_creacion']
+
+
 # ============ Serializers para selects/dropdowns ============
 
 class ClienteSelectSerializer(serializers.ModelSerializer):
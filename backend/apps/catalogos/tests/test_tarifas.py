@@ -0,0 +1,31 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from apps.catalogos.models import Naviera, TarifaDemora
+
+
+class TarifaDemoraMonedaTests(TestCase):
+    """Los tramos activos de una naviera usan una sola moneda"""
+
+    def setUp(self):
+        self.naviera = Naviera.objects.create(nombre='NAVIERA PRUEBA')
+        TarifaDemora.objects.create(naviera=self.naviera, dia_desde=1, costo_diario=Decimal('80'), moneda='USD')
+
+    def tramo(self, moneda, activo=True):
+        return TarifaDemora(naviera=self.naviera, dia_desde=6, costo_diario=Decimal('120'), moneda=moneda, activo=activo)
+
+    def test_rechaza_otra_moneda(self):
+        with self.assertRaises(ValidationError) as error:
+            self.tramo('MXN').full_clean()
+        self.assertIn('moneda', error.exception.message_dict)
+
+    def test_acepta_misma_moneda_o_tramo_inactivo(self):
+        self.tramo('USD').full_clean()
+        self.tramo('MXN', activo=False).full_clean()
+
+    def test_cambiar_la_moneda_del_unico_tramo(self):
+        tramo = TarifaDemora.objects.get()
+        tramo.moneda = 'MXN'
+        tramo.full_clean()
@@ -0,0 +1,31 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.catalogos.models import TipoCambio
+from apps.catalogos.tipo_cambio import guardar_tipos_cambio, obtener_tipo_cambio
+
+
+class ObtenerTipoCambioTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.hoy = date.today()
+        TipoCambio.objects.create(fecha=self.hoy, valor=Decimal('18.00'), fuente=TipoCambio.Fuente.FIJO)
+
+    def test_segunda_consulta_sale_de_la_cache(self):
+        self.assertEqual(obtener_tipo_cambio(self.hoy).valor, Decimal('18.00'))
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_tipo_cambio(self.hoy).valor, Decimal('18.00'))
+
+    def test_guardar_invalida_la_cache(self):
+        obtener_tipo_cambio(self.hoy)
+        guardar_tipos_cambio([(self.hoy, Decimal('19.25'))], TipoCambio.Fuente.CSV)
+        vigente = obtener_tipo_cambio(self.hoy)
+        self.assertEqual(vigente.valor, Decimal('19.25'))
+        self.assertEqual(vigente.fuente, TipoCambio.Fuente.CSV)
+
+        TipoCambio.objects.get(fecha=self.hoy).delete()
+        self.assertEqual(obtener_tipo_cambio(self.hoy).fecha, None)
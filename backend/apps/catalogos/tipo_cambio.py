@@ -0,0 +1,171 @@
+"""
+Servicio de tipo de cambio USD/MXN.
+
+- Proveedores intercambiables (Banxico, CSV, valor fijo) que alimentan la
+  tabla TipoCambio desde el comando `actualizar_tipo_cambio`.
+- `obtener_tipo_cambio()` consulta la tabla a través de la caché de Django
+  con llave versionada (apps.core.cache): con Redis un cambio invalida en
+  todos los procesos; con LocMem cada proceso espera el TTL. En el camino del
+  request nunca se hace una llamada de red.
+- Fallback offline: si no hay registro para la fecha se usa el último tipo de
+  cambio conocido anterior a ella (fines de semana, días festivos, proveedor
+  caído) y, si la tabla está vacía, `TIPO_CAMBIO_DEFAULT` de settings.
+"""
+import csv
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache import PREFIJO, invalidar, obtener_version
+
+from .models import TipoCambio
+
+
+TipoCambioVigente = namedtuple('TipoCambioVigente', ['valor', 'fecha', 'fuente'])
+
+
+# ============ PROVEEDORES ============
+
+class ProveedorTipoCambio:
+    """Interfaz de proveedor: devuelve [(fecha, valor)] para un rango de fechas"""
+    fuente = None
+
+    def obtener(self, desde, hasta):
+        raise NotImplementedError
+
+
+class BanxicoProveedor(ProveedorTipoCambio):
+    """
+    API SIE de Banxico, serie SF43718 (tipo de cambio FIX).
+    Requiere el token en settings.BANXICO_TOKEN.
+    """
+    fuente = TipoCambio.Fuente.BANXICO
+    URL = 'https://www.banxico.org.mx/SieAPIRest/service/v1/series/{serie}/datos/{desde}/{hasta}'
+    SERIE_FIX = 'SF43718'
+
+    def __init__(self, token=None, timeout=15):
+        self.token = token or getattr(settings, 'BANXICO_TOKEN', '')
+        self.timeout = timeout
+
+    def obtener(self, desde, hasta):
+        if not self.token:
+            raise ValueError('No hay token de Banxico configurado (BANXICO_TOKEN)')
+
+        url = self.URL.format(serie=self.SERIE_FIX, desde=desde.isoformat(), hasta=hasta.isoformat())
+        response = requests.get(url, headers={'Bmx-Token': self.token}, timeout=self.timeout)
+        response.raise_for_status()
+
+        datos = []
+        for serie in response.json().get('bmx', {}).get('series', []):
+            for dato in serie.get('datos', []):
+                try:
+                    valor = Decimal(dato['dato'].replace(',', ''))
+                except (InvalidOperation, KeyError):
+                    continue  # 'N/E' = sin dato ese día
+                datos.append((datetime.strptime(dato['fecha'], '%d/%m/%Y').date(), valor))
+        return datos
+
+
+class CSVProveedor(ProveedorTipoCambio):
+    """
+    Archivo CSV con columnas `fecha,valor`.
+    Acepta fechas dd/mm/aaaa o aaaa-mm-dd.
+    """
+    fuente = TipoCambio.Fuente.CSV
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def obtener(self, desde, hasta):
+        datos = []
+        with open(self.archivo, newline='', encoding='utf-8-sig') as f:
+            for fila in csv.DictReader(f):
+                fecha = parsear_fecha(fila['fecha'].strip())
+                if desde <= fecha <= hasta:
+                    datos.append((fecha, Decimal(fila['valor'].strip())))
+        return datos
+
+
+class FijoProveedor(ProveedorTipoCambio):
+    """Stub local: mismo valor para cada día (desarrollo y pruebas)"""
+    fuente = TipoCambio.Fuente.FIJO
+
+    def __init__(self, valor=None):
+        self.valor = Decimal(str(valor or settings.TIPO_CAMBIO_DEFAULT))
+
+    def obtener(self, desde, hasta):
+        return [(date.fromordinal(d), self.valor) for d in range(desde.toordinal(), hasta.toordinal() + 1)]
+
+
+PROVEEDORES = {
+    'banxico': BanxicoProveedor,
+    'csv': CSVProveedor,
+    'fijo': FijoProveedor,
+}
+
+
+def parsear_fecha(texto):
+    for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(f'Fecha inválida: {texto}')
+
+
+def guardar_tipos_cambio(datos, fuente):
+    """Inserta o actualiza los tipos de cambio en una sola consulta"""
+    objetos = [TipoCambio(fecha=fecha, valor=valor, fuente=fuente) for fecha, valor in datos]
+    TipoCambio.objects.bulk_create(
+        objetos,
+        update_conflicts=True,
+        unique_fields=['fecha'],
+        update_fields=['valor', 'fuente'],
+    )
+    limpiar_cache()
+    # bulk_create no dispara señales: invalidar dashboards normalizados
+    invalidar('tickets')
+    return len(objetos)
+
+
+# ============ CONSULTA CON CACHÉ ============
+
+ALCANCE_CACHE = 'tipo_cambio'
+
+
+def limpiar_cache():
+    """
+    Incrementa la versión del alcance 'tipo_cambio' en la caché de Django.
+    Con Redis (REDIS_URL) la versión es compartida y la invalidación llega a
+    todos los procesos; con LocMem (default) solo al proceso actual, y los
+    demás sirven su valor hasta que vence TIPO_CAMBIO_CACHE_SEGUNDOS.
+    """
+    invalidar(ALCANCE_CACHE)
+
+
+def obtener_tipo_cambio(fecha=None):
+    """
+    Tipo de cambio vigente para `fecha` (hoy por defecto).
+    Devuelve TipoCambioVigente(valor, fecha, fuente); `fecha` es la del
+    registro usado, que puede ser anterior a la solicitada.
+    """
+    fecha = fecha or date.today()
+    llave = f'{PREFIJO}:{ALCANCE_CACHE}:{obtener_version(ALCANCE_CACHE)}:{fecha.isoformat()}'
+    vigente = cache.get(llave)
+    if vigente is not None:
+        return vigente
+
+    registro = TipoCambio.objects.filter(fecha__lte=fecha).order_by('-fecha').first()
+    if registro:
+        vigente = TipoCambioVigente(registro.valor, registro.fecha, registro.fuente)
+    else:
+        vigente = TipoCambioVigente(
+            Decimal(str(settings.TIPO_CAMBIO_DEFAULT)), None, TipoCambio.Fuente.FIJO
+        )
+
+    cache.set(llave, vigente, timeout=getattr(settings, 'TIPO_CAMBIO_CACHE_SEGUNDOS', 3600))
+    return vigente
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     EmpresaViewSet, ConceptoViewSet, ProveedorViewSet,
     NavieraViewSet, PuertoViewSet, TerminalViewSet,
-    ClienteViewSet, AgenteAduanalViewSet
+    ClienteViewSet, AgenteAduanalViewSet, TarifaDemoraViewSet, TipoCambioViewSet
 )
 
 router = DefaultRouter()
@@ -11,10 +11,12 @@ router.register(r'empresas', EmpresaViewSet, basename='empresa')
 router.register(r'conceptos', ConceptoViewSet, basename='concepto')
 router.register(r'proveedores', ProveedorViewSet, basename='proveedor')
 router.register(r'navieras', NavieraViewSet, basename='naviera')
+router.register(r'tarifas-demora', TarifaDemoraViewSet, basename='tarifa-demora')
 router.register(r'puertos', PuertoViewSet, basename='puerto')
 router.register(r'terminales', TerminalViewSet, basename='terminal')
 router.register(r'clientes', ClienteViewSet, basename='cliente')
 router.register(r'agentes', AgenteAduanalViewSet, basename='agente')
+router.register(r'tipos-cambio', TipoCambioViewSet, basename='tipo-cambio')
 
 urlpatterns = [
     path('', include(router.urls)),
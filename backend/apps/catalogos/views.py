@@ -3,19 +3,21 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-from .models import Empresa, Concepto, Proveedor, Naviera, Puerto, Terminal, Cliente, AgenteAduanal
+from .models import Empresa, Concepto, Proveedor, Naviera, Puerto, Terminal, Cliente, AgenteAduanal, TarifaDemora, TipoCambio
 from .serializers import (
     EmpresaSerializer, ConceptoSerializer, ProveedorSerializer,
     NavieraSerializer, NavieraConCuentasSerializer, PuertoSerializer, TerminalSerializer,
-    ClienteSerializer, AgenteAduanalSerializer
+    ClienteSerializer, AgenteAduanalSerializer, TarifaDemoraSerializer, TipoCambioSerializer
 )
 from apps.auditoria.utils import registrar_accion
+from apps.core.cache import CacheListadoMixin
 
 
-class CatalogoBaseViewSet(viewsets.ModelViewSet):
-    """ViewSet base para catálogos con auditoría"""
+class CatalogoBaseViewSet(CacheListadoMixin, viewsets.ModelViewSet):
+    """ViewSet base para catálogos con auditoría y caché de consultas"""
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    cache_alcances = ('catalogos',)
     
     def perform_create(self, serializer):
         instance = serializer.save()
@@ -79,7 +81,7 @@ class ProveedorViewSet(CatalogoBaseViewSet):
 
 class NavieraViewSet(CatalogoBaseViewSet):
     # Prefetch las cuentas y montos fijos para evitar N+1 queries
-    queryset = Naviera.objects.prefetch_related('cuentas', 'montos_fijos').all()
+    queryset = Naviera.objects.prefetch_related('cuentas', 'montos_fijos', 'tarifas_demora').all()
     # Usar serializer con cuentas y montos fijos incluidos
     serializer_class = NavieraConCuentasSerializer
     search_fields = ['nombre', 'codigo']
@@ -88,6 +90,15 @@ class NavieraViewSet(CatalogoBaseViewSet):
     modelo_nombre = 'Naviera'
 
 
+class TarifaDemoraViewSet(CatalogoBaseViewSet):
+    """Tramos de tarifa de demoras; los usa el comando `calcular_demoras`"""
+    queryset = TarifaDemora.objects.select_related('naviera').all()
+    serializer_class = TarifaDemoraSerializer
+    filterset_fields = ['naviera', 'activo', 'moneda']
+    ordering_fields = ['naviera', 'dia_desde']
+    modelo_nombre = 'TarifaDemora'
+
+
 class PuertoViewSet(CatalogoBaseViewSet):
     queryset = Puerto.objects.all()
     serializer_class = PuertoSerializer
@@ -122,3 +133,13 @@ class AgenteAduanalViewSet(CatalogoBaseViewSet):
     filterset_fields = ['activo']
     ordering_fields = ['nombre', 'fecha_creacion']
     modelo_nombre = 'AgenteAduanal'
+
+
+class TipoCambioViewSet(viewsets.ReadOnlyModelViewSet):
+    """Histórico de tipo de cambio USD/MXN (solo lectura, se alimenta por comando)"""
+    queryset = TipoCambio.objects.all()
+    serializer_class = TipoCambioSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = {'fecha': ['exact', 'gte', 'lte'], 'fuente': ['exact']}
+    ordering_fields = ['fecha']
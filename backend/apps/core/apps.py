@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    """
+    Infraestructura compartida entre apps (caché, señales, utilidades).
+    No define modelos propios.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    verbose_name = 'Núcleo'
+
+    def ready(self):
+        from . import signals  # noqa: F401 - conecta los receivers
@@ -0,0 +1,130 @@
+"""
+Caché de respuestas de la API.
+
+Las respuestas se guardan por "alcance" (tickets, contenedores, catalogos...)
+y por usuario según su rol y puerto asignado, de modo que dos usuarios que ven
+los mismos datos comparten la entrada y nadie recibe datos de otro puerto.
+
+Invalidación: cada alcance tiene un número de versión que forma parte de la
+llave. Las señales post_save/post_delete (ver signals.py) incrementan la
+versión y todas las entradas anteriores quedan huérfanas hasta que expiran.
+Sin REDIS_URL la caché es local a cada proceso: un proceso no ve lo que otro
+invalida. Por eso no se cachean respuestas que deben estar al día entre
+procesos, como el siguiente consecutivo.
+
+Uso en un viewset:
+
+    @action(detail=False, methods=['get'])
+    @cache_por_usuario('tickets')
+    def dashboard(self, request):
+        ...
+
+    class EmpresaViewSet(CacheListadoMixin, viewsets.ModelViewSet):
+        cache_alcances = ('catalogos',)
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+
+PREFIJO = 'bmm'
+
+
+def _timeout_default():
+    return getattr(settings, 'CACHE_TIMEOUT_VISTAS', 300)
+
+
+def _llave_version(alcance):
+    return f'{PREFIJO}:version:{alcance}'
+
+
+def obtener_version(alcance):
+    """Versión actual de un alcance. Se inicializa con un timestamp para que
+    una llave de versión desalojada no reutilice versiones anteriores."""
+    return cache.get_or_set(_llave_version(alcance), time.time_ns, timeout=None)
+
+
+def invalidar(*alcances):
+    """Invalida todas las respuestas cacheadas de los alcances indicados"""
+    for alcance in alcances:
+        llave = _llave_version(alcance)
+        try:
+            cache.incr(llave)
+        except ValueError:
+            # La llave no existe (nunca se usó o fue desalojada)
+            cache.set(llave, time.time_ns(), timeout=None)
+
+
+def alcance_usuario(user):
+    """Segmento de la llave que depende del usuario: rol + puerto asignado"""
+    puerto = user.puerto_asignado_id or 'global'
+    return f'{user.rol}:{puerto}'
+
+
+def construir_llave(request, alcances):
+    versiones = ':'.join(f'{a}.{obtener_version(a)}' for a in alcances)
+    # Ordenar query params para que ?a=1&b=2 y ?b=2&a=1 compartan entrada
+    params = sorted(request.query_params.lists())
+    ruta = f'{request.path}?{params}'
+    ruta_hash = hashlib.md5(ruta.encode('utf-8')).hexdigest()
+    return f'{PREFIJO}:vista:{versiones}:{alcance_usuario(request.user)}:{ruta_hash}'
+
+
+def respuesta_cacheada(request, alcances, generar, timeout=None):
+    """
+    Devuelve la respuesta cacheada para el request o la genera con `generar()`.
+    Solo se cachean GET con estatus 200.
+    """
+    if request.method != 'GET' or not request.user.is_authenticated:
+        return generar()
+
+    llave = construir_llave(request, alcances)
+    data = cache.get(llave)
+    if data is not None:
+        return Response(data)
+
+    response = generar()
+    if response.status_code == 200:
+        cache.set(llave, response.data, timeout if timeout is not None else _timeout_default())
+    return response
+
+
+def cache_por_usuario(*alcances, timeout=None):
+    """Decorador para acciones de viewset (@action o métodos list/retrieve)"""
+    def decorador(func):
+        @wraps(func)
+        def envoltura(self, request, *args, **kwargs):
+            return respuesta_cacheada(
+                request, alcances,
+                lambda: func(self, request, *args, **kwargs),
+                timeout=timeout
+            )
+        return envoltura
+    return decorador
+
+
+class CacheListadoMixin:
+    """
+    Cachea list y retrieve de un viewset.
+    Definir `cache_alcances` (tupla) y opcionalmente `cache_timeout`.
+    """
+    cache_alcances = ()
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return respuesta_cacheada(
+            request, self.cache_alcances,
+            lambda: super(CacheListadoMixin, self).list(request, *args, **kwargs),
+            timeout=self.cache_timeout
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return respuesta_cacheada(
+            request, self.cache_alcances,
+            lambda: super(CacheListadoMixin, self).retrieve(request, *args, **kwargs),
+            timeout=self.cache_timeout
+        )
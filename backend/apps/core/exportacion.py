@@ -0,0 +1,35 @@
+"""
+Exportación CSV en streaming.
+
+Las filas se escriben conforme se leen del cursor, sin armar el archivo
+completo en memoria (patrón de la documentación de Django).
+"""
+import csv
+
+from django.http import StreamingHttpResponse
+
+
+class _Eco:
+    """Pseudo-buffer: csv.writer escribe y la línea se devuelve tal cual"""
+
+    def write(self, value):
+        return value
+
+
+def respuesta_csv(nombre_archivo, encabezados, filas):
+    """
+    StreamingHttpResponse con un CSV.
+    `filas` puede ser cualquier iterable (p. ej. queryset.values_list().iterator()).
+    """
+    writer = csv.writer(_Eco())
+
+    def generar():
+        # BOM para que Excel abra correctamente los acentos
+        yield '\ufeff'
+        yield writer.writerow(encabezados)
+        for fila in filas:
+            yield writer.writerow(fila)
+
+    response = StreamingHttpResponse(generar(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+    return response
@@ -0,0 +1,24 @@
+"""
+Huellas para detectar capturas duplicadas.
+
+La huella es el SHA-1 de los campos que identifican una captura,
+normalizados (sin espacios, en mayúsculas, importes con dos decimales). Se
+guarda en una columna indexada al guardar el registro: buscar duplicados es
+una búsqueda por índice, sin recorrer el historial.
+"""
+import hashlib
+from decimal import Decimal
+
+
+def normalizar(valor):
+    if isinstance(valor, (Decimal, float)):
+        return f'{Decimal(str(valor)):.2f}'
+    return ''.join(str(valor if valor is not None else '').split()).upper()
+
+
+def huella(*partes):
+    """Huella de las partes, o '' si alguna está vacía (sin huella no se compara)"""
+    normalizadas = [normalizar(parte) for parte in partes]
+    if not all(normalizadas):
+        return ''
+    return hashlib.sha1('|'.join(normalizadas).encode()).hexdigest()
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta en orden los comandos de settings.TAREAS_NOCTURNAS. '
+        'Es el único punto de entrada que hay que programar, p. ej. en cron: '
+        '30 0 * * * python manage.py tareas_nocturnas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solo', nargs='+', help='Ejecutar únicamente estas tareas')
+
+    def handle(self, *args, **options):
+        tareas = list(settings.TAREAS_NOCTURNAS)
+        if options['solo']:
+            desconocidas = set(options['solo']) - set(tareas)
+            if desconocidas:
+                raise CommandError(f"Tareas no configuradas: {', '.join(sorted(desconocidas))}")
+            tareas = [t for t in tareas if t in options['solo']]
+
+        fallidas = []
+        for tarea in tareas:
+            self.stdout.write(f'→ {tarea}')
+            try:
+                call_command(tarea, stdout=self.stdout, stderr=self.stderr)
+            except Exception as e:
+                # Una tarea caída no debe impedir que corran las demás
+                fallidas.append(tarea)
+                self.stderr.write(self.style.ERROR(f'✗ {tarea}: {e}'))
+
+        if fallidas:
+            raise CommandError(f"Fallaron: {', '.join(fallidas)}")
+        self.stdout.write(self.style.SUCCESS(f'✓ {len(tareas)} tareas nocturnas completadas'))
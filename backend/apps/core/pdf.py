@@ -0,0 +1,100 @@
+"""
+Caché de PDFs generados en el servidor.
+
+Cada PDF se guarda en MEDIA_ROOT/pdf_cache/<tipo>/<objeto_id>/<hash>.pdf,
+donde <hash> es el SHA-256 de los datos serializados que lo producen. Mientras
+los datos no cambien se sirve el archivo existente; cuando cambian se genera
+uno nuevo y se borran las versiones anteriores de ese objeto. El archivo se
+escribe con un nombre temporal y se renombra, así nunca se sirve a medias.
+
+`renderizar` es una función de nivel de módulo datos -> bytes (sin acceso a la
+base de datos) para que pueda ejecutarse en un ProcessPoolExecutor. El pool
+usa procesos "spawn": un fork del proceso web copiaría sus conexiones abiertas
+(base de datos, caché) y los locks de otros hilos. Cada proceso nuevo ejecuta
+django.setup() antes de importar la función de renderizado.
+"""
+import hashlib
+import json
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+
+DIRECTORIO = 'pdf_cache'
+# Máximo de objetos por llamada a generar_lote (ver generar_pdfs)
+MAXIMO_LOTE = 100
+
+
+def hash_datos(datos):
+    contenido = json.dumps(datos, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def ruta_cache(tipo, objeto_id, datos):
+    return f'{DIRECTORIO}/{tipo}/{objeto_id}/{hash_datos(datos)}.pdf'
+
+
+def _guardar(ruta, contenido):
+    destino = Path(default_storage.path(ruta))
+    if destino.exists():
+        return  # Otro proceso lo generó mientras tanto
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporal = destino.with_name(f'.{uuid.uuid4().hex}.tmp')
+    temporal.write_bytes(contenido)
+    os.replace(temporal, destino)
+
+    # Versiones anteriores del objeto. Si otra petición escribió una versión
+    # después que esta, se conserva: no se borra lo que acaba de generar.
+    escrito = destino.stat().st_mtime_ns
+    for anterior in destino.parent.glob('*.pdf'):
+        try:
+            if anterior != destino and anterior.stat().st_mtime_ns <= escrito:
+                anterior.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def obtener_pdf(tipo, objeto_id, datos, renderizar):
+    """Ruta (relativa a MEDIA_ROOT) del PDF cacheado; lo genera si no existe"""
+    ruta = ruta_cache(tipo, objeto_id, datos)
+    if not default_storage.exists(ruta):
+        _guardar(ruta, renderizar(datos))
+    return ruta
+
+
+def generar_lote(tipo, trabajos, renderizar, procesos=None):
+    """
+    Genera en paralelo los PDFs que no estén en caché.
+    `trabajos`: iterable de (objeto_id, datos). Devuelve {objeto_id: ruta}.
+    """
+    rutas = {}
+    pendientes = []
+    for objeto_id, datos in trabajos:
+        ruta = ruta_cache(tipo, objeto_id, datos)
+        rutas[objeto_id] = ruta
+        if not default_storage.exists(ruta):
+            pendientes.append((ruta, datos))
+
+    if not pendientes:
+        return rutas
+
+    procesos = procesos or getattr(settings, 'PDF_PROCESOS', 4)
+    datos_pendientes = [datos for _, datos in pendientes]
+    if procesos <= 1 or len(pendientes) == 1:
+        contenidos = map(renderizar, datos_pendientes)
+    else:
+        chunksize = max(1, len(pendientes) // (procesos * 4))
+        with ProcessPoolExecutor(
+            max_workers=procesos, mp_context=get_context('spawn'), initializer=django.setup
+        ) as pool:
+            contenidos = list(pool.map(renderizar, datos_pendientes, chunksize=chunksize))
+
+    for (ruta, _), contenido in zip(pendientes, contenidos):
+        _guardar(ruta, contenido)
+    return rutas
@@ -0,0 +1,50 @@
+"""
+Invalidación automática de la caché de vistas.
+
+Cada modelo se asocia a los alcances de caché cuyos datos dependen de él.
+Nota: los QuerySet.update()/bulk_create() no disparan señales; quien los use
+debe llamar a `invalidar()` explícitamente.
+"""
+from django.db.models.signals import post_save, post_delete
+
+from .cache import invalidar
+
+
+ALCANCES_POR_MODELO = {
+    # Operaciones
+    'operaciones.Ticket': ('tickets',),
+    'operaciones.Contenedor': ('contenedores',),
+    'operaciones.OperacionLogistica': ('logistica',),
+    'operaciones.OperacionRevalidacion': ('revalidaciones',),
+    # El pronóstico de demoras usa la tarifa plana de la demora activa
+    'operaciones.Demora': ('contenedores',),
+    # Catálogos (los dashboards agrupan por nombre de empresa)
+    'catalogos.Empresa': ('catalogos', 'tickets', 'contenedores'),
+    'catalogos.Cliente': ('catalogos', 'contenedores'),
+    'catalogos.Concepto': ('catalogos',),
+    'catalogos.Proveedor': ('catalogos',),
+    'catalogos.Naviera': ('catalogos',),
+    'catalogos.NavieraCuenta': ('catalogos',),
+    'catalogos.MontoFijoRevalidacion': ('catalogos',),
+    'catalogos.TarifaDemora': ('catalogos',),
+    'catalogos.Puerto': ('catalogos',),
+    'catalogos.Terminal': ('catalogos',),
+    'catalogos.AgenteAduanal': ('catalogos',),
+    'catalogos.Comercializadora': ('catalogos',),
+    'catalogos.Aduana': ('catalogos',),
+    # Los dashboards normalizan importes a MXN con el histórico
+    'catalogos.TipoCambio': ('tickets',),
+}
+
+
+def _receiver_para(alcances):
+    def receiver(sender, **kwargs):
+        invalidar(*alcances)
+    return receiver
+
+
+for _modelo, _alcances in ALCANCES_POR_MODELO.items():
+    _receiver = _receiver_para(_alcances)
+    # weak=False: el receiver es un closure sin otra referencia
+    post_save.connect(_receiver, sender=_modelo, weak=False, dispatch_uid=f'cache_save_{_modelo}')
+    post_delete.connect(_receiver, sender=_modelo, weak=False, dispatch_uid=f'cache_delete_{_modelo}')
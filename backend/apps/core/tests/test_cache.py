@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from apps.catalogos.models import Empresa
+from apps.core.cache import construir_llave, obtener_version, respuesta_cacheada
+from apps.operaciones.tests.datos import crear_catalogos, crear_usuario
+
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pruebas'}}
+
+
+class CacheLocalMixin:
+
+    def setUp(self):
+        ajustes = override_settings(CACHES=LOCMEM)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        cache.clear()
+
+
+class LlaveCacheTests(CacheLocalMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        puertos = crear_catalogos()
+        self.admin = crear_usuario('admin')
+        self.logistica = crear_usuario('logistica', puerto=puertos['puerto'], email='a@prueba.com')
+        self.logistica_mismo_puerto = crear_usuario('logistica', puerto=puertos['puerto'], email='b@prueba.com')
+        self.logistica_otro_puerto = crear_usuario('logistica', puerto=puertos['otro_puerto'], email='c@prueba.com')
+
+    def llave(self, usuario, ruta='/api/catalogos/empresas/'):
+        request = Request(APIRequestFactory().get(ruta))
+        request.user = usuario
+        return construir_llave(request, ('catalogos',))
+
+    def test_separa_usuarios_por_rol_y_puerto(self):
+        self.assertNotEqual(self.llave(self.admin), self.llave(self.logistica))
+        self.assertNotEqual(self.llave(self.logistica), self.llave(self.logistica_otro_puerto))
+        # Mismo rol y puerto: ven los mismos datos y comparten la entrada
+        self.assertEqual(self.llave(self.logistica), self.llave(self.logistica_mismo_puerto))
+
+    def test_separa_query_params_sin_importar_el_orden(self):
+        self.assertEqual(
+            self.llave(self.admin, '/api/catalogos/empresas/?a=1&b=2'),
+            self.llave(self.admin, '/api/catalogos/empresas/?b=2&a=1'),
+        )
+        self.assertNotEqual(
+            self.llave(self.admin, '/api/catalogos/empresas/?a=1'),
+            self.llave(self.admin, '/api/catalogos/empresas/?a=2'),
+        )
+
+
+class RespuestaCacheadaTests(CacheLocalMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.usuario = crear_usuario('admin')
+        self.generadas = 0
+
+    def responder(self, metodo, estatus):
+        request = Request(getattr(APIRequestFactory(), metodo)('/api/prueba/'))
+        request.user = self.usuario
+
+        def generar():
+            self.generadas += 1
+            return Response({'n': self.generadas}, status=estatus)
+
+        return respuesta_cacheada(request, ('catalogos',), generar)
+
+    def test_get_200_se_cachea(self):
+        self.responder('get', status.HTTP_200_OK)
+        respuesta = self.responder('get', status.HTTP_200_OK)
+        self.assertEqual(self.generadas, 1)
+        self.assertEqual(respuesta.data, {'n': 1})
+
+    def test_get_con_error_no_se_cachea(self):
+        self.responder('get', status.HTTP_404_NOT_FOUND)
+        self.responder('get', status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.generadas, 2)
+
+    def test_otros_metodos_no_se_cachean(self):
+        self.responder('post', status.HTTP_200_OK)
+        self.responder('post', status.HTTP_200_OK)
+        self.assertEqual(self.generadas, 2)
+
+
+class InvalidacionTests(CacheLocalMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(crear_usuario('admin'))
+
+    def test_guardar_un_modelo_incrementa_la_version(self):
+        antes = obtener_version('catalogos')
+        Empresa.objects.create(nombre='Empresa nueva')
+        self.assertGreater(obtener_version('catalogos'), antes)
+
+    def nombres_listados(self):
+        datos = self.client.get('/api/catalogos/empresas/').data
+        return {empresa['nombre'] for empresa in datos.get('results', datos)}
+
+    def test_listado_refleja_el_cambio(self):
+        self.assertNotIn('Empresa nueva', self.nombres_listados())
+        Empresa.objects.create(nombre='Empresa nueva')
+        self.assertIn('Empresa nueva', self.nombres_listados())
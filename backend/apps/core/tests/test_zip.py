@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+
+from apps.core.zip import nombre_seguro, nombres_unicos
+
+
+class NombreSeguroTests(SimpleTestCase):
+
+    def test_quita_directorios(self):
+        self.assertEqual(nombre_seguro('../../etc/passwd'), 'passwd')
+        self.assertEqual(nombre_seguro('..\\..\\boot.ini'), 'boot.ini')
+        self.assertEqual(nombre_seguro('/tmp/factura.pdf'), 'factura.pdf')
+
+    def test_reemplaza_caracteres_no_permitidos(self):
+        self.assertEqual(nombre_seguro('factura (1).pdf'), 'factura (1).pdf')
+        self.assertEqual(nombre_seguro('pedimento_ñ-2.pdf'), 'pedimento_ñ-2.pdf')
+        self.assertEqual(nombre_seguro('a<b>:c|?.pdf'), 'a_b__c__.pdf')
+        self.assertEqual(nombre_seguro('ok.pdf\x00.exe'), 'ok.pdf_.exe')
+
+    def test_nombre_vacio(self):
+        for nombre in ('', None, '..', ' . '):
+            with self.subTest(nombre=nombre):
+                self.assertEqual(nombre_seguro(nombre), 'archivo')
+
+    def test_nombres_unicos(self):
+        self.assertEqual(
+            list(nombres_unicos(['a.pdf', 'a.pdf', 'b', 'b'])),
+            ['a.pdf', 'a_2.pdf', 'b', 'b_2']
+        )
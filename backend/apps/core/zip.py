@@ -0,0 +1,96 @@
+"""
+ZIP en streaming.
+
+zipfile puede escribir a un destino no "seekable" (usa data descriptors), así
+que cada bloque comprimido se entrega al cliente en cuanto se produce: no se
+arma el ZIP en memoria ni en un archivo temporal.
+"""
+import os
+import re
+import zipfile
+
+from django.http import StreamingHttpResponse
+
+
+TAMANO_BLOQUE = 64 * 1024
+CARACTERES_NO_PERMITIDOS = re.compile(r'[^\w.\- ()]')
+
+
+class _Buffer:
+    """Destino de escritura que acumula bytes hasta que el generador los entrega"""
+
+    def __init__(self):
+        self.bloques = []
+
+    def write(self, datos):
+        self.bloques.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self.bloques)
+        self.bloques = []
+        return datos
+
+
+def zip_en_streaming(archivos, compresion=zipfile.ZIP_STORED):
+    """
+    Genera los bytes de un ZIP.
+    `archivos`: iterable de (nombre_en_zip, abrir) donde abrir() devuelve un
+    archivo binario abierto. Se consume de forma perezosa.
+    PDFs e imágenes ya vienen comprimidos: por defecto se guardan sin comprimir.
+    """
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=compresion, allowZip64=True) as zf:
+        for nombre, abrir in archivos:
+            with abrir() as origen, zf.open(nombre, mode='w', force_zip64=True) as destino:
+                while True:
+                    bloque = origen.read(TAMANO_BLOQUE)
+                    if not bloque:
+                        break
+                    destino.write(bloque)
+                    datos = buffer.vaciar()
+                    if datos:
+                        yield datos
+            datos = buffer.vaciar()
+            if datos:
+                yield datos
+    # Directorio central
+    yield buffer.vaciar()
+
+
+def nombre_seguro(nombre, predeterminado='archivo'):
+    """
+    Nombre capturado por el usuario como nombre de archivo dentro del ZIP:
+    sin directorios (ni / ni \\) y solo letras, dígitos, espacio y . _ - ( ).
+    """
+    nombre = os.path.basename(str(nombre or '').replace('\\', '/'))
+    nombre = CARACTERES_NO_PERMITIDOS.sub('_', nombre).strip(' .')
+    return nombre or predeterminado
+
+
+def nombres_unicos(nombres):
+    """Evita entradas duplicadas en el ZIP agregando un sufijo (_2, _3...)"""
+    vistos = {}
+    for nombre in nombres:
+        if nombre not in vistos:
+            vistos[nombre] = 1
+            yield nombre
+            continue
+        vistos[nombre] += 1
+        base, punto, extension = nombre.rpartition('.')
+        if not punto:
+            base, extension = nombre, ''
+        yield f"{base}_{vistos[nombre]}{punto}{extension}"
+
+
+def respuesta_zip(nombre_archivo, archivos, compresion=zipfile.ZIP_STORED):
+    """StreamingHttpResponse con un ZIP armado al vuelo"""
+    response = StreamingHttpResponse(
+        zip_en_streaming(archivos, compresion=compresion),
+        content_type='application/zip'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+    return response
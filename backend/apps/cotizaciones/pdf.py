@@ -0,0 +1,108 @@
+"""
+PDF bilingüe (Chino Simplificado // Español) de cotizaciones.
+
+Se genera con ReportLab a partir de la salida de CotizacionPDFSerializer,
+con el mismo contenido que arma el frontend. Ver apps.core.pdf para la caché.
+"""
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+from apps.core.pdf import obtener_pdf, generar_lote
+from .serializers import CotizacionPDFSerializer
+
+
+TIPO = 'cotizaciones'
+FUENTE_CHINO = 'STSong-Light'
+
+AZUL = colors.HexColor('#2563eb')
+GRIS = colors.HexColor('#e2e8f0')
+ROJO = colors.HexColor('#fecaca')
+AMARILLO = colors.HexColor('#fef08a')
+VERDE = colors.HexColor('#bbf7d0')
+
+
+def _registrar_fuentes():
+    # Fuente CID incluida en ReportLab, cubre chino simplificado
+    if FUENTE_CHINO not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont(FUENTE_CHINO))
+
+
+def _tabla(filas, fondos):
+    tabla = Table(filas, colWidths=[40 * mm, 60 * mm, 70 * mm])
+    estilo = [
+        ('FONTNAME', (0, 0), (-1, -1), FUENTE_CHINO),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, GRIS),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('BACKGROUND', (0, 0), (-1, 0), AZUL),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ]
+    for fila, color in fondos:
+        estilo.append(('BACKGROUND', (0, fila), (-1, fila), color))
+    tabla.setStyle(TableStyle(estilo))
+    return tabla
+
+
+def renderizar_cotizacion(datos):
+    """datos (CotizacionPDFSerializer.data) -> bytes del PDF"""
+    _registrar_fuentes()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=letter,
+        leftMargin=20 * mm, rightMargin=20 * mm, topMargin=15 * mm, bottomMargin=15 * mm,
+        title=f"Cotización {datos['referencia_generada']}"
+    )
+    titulo = ParagraphStyle('titulo', fontName=FUENTE_CHINO, fontSize=16, leading=20)
+    texto = ParagraphStyle('texto', fontName=FUENTE_CHINO, fontSize=10, leading=14)
+
+    elementos = [
+        Paragraph(escape(datos['razon_social'] or ''), titulo),
+        Paragraph(f"报价 // COTIZACIÓN {escape(datos['referencia_generada'] or '')}", texto),
+        Paragraph(f"日期 // FECHA: {escape(datos['fecha_emision'] or '')}", texto),
+        Spacer(1, 6 * mm),
+    ]
+
+    filas = [['中文', 'ESPAÑOL', 'VALOR']]
+    fondos = []
+    for i, dato in enumerate(datos['datos_operativos'], start=1):
+        filas.append([dato['chino'], dato['espanol'], str(dato['valor'] or '')])
+        if dato.get('destacado_verde'):
+            fondos.append((i, VERDE))
+    elementos += [_tabla(filas, fondos), Spacer(1, 6 * mm)]
+
+    divisa = datos['divisa']
+    filas = [['中文', 'CONCEPTO', f'MONTO ({divisa})']]
+    fondos = []
+    for i, costo in enumerate(datos['tabla_costos'], start=1):
+        filas.append([costo['chino'], costo['espanol'], f"${costo['valor']:,.2f} {divisa}"])
+        if costo.get('destacado_rojo'):
+            fondos.append((i, ROJO))
+        elif costo.get('destacado_amarillo'):
+            fondos.append((i, AMARILLO))
+    elementos.append(_tabla(filas, fondos))
+
+    doc.build(elementos)
+    return buffer.getvalue()
+
+
+def datos_cotizacion(cotizacion):
+    return dict(CotizacionPDFSerializer(cotizacion).data)
+
+
+def pdf_cotizacion(cotizacion):
+    """Ruta del PDF cacheado de una cotización (lo genera si cambió)"""
+    return obtener_pdf(TIPO, cotizacion.id, datos_cotizacion(cotizacion), renderizar_cotizacion)
+
+
+def pdfs_cotizaciones(cotizaciones, procesos=None):
+    """Genera en lote (pool de procesos) los PDFs de un queryset de cotizaciones"""
+    trabajos = [(c.id, datos_cotizacion(c)) for c in cotizaciones]
+    return generar_lote(TIPO, trabajos, renderizar_cotizacion, procesos=procesos)
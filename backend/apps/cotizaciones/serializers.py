@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Cotizacion
 from apps.catalogos.serializers import ClienteSerializer, PuertoSerializer, AduanaSerializer
+from apps.catalogos.tipo_cambio import obtener_tipo_cambio
 
 
 class CotizacionListSerializer(serializers.ModelSerializer):
@@ -102,6 +103,9 @@ class CotizacionCreateSerializer(serializers.ModelSerializer):
         # Obtener siguiente consecutivo para el cliente
         cliente = validated_data.get('cliente')
         validated_data['consecutivo'] = Cotizacion.obtener_siguiente_consecutivo(cliente)
+        # Cotizaciones en USD toman el tipo de cambio del día de emisión
+        if validated_data.get('divisa') == Cotizacion.Divisa.USD and not validated_data.get('tipo_cambio'):
+            validated_data['tipo_cambio'] = obtener_tipo_cambio(validated_data.get('fecha_emision')).valor
         return super().create(validated_data)
 
 
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+from datetime import date
+
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from apps.catalogos.models import Cliente, Puerto
+from apps.core.pdf import MAXIMO_LOTE, _guardar
+from apps.cotizaciones.models import Cotizacion
+from apps.cotizaciones.pdf import pdfs_cotizaciones
+from apps.operaciones.tests.datos import crear_usuario
+
+
+class GenerarPDFsTests(APITestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.usuario = crear_usuario('admin')
+        self.client.force_authenticate(self.usuario)
+        self.cliente = Cliente.objects.create(nombre='Cliente prueba', prefijo='CP')
+        self.puerto = Puerto.objects.create(nombre='Puerto prueba', codigo='PPR')
+        self.cotizacion = self.crear_cotizacion(1)
+
+    def crear_cotizacion(self, consecutivo):
+        return Cotizacion.objects.create(
+            usuario=self.usuario, cliente=self.cliente, puerto=self.puerto,
+            razon_social='Importadora <Norte> & Sur', consecutivo=consecutivo, fecha_emision=date.today(),
+            bl_master='BLPRUEBA', contenedor='PRUE1234567',
+        )
+
+    def test_devuelve_la_url_autenticada_de_cada_pdf(self):
+        respuesta = self.client.post('/api/cotizaciones/generar_pdfs/', {'ids': [self.cotizacion.id]}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        url = respuesta.data['pdfs'][0]['url']
+        self.assertEqual(url, f'http://testserver/api/cotizaciones/{self.cotizacion.id}/pdf/')
+
+        pdf = self.client.get(url)
+        self.assertEqual(pdf.status_code, 200)
+        self.assertTrue(b''.join(pdf.streaming_content).startswith(b'%PDF'))
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_ids_no_enteros_es_400(self):
+        for ids in (['abc'], [1.5], [True], 'x', [], None):
+            with self.subTest(ids=ids):
+                respuesta = self.client.post('/api/cotizaciones/generar_pdfs/', {'ids': ids}, format='json')
+                self.assertEqual(respuesta.status_code, 400)
+
+    def test_mas_de_maximo_lote_es_400(self):
+        ids = list(range(1, MAXIMO_LOTE + 2))
+        respuesta = self.client.post('/api/cotizaciones/generar_pdfs/', {'ids': ids}, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_lote_en_procesos(self):
+        otra = self.crear_cotizacion(2)
+        rutas = pdfs_cotizaciones(Cotizacion.objects.filter(id__in=[self.cotizacion.id, otra.id]), procesos=2)
+        self.assertEqual(set(rutas), {self.cotizacion.id, otra.id})
+        for ruta in rutas.values():
+            with default_storage.open(ruta) as archivo:
+                self.assertTrue(archivo.read().startswith(b'%PDF'))
+
+
+class GuardarPDFTests(SimpleTestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def test_reemplaza_versiones_anteriores(self):
+        _guardar('pdf_cache/prueba/1/viejo.pdf', b'viejo')
+        _guardar('pdf_cache/prueba/1/nuevo.pdf', b'nuevo')
+        self.assertEqual(default_storage.listdir('pdf_cache/prueba/1'), ([], ['nuevo.pdf']))
+
+    def test_no_borra_una_version_mas_nueva(self):
+        # Otra petición escribió su versión después de que esta empezara
+        _guardar('pdf_cache/prueba/1/otra.pdf', b'otra')
+        futuro = os.stat(default_storage.path('pdf_cache/prueba/1/otra.pdf')).st_mtime + 60
+        os.utime(default_storage.path('pdf_cache/prueba/1/otra.pdf'), (futuro, futuro))
+
+        _guardar('pdf_cache/prueba/1/esta.pdf', b'esta')
+        _, archivos = default_storage.listdir('pdf_cache/prueba/1')
+        self.assertEqual(sorted(archivos), ['esta.pdf', 'otra.pdf'])
@@ -1,19 +1,26 @@
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-import requests
-from decimal import Decimal
 from datetime import date
 
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponseNotModified
+from django.urls import reverse
+
 from .models import Cotizacion
+from .pdf import pdf_cotizacion, pdfs_cotizaciones
 from .serializers import (
     CotizacionListSerializer, CotizacionDetailSerializer,
     CotizacionCreateSerializer, CotizacionPDFSerializer
 )
 from apps.auditoria.utils import registrar_accion
+from apps.catalogos.models import TipoCambio
+from apps.catalogos.tipo_cambio import obtener_tipo_cambio, parsear_fecha
+from apps.core.pdf import MAXIMO_LOTE
 
 
 class CotizacionViewSet(viewsets.ModelViewSet):
@@ -23,7 +30,7 @@ class CotizacionViewSet(viewsets.ModelViewSet):
     Herramienta independiente para generación de documentos comerciales
     con formato bilingüe (Chino/Español).
     """
-    queryset = Cotizacion.objects.select_related('usuario').all()
+    queryset = Cotizacion.objects.select_related('usuario', 'cliente', 'puerto', 'aduana').all()
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['divisa', 'usuario']
@@ -61,36 +68,78 @@ class CotizacionViewSet(viewsets.ModelViewSet):
         serializer = CotizacionPDFSerializer(cotizacion)
         return Response(serializer.data)
     
-    @action(detail=False, methods=['get'])
-    def tipo_cambio(self, request):
+    @action(detail=True, methods=['get'])
+    def pdf(self, request, pk=None):
+        """
+        PDF bilingüe generado en el servidor.
+        Se cachea en MEDIA_ROOT por hash de los datos: mientras la cotización
+        no cambie se sirve el mismo archivo (ETag = hash).
+        """
+        cotizacion = self.get_object()
+        ruta = pdf_cotizacion(cotizacion)
+        etag = '"{}"'.format(ruta.rsplit('/', 1)[-1].removesuffix('.pdf'))
+        if request.headers.get('If-None-Match') == etag:
+            return HttpResponseNotModified()
+
+        response = FileResponse(
+            default_storage.open(ruta, 'rb'),
+            content_type='application/pdf',
+            filename=f'Cotizacion_{cotizacion.referencia_generada}.pdf'
+        )
+        response['ETag'] = etag
+        return response
+
+    @action(detail=False, methods=['post'])
+    def generar_pdfs(self, request):
         """
-        Obtener tipo de cambio actual desde Banxico (API del Banco de México).
-        Según documento: integración con API del banco central de México.
+        Genera en lote los PDFs de varias cotizaciones (pool de procesos).
+        Body: {"ids": [1, 2, 3]} (máximo MAXIMO_LOTE). Devuelve la URL de cada
+        PDF (acción `pdf`, con autenticación; ya generado, se sirve desde la caché).
         """
+        ids = request.data.get('ids') or []
         try:
-            # API de Banxico para tipo de cambio
-            # Nota: En producción necesitarás un token de Banxico
-            # Por ahora retornamos un valor de ejemplo
-            
-            # URL de ejemplo de Banxico (requiere token)
-            # url = "https://www.banxico.org.mx/SieAPIRest/service/v1/series/SF43718/datos/oportuno"
-            
-            # Por ahora, valor aproximado
-            tipo_cambio = Decimal('17.50')
-            
-            return Response({
-                'tipo_cambio': float(tipo_cambio),
-                'fecha': date.today().strftime('%d/%m/%Y'),
-                'fuente': 'Banxico (valor aproximado)',
-                'nota': 'Para producción, configurar token de API de Banxico'
-            })
-            
-        except Exception as e:
+            ids = serializers.ListField(
+                child=serializers.IntegerField(), allow_empty=False, max_length=MAXIMO_LOTE
+            ).run_validation(ids)
+        except ValidationError:
             return Response(
-                {'error': f'Error al obtener tipo de cambio: {str(e)}'},
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
+                {'error': f'Debe proporcionar una lista de hasta {MAXIMO_LOTE} ids enteros'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-    
+
+        cotizaciones = self.get_queryset().filter(id__in=ids)
+        rutas = pdfs_cotizaciones(cotizaciones)
+        return Response({
+            'pdfs': [
+                {
+                    'id': cotizacion_id,
+                    'url': request.build_absolute_uri(reverse('cotizacion-pdf', kwargs={'pk': cotizacion_id})),
+                }
+                for cotizacion_id in rutas
+            ]
+        })
+
+    @action(detail=False, methods=['get'])
+    def tipo_cambio(self, request):
+        """
+        Obtener tipo de cambio USD/MXN del día (o de ?fecha=dd/mm/aaaa).
+        Se lee del histórico TipoCambio (alimentado desde Banxico por el comando
+        actualizar_tipo_cambio); no hace llamadas de red en el request.
+        """
+        fecha = request.query_params.get('fecha')
+        try:
+            fecha = parsear_fecha(fecha) if fecha else date.today()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        vigente = obtener_tipo_cambio(fecha)
+        return Response({
+            'tipo_cambio': float(vigente.valor),
+            'fecha': vigente.fecha.strftime('%d/%m/%Y') if vigente.fecha else fecha.strftime('%d/%m/%Y'),
+            'fuente': TipoCambio.Fuente(vigente.fuente).label,
+            'vigente': vigente.fecha == fecha,
+        })
+
     @action(detail=True, methods=['post'])
     def duplicar(self, request, pk=None):
         """Duplicar una cotización existente"""
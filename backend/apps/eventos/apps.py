@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class EventosConfig(AppConfig):
+    """Eventos en vivo (SSE) de cambios en las sábanas"""
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.eventos'
+    verbose_name = 'Eventos'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()
@@ -0,0 +1,99 @@
+"""
+Canal de eventos entre procesos con PostgreSQL LISTEN/NOTIFY.
+
+`publicar` hace pg_notify dentro de la transacción en curso: PostgreSQL solo
+entrega la notificación si la transacción confirma. En cada proceso un único
+hilo (`Oyente`) mantiene una conexión dedicada con LISTEN y reparte cada
+notificación a las colas de los clientes SSE conectados a ese proceso.
+
+Con otro motor de base de datos (sqlite en desarrollo) el evento se reparte
+solo dentro del proceso, al confirmar la transacción.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+
+from django.db import connection, connections, transaction
+
+
+CANAL = 'bmm_eventos'
+TAMANO_COLA = 500
+REINTENTO_SEGUNDOS = 5
+
+logger = logging.getLogger(__name__)
+
+
+class Oyente:
+    """Reparte los eventos recibidos a las colas de los clientes de este proceso"""
+
+    def __init__(self):
+        self._colas = set()
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    def suscribir(self):
+        cola = queue.Queue(maxsize=TAMANO_COLA)
+        with self._lock:
+            self._colas.add(cola)
+            if connection.vendor == 'postgresql' and (self._hilo is None or not self._hilo.is_alive()):
+                self._hilo = threading.Thread(target=self._escuchar, name='eventos-listen', daemon=True)
+                self._hilo.start()
+        return cola
+
+    def cancelar(self, cola):
+        with self._lock:
+            self._colas.discard(cola)
+
+    def repartir(self, evento):
+        with self._lock:
+            colas = list(self._colas)
+        for cola in colas:
+            try:
+                cola.put_nowait(evento)
+            except queue.Full:
+                pass  # Cliente lento: pierde eventos, no frena a los demás
+
+    def _escuchar(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        parametros = connections['default'].get_connection_params()
+        while True:
+            conexion = None
+            try:
+                conexion = psycopg2.connect(**parametros)
+                conexion.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conexion.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CANAL}')
+                while True:
+                    if select.select([conexion], [], [], 60) == ([], [], []):
+                        continue
+                    conexion.poll()
+                    while conexion.notifies:
+                        notificacion = conexion.notifies.pop(0)
+                        try:
+                            self.repartir(json.loads(notificacion.payload))
+                        except ValueError:
+                            logger.warning('Evento con payload inválido: %r', notificacion.payload)
+            except Exception:
+                logger.exception('Conexión LISTEN perdida; reintentando en %s s', REINTENTO_SEGUNDOS)
+            finally:
+                if conexion is not None:
+                    conexion.close()
+            time.sleep(REINTENTO_SEGUNDOS)
+
+
+oyente = Oyente()
+
+
+def publicar(evento):
+    """Publica un evento (dict serializable, < 8000 bytes en JSON) a todos los procesos"""
+    if connection.vendor == 'postgresql':
+        payload = json.dumps(evento, separators=(',', ':'), default=str)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CANAL, payload])
+    else:
+        transaction.on_commit(lambda: oyente.repartir(evento))
@@ -0,0 +1,203 @@
+"""
+Eventos de cambio de las sábanas.
+
+Al cargar un registro se guarda una instantánea de sus campos (valores crudos
+de __dict__, sin disparar consultas en campos diferidos); al guardarlo se
+publican solo los nombres de los campos que cambiaron. Cada evento lleva el
+puerto y la sábana para que el stream SSE filtre por usuario (sábana None:
+el contenedor, común a todas las sábanas).
+
+QuerySet.update()/bulk_update()/bulk_create() no disparan señales: quien los
+usa llama a `publicar_lote()`, igual que llama a `invalidar()` para la caché.
+"""
+from collections import defaultdict
+
+from django.db.models.signals import post_init, post_save, post_delete
+
+from .canal import publicar
+
+
+_AUSENTE = object()
+TAMANO_LOTE_EVENTO = 500  # ids por evento: el payload de NOTIFY debe medir < 8000 bytes
+
+# Ticket.tipo_operacion -> nombre de sábana de Usuario.get_sabana_disponible()
+SABANA_TICKET = {
+    'revalidaciones': 'revalidacion',
+    'logistica': 'logistica',
+    'clasificacion': 'clasificacion',
+}
+
+
+def _puerto_contenedor(instancia):
+    """Puerto del contenedor de la instancia; sin consulta si ya está cargado"""
+    from apps.operaciones.models import Contenedor
+    if instancia._meta.get_field('contenedor').is_cached(instancia):
+        return instancia.contenedor.puerto_id
+    return Contenedor.objects.filter(pk=instancia.contenedor_id).values_list('puerto_id', flat=True).first()
+
+
+def _ticket(ticket):
+    return SABANA_TICKET.get(ticket.tipo_operacion), ticket.puerto_id
+
+
+def _operacion_logistica(operacion):
+    return 'logistica', _puerto_contenedor(operacion)
+
+
+def _operacion_revalidacion(operacion):
+    return 'revalidacion', _puerto_contenedor(operacion)
+
+
+def _clasificacion(clasificacion):
+    return 'clasificacion', _puerto_contenedor(clasificacion)
+
+
+def _contenedor(contenedor):
+    return None, contenedor.puerto_id
+
+
+def _demora(demora):
+    return 'revalidacion', _puerto_contenedor(demora)
+
+
+def _pago(pago):
+    # En el alta, PagoDeOperacion.save() deja en caché la operación que bloqueó
+    # (con su contenedor): no hace falta ninguna consulta
+    campo = pago._meta.get_field('operacion')
+    if campo.is_cached(pago):
+        operacion = campo.get_cached_value(pago)
+        if operacion is None:
+            return None, None
+        return UBICACION[operacion._meta.label](operacion)
+    # Si no, solo la ubicación de la operación, en una consulta
+    from django.contrib.contenttypes.models import ContentType
+    if pago.content_type_id is None:
+        return None, None
+    modelo = ContentType.objects.get_for_id(pago.content_type_id).model_class()
+    ubicacion = next(iter(UBICACION_LOTE[modelo._meta.label](modelo.objects.filter(pk=pago.object_id))), None)
+    return ubicacion[1:] if ubicacion else (None, None)
+
+
+# modelo -> función(instancia) -> (sábana, puerto_id)
+UBICACION = {
+    'operaciones.Ticket': _ticket,
+    'operaciones.OperacionLogistica': _operacion_logistica,
+    'operaciones.OperacionRevalidacion': _operacion_revalidacion,
+    'operaciones.Clasificacion': _clasificacion,
+    'operaciones.Contenedor': _contenedor,
+    'operaciones.Demora': _demora,
+    'pagos.Pago': _pago,
+}
+
+
+def _lote_ticket(queryset):
+    for pk, tipo, puerto in queryset.values_list('pk', 'tipo_operacion', 'puerto_id'):
+        yield pk, SABANA_TICKET.get(tipo), puerto
+
+
+def _lote_por_contenedor(sabana):
+    def ubicar(queryset):
+        for pk, puerto in queryset.values_list('pk', 'contenedor__puerto_id'):
+            yield pk, sabana, puerto
+    return ubicar
+
+
+def _lote_contenedor(queryset):
+    for pk, puerto in queryset.values_list('pk', 'puerto_id'):
+        yield pk, None, puerto
+
+
+# modelo -> función(queryset) -> [(pk, sábana, puerto_id), ...] en una consulta
+UBICACION_LOTE = {
+    'operaciones.Ticket': _lote_ticket,
+    'operaciones.OperacionLogistica': _lote_por_contenedor('logistica'),
+    'operaciones.OperacionRevalidacion': _lote_por_contenedor('revalidacion'),
+    'operaciones.Clasificacion': _lote_por_contenedor('clasificacion'),
+    'operaciones.Contenedor': _lote_contenedor,
+    'operaciones.Demora': _lote_por_contenedor('revalidacion'),
+}
+
+
+def publicar_lote(queryset, campos, accion='actualizado'):
+    """
+    Eventos de una escritura masiva sobre las filas de `queryset`: uno por
+    (sábana, puerto) con hasta TAMANO_LOTE_EVENTO ids en `ids` en lugar de
+    `id`. Se llama dentro de la transacción de la escritura (una consulta
+    para ubicar las filas); como publicar(), sale solo si confirma.
+    """
+    modelo = queryset.model
+    grupos = defaultdict(list)
+    for pk, sabana, puerto in UBICACION_LOTE[modelo._meta.label](queryset.order_by()):
+        grupos[(sabana, puerto)].append(pk)
+    for (sabana, puerto), ids in grupos.items():
+        for inicio in range(0, len(ids), TAMANO_LOTE_EVENTO):
+            publicar({
+                'ids': ids[inicio:inicio + TAMANO_LOTE_EVENTO],
+                'modelo': modelo._meta.model_name,
+                'accion': accion,
+                'campos': list(campos),
+                'sabana': sabana,
+                'puerto': puerto,
+            })
+
+
+def _valores(instance, campos):
+    return {campo: instance.__dict__.get(campo, _AUSENTE) for campo in campos}
+
+
+def _evento(sender, instance, accion, campos=None):
+    sabana, puerto = UBICACION[sender._meta.label](instance)
+    return {
+        'id': instance.pk,
+        'modelo': sender._meta.model_name,
+        'accion': accion,
+        'campos': campos or [],
+        'sabana': sabana,
+        'puerto': puerto,
+    }
+
+
+def _receivers(modelo):
+    # attname -> name (contenedor_id -> contenedor) para reportar nombres de la API
+    campos = {f.attname: f.name for f in modelo._meta.concrete_fields}
+    # Las fechas auto_now cambian en cada save(); solas no son un cambio
+    automaticos = {f.name for f in modelo._meta.concrete_fields if getattr(f, 'auto_now', False)}
+
+    def al_cargar(sender, instance, **kwargs):
+        instance._eventos_originales = _valores(instance, campos)
+
+    def al_guardar(sender, instance, created, raw=False, update_fields=None, **kwargs):
+        if raw:
+            return
+        actuales = _valores(instance, campos)
+        if created:
+            publicar(_evento(sender, instance, 'creado'))
+        else:
+            originales = getattr(instance, '_eventos_originales', {})
+            cambiados = [
+                nombre for attname, nombre in campos.items()
+                if actuales[attname] is not _AUSENTE
+                and originales.get(attname, _AUSENTE) != actuales[attname]
+                and nombre not in automaticos
+                and (update_fields is None or nombre in update_fields)
+            ]
+            if cambiados:
+                publicar(_evento(sender, instance, 'actualizado', cambiados))
+        instance._eventos_originales = actuales
+
+    def al_borrar(sender, instance, **kwargs):
+        publicar(_evento(sender, instance, 'eliminado'))
+
+    return al_cargar, al_guardar, al_borrar
+
+
+def conectar():
+    from django.apps import apps
+
+    for etiqueta in UBICACION:
+        modelo = apps.get_model(etiqueta)
+        al_cargar, al_guardar, al_borrar = _receivers(modelo)
+        uid = f'eventos_{etiqueta}'
+        post_init.connect(al_cargar, sender=modelo, weak=False, dispatch_uid=f'{uid}_init')
+        post_save.connect(al_guardar, sender=modelo, weak=False, dispatch_uid=f'{uid}_save')
+        post_delete.connect(al_borrar, sender=modelo, weak=False, dispatch_uid=f'{uid}_delete')
@@ -0,0 +1,239 @@
+import json
+import queue
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.eventos import signals
+from apps.eventos.canal import oyente
+from apps.eventos.views import EventosView, token_stream
+from apps.operaciones.models import OperacionLogistica
+from apps.operaciones.tests.datos import crear_catalogos, crear_contenedor, crear_logistica, crear_usuario
+from apps.pagos.models import CierreOperacion, Pago
+
+
+class CanalLocalMixin:
+    """
+    Usa el reparto dentro del proceso (el de sqlite) también con PostgreSQL:
+    la transacción de un TestCase no confirma y NOTIFY nunca se entregaría.
+    """
+
+    def setUp(self):
+        for ruta in ('apps.eventos.canal.connection', 'apps.eventos.views.connection'):
+            parche = mock.patch(ruta, vendor='sqlite')
+            parche.start()
+            self.addCleanup(parche.stop)
+        self.cola = oyente.suscribir()
+        self.addCleanup(oyente.cancelar, self.cola)
+
+    def eventos(self):
+        recibidos = []
+        while True:
+            try:
+                recibidos.append(self.cola.get_nowait())
+            except queue.Empty:
+                return recibidos
+
+
+class CamposCambiadosTests(CanalLocalMixin, TestCase):
+    """al_guardar publica solo los campos que cambiaron"""
+
+    def setUp(self):
+        super().setUp()
+        self.usuario = crear_usuario('admin')
+        self.catalogos = crear_catalogos()
+        self.contenedor = crear_contenedor(self.catalogos, self.usuario)
+        self.operacion = crear_logistica(self.contenedor, self.usuario, self.catalogos)
+        self.eventos()
+
+    def guardar(self, operacion, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            operacion.save(**kwargs)
+        return self.eventos()
+
+    def test_alta(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            operacion = crear_logistica(self.contenedor, self.usuario, self.catalogos, consecutivo=2)
+        self.assertEqual(self.eventos(), [{
+            'id': operacion.id, 'modelo': 'operacionlogistica', 'accion': 'creado', 'campos': [],
+            'sabana': 'logistica', 'puerto': self.catalogos['puerto'].id,
+        }])
+
+    def test_solo_los_campos_cambiados(self):
+        operacion = OperacionLogistica.objects.get(pk=self.operacion.pk)
+        operacion.importe = Decimal('250')
+        eventos = self.guardar(operacion)
+        self.assertEqual([(e['accion'], e['campos']) for e in eventos], [('actualizado', ['importe'])])
+
+    def test_sin_cambios_no_publica(self):
+        operacion = OperacionLogistica.objects.get(pk=self.operacion.pk)
+        self.assertEqual(self.guardar(operacion), [])
+        # Tras guardar, la instantánea se actualiza: un segundo save tampoco publica
+        operacion.importe = Decimal('250')
+        self.guardar(operacion)
+        self.assertEqual(self.guardar(operacion), [])
+
+    def test_update_fields_acota_los_campos(self):
+        operacion = OperacionLogistica.objects.get(pk=self.operacion.pk)
+        operacion.importe = Decimal('250')
+        operacion.pedimento = '123'
+        eventos = self.guardar(operacion, update_fields=['pedimento'])
+        self.assertEqual(eventos[0]['campos'], ['pedimento'])
+
+    def test_campos_diferidos_no_cuentan(self):
+        operacion = OperacionLogistica.objects.only('id', 'pedimento', 'contenedor').get(pk=self.operacion.pk)
+        operacion.pedimento = '123'
+        eventos = self.guardar(operacion, update_fields=['pedimento'])
+        self.assertEqual(eventos[0]['campos'], ['pedimento'])
+
+
+class EventosPagoTests(CanalLocalMixin, TestCase):
+    """El evento de un pago se ubica sin volver a cargar su operación"""
+
+    def setUp(self):
+        super().setUp()
+        self.usuario = crear_usuario('admin')
+        catalogos = crear_catalogos()
+        self.puerto = catalogos['puerto'].id
+        self.operacion = crear_logistica(crear_contenedor(catalogos, self.usuario), self.usuario, catalogos)
+        # Caché de ContentType caliente, como en un proceso ya en marcha
+        ContentType.objects.get_for_model(OperacionLogistica)
+
+    def test_alta_reutiliza_la_operacion_bloqueada(self):
+        pago = Pago(operacion=self.operacion, usuario=self.usuario, monto=Decimal('100'))
+        self.eventos()
+        # SAVEPOINT, bloqueo, INSERT, UPDATE de la operación, RELEASE
+        with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+            pago.save()
+        evento = next(e for e in self.eventos() if e['modelo'] == 'pago')
+        self.assertEqual((evento['sabana'], evento['puerto']), ('logistica', self.puerto))
+
+    def test_edicion_consulta_solo_la_ubicacion(self):
+        Pago.objects.create(operacion=self.operacion, usuario=self.usuario, monto=Decimal('100'))
+        pago = Pago.objects.get()
+        pago.observaciones = 'Corregido'
+        self.eventos()
+        # SAVEPOINT, UPDATE, ubicación de la operación, RELEASE
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            pago.save()
+        evento, = self.eventos()
+        self.assertEqual((evento['campos'], evento['sabana'], evento['puerto']), (['observaciones'], 'logistica', self.puerto))
+
+
+class EventosPorLoteTests(CanalLocalMixin, TestCase):
+    """Las escrituras masivas publican un evento por sábana, puerto y lote de ids"""
+
+    def setUp(self):
+        super().setUp()
+        usuario = crear_usuario('admin')
+        self.catalogos = crear_catalogos()
+        self.contenedor = crear_contenedor(self.catalogos, usuario)
+        otro = crear_contenedor(self.catalogos, usuario, numero='OTRO1234567', puerto=self.catalogos['otro_puerto'])
+        self.operaciones = [
+            crear_logistica(self.contenedor, usuario, self.catalogos, consecutivo=1),
+            crear_logistica(self.contenedor, usuario, self.catalogos, consecutivo=2),
+            crear_logistica(otro, usuario, self.catalogos, consecutivo=3),
+        ]
+        self.eventos()
+
+    def publicar(self, queryset, campos):
+        with self.captureOnCommitCallbacks(execute=True):
+            signals.publicar_lote(queryset, campos)
+        return self.eventos()
+
+    def test_agrupa_por_puerto(self):
+        eventos = self.publicar(OperacionLogistica.objects.all(), ['estatus'])
+        por_puerto = {e['puerto']: sorted(e['ids']) for e in eventos}
+        self.assertEqual(por_puerto, {
+            self.catalogos['puerto'].id: sorted(o.id for o in self.operaciones[:2]),
+            self.catalogos['otro_puerto'].id: [self.operaciones[2].id],
+        })
+        self.assertEqual({(e['sabana'], e['accion']) for e in eventos}, {('logistica', 'actualizado')})
+        self.assertTrue(all(e['campos'] == ['estatus'] for e in eventos))
+
+    def test_divide_los_ids_en_lotes(self):
+        with mock.patch.object(signals, 'TAMANO_LOTE_EVENTO', 1):
+            eventos = self.publicar(OperacionLogistica.objects.filter(contenedor=self.contenedor), ['estatus'])
+        self.assertEqual(sorted(len(e['ids']) for e in eventos), [1, 1])
+
+    def test_cascada_de_cierre(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            CierreOperacion.aplicar_cascada([self.contenedor.id])
+        eventos = {e['modelo']: e for e in self.eventos()}
+        self.assertEqual(eventos['contenedor']['ids'], [self.contenedor.id])
+        self.assertIsNone(eventos['contenedor']['sabana'])
+        self.assertEqual(sorted(eventos['operacionlogistica']['ids']), sorted(o.id for o in self.operaciones[:2]))
+
+
+@override_settings(EVENTOS_DURACION_SEGUNDOS=0.3, EVENTOS_LATIDO_SEGUNDOS=0.05)
+class FiltroStreamTests(CanalLocalMixin, TestCase):
+    """El stream solo entrega eventos de las sábanas y el puerto del usuario"""
+
+    def setUp(self):
+        super().setUp()
+        catalogos = crear_catalogos()
+        self.puerto = catalogos['puerto'].id
+        self.otro_puerto = catalogos['otro_puerto'].id
+        self.usuario_logistica = crear_usuario('logistica', puerto=catalogos['puerto'])
+        self.enviados = [
+            {'id': 1, 'sabana': 'logistica', 'puerto': self.puerto},
+            {'id': 2, 'sabana': 'logistica', 'puerto': self.otro_puerto},
+            {'id': 3, 'sabana': 'revalidacion', 'puerto': self.puerto},
+            {'id': 4, 'sabana': 'clasificacion', 'puerto': self.otro_puerto},
+            {'id': 5, 'sabana': None, 'puerto': self.puerto},
+        ]
+
+    def recibidos(self, usuario, parametros=''):
+        request = APIRequestFactory().get(f'/api/eventos/stream/{parametros}', HTTP_ACCEPT='text/event-stream')
+        force_authenticate(request, user=usuario)
+        respuesta = EventosView.as_view()(request)
+        stream = iter(respuesta.streaming_content)
+        next(stream)  # retry: ya está suscrito
+        for evento in self.enviados:
+            oyente.repartir({'modelo': 'prueba', 'accion': 'actualizado', 'campos': [], **evento})
+        datos = b''.join(stream).decode()
+        return [
+            json.loads(linea.removeprefix('data: '))['id']
+            for linea in datos.splitlines() if linea.startswith('data: ')
+        ]
+
+    def test_usuario_con_puerto_solo_ve_su_sabana_y_puerto(self):
+        self.assertEqual(self.recibidos(self.usuario_logistica), [1, 5])
+
+    def test_admin_ve_todo_y_puede_acotar_sabanas(self):
+        admin = crear_usuario('admin')
+        self.assertEqual(self.recibidos(admin), [1, 2, 3, 4, 5])
+        self.assertEqual(self.recibidos(admin, '?sabanas=revalidacion,clasificacion'), [3, 4, 5])
+        self.assertEqual(self.recibidos(admin, '?sabanas=ninguna'), [])
+
+
+class TokenStreamTests(APITestCase):
+    """?token= solo acepta el token corto del stream, no el access token"""
+
+    def setUp(self):
+        self.usuario = crear_usuario('admin')
+
+    def abrir(self, token):
+        # Solo el estatus: el stream no se consume (ni se cierra la respuesta,
+        # que cerraría la conexión de la prueba)
+        return self.client.get('/api/eventos/stream/', {'token': token}).status_code
+
+    def test_token_del_stream(self):
+        self.client.force_authenticate(self.usuario)
+        token = self.client.post('/api/eventos/token/').data['token']
+        self.client.force_authenticate(None)
+        self.assertEqual(self.abrir(token), 200)
+
+    def test_access_token_en_la_url_se_rechaza(self):
+        self.assertEqual(self.abrir(str(AccessToken.for_user(self.usuario))), 401)
+
+    @override_settings(EVENTOS_TOKEN_SEGUNDOS=-1)
+    def test_token_expirado(self):
+        self.assertEqual(self.abrir(token_stream(self.usuario)), 401)
+
+    def test_pedir_token_requiere_autenticacion(self):
+        self.assertEqual(self.client.post('/api/eventos/token/').status_code, 401)
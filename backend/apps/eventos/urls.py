@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import EventosView, TokenStreamView
+
+
+urlpatterns = [
+    path('stream/', EventosView.as_view(), name='eventos-stream'),
+    path('token/', TokenStreamView.as_view(), name='eventos-token'),
+]
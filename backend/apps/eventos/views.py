@@ -0,0 +1,123 @@
+import json
+import queue
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import connection
+from django.http import StreamingHttpResponse
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .canal import oyente
+
+
+SAL_TOKEN = 'apps.eventos.stream'
+
+
+def token_stream(usuario):
+    """Token firmado que solo sirve para abrir el stream (ver TokenStreamAuthentication)"""
+    return signing.dumps(usuario.pk, salt=SAL_TOKEN)
+
+
+class TokenStreamAuthentication(BaseAuthentication):
+    """
+    EventSource no permite enviar encabezados y lo que va en la URL termina
+    en los logs: en lugar del access token, ?token= lleva un token de
+    TokenStreamView que solo vale para el stream y caduca en
+    EVENTOS_TOKEN_SEGUNDOS.
+    """
+
+    def authenticate(self, request):
+        token = request.query_params.get('token')
+        if not token:
+            return None
+        try:
+            usuario_id = signing.loads(token, salt=SAL_TOKEN, max_age=settings.EVENTOS_TOKEN_SEGUNDOS)
+        except signing.BadSignature:
+            raise AuthenticationFailed('Token de eventos inválido o expirado')
+        usuario = get_user_model().objects.filter(pk=usuario_id, is_active=True).first()
+        if usuario is None:
+            raise AuthenticationFailed('Token de eventos inválido o expirado')
+        return usuario, None
+
+
+class TokenStreamView(APIView):
+    """
+    POST (con el access token en Authorization) -> {token, expira_en}.
+    El cliente pide uno antes de abrir el EventSource y otro al reconectar
+    si el anterior ya caducó.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({'token': token_stream(request.user), 'expira_en': settings.EVENTOS_TOKEN_SEGUNDOS})
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Solo para que la negociación de contenido acepte Accept: text/event-stream"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f'event: error\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+class EventosView(APIView):
+    """
+    Stream SSE con los cambios de las sábanas que el usuario puede ver
+    (su puerto y Usuario.get_sabana_disponible()); ?sabanas=logistica,revalidacion
+    acota más. Cada evento: {id, modelo, accion, campos, sabana, puerto}; las
+    escrituras masivas llegan con `ids` (lista) en lugar de `id`. Los eventos
+    de contenedores (sábana None) llegan a todas las sábanas.
+
+    La conexión se cierra tras EVENTOS_DURACION_SEGUNDOS; EventSource se
+    reconecta solo (retry) y así no se retiene un worker indefinidamente.
+    Mientras dura no retiene conexión a la base de datos.
+    """
+    authentication_classes = [JWTAuthentication, TokenStreamAuthentication]
+    renderer_classes = [EventStreamRenderer]
+
+    def get(self, request):
+        usuario = request.user
+        sabanas = set(usuario.get_sabana_disponible())
+        solicitadas = request.query_params.get('sabanas')
+        if solicitadas:
+            sabanas &= {s.strip() for s in solicitadas.split(',')}
+
+        def visible(evento):
+            en_sabana = evento['sabana'] in sabanas if evento['sabana'] is not None else bool(sabanas)
+            return en_sabana and usuario.puede_ver_operacion_por_puerto(evento['puerto'])
+
+        response = StreamingHttpResponse(
+            self._stream(visible), content_type='text/event-stream; charset=utf-8'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx: no acumular el stream
+        return response
+
+    def _stream(self, visible):
+        # El stream no consulta la base: se libera la conexión de la petición
+        # en lugar de retenerla hasta que se cierre el stream
+        connection.close()
+        latido = settings.EVENTOS_LATIDO_SEGUNDOS
+        limite = time.monotonic() + settings.EVENTOS_DURACION_SEGUNDOS
+        cola = oyente.suscribir()
+        try:
+            yield f'retry: {settings.EVENTOS_REINTENTO_MS}\n\n'
+            while time.monotonic() < limite:
+                try:
+                    evento = cola.get(timeout=latido)
+                except queue.Empty:
+                    yield ': ping\n\n'  # Mantiene viva la conexión en proxies
+                    continue
+                if visible(evento):
+                    yield f"event: cambio\ndata: {json.dumps(evento, separators=(',', ':'))}\n\n"
+        finally:
+            oyente.cancelar(cola)
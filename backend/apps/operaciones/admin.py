@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Ticket
+from .models import Ticket, TransicionSemaforo
 
 
 @admin.register(Ticket)
@@ -8,7 +8,7 @@ class TicketAdmin(admin.ModelAdmin):
         'comentarios', 'empresa', 'ejecutivo', 'importe',
         'estatus', 'eta', 'semaforo', 'fecha_alta'
     ]
-    list_filter = ['estatus', 'empresa', 'concepto', 'ejecutivo', 'divisa']
+    list_filter = ['estatus', 'semaforo', 'empresa', 'concepto', 'ejecutivo', 'divisa']
     search_fields = ['contenedor', 'bl_master', 'comentarios', 'pedimento']
     readonly_fields = ['comentarios', 'consecutivo', 'fecha_creacion', 'fecha_actualizacion']
     date_hierarchy = 'fecha_alta'
@@ -38,3 +38,11 @@ class TicketAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(TransicionSemaforo)
+class TransicionSemaforoAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'contenedor', 'ticket', 'anterior', 'nuevo']
+    list_filter = ['nuevo', 'anterior']
+    raw_id_fields = ['contenedor', 'ticket']
+    date_hierarchy = 'fecha'
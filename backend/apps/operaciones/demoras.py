@@ -0,0 +1,288 @@
+"""
+Cálculo nocturno de demoras.
+
+Recalcula en una sola pasada las demoras de todos los contenedores activos
+que ya agotaron sus días libres: una consulta para contenedores, una para
+las demoras activas y otra para las tarifas; el cálculo se hace en memoria
+y solo se escriben (bulk_create / bulk_update) las filas que cambiaron.
+
+Tarifas: `catalogos.TarifaDemora` por naviera, escalonadas por día de demora.
+Si la naviera no tiene tarifa se respeta el costo diario capturado a mano en
+la demora existente (tarifa plana); si tampoco hay demora, se omite.
+
+`pronosticar_demoras` proyecta con las mismas reglas el costo diario de los
+próximos N días para toda la flota activa.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.utils import timezone
+
+from apps.catalogos.models import TarifaDemora
+from apps.core.cache import invalidar
+from apps.eventos.signals import publicar_lote
+from .models import Contenedor, Demora
+
+
+CAMPOS_CALCULADOS = [
+    'naviera_id', 'fecha_inicio_demora', 'fecha_corte',
+    'dias_demora', 'costo_diario', 'costo_total', 'divisa',
+]
+TAMANO_LOTE = 500
+
+
+def tramos_por_naviera():
+    """{naviera_id: [(dia_desde, costo_diario, moneda), ...]} ordenados por día"""
+    tramos = defaultdict(list)
+    consulta = (
+        TarifaDemora.objects.filter(activo=True)
+        .order_by('naviera_id', 'dia_desde')
+        .values_list('naviera_id', 'dia_desde', 'costo_diario', 'moneda')
+    )
+    for naviera_id, desde, costo, moneda in consulta:
+        tramos[naviera_id].append((desde, costo, moneda))
+    return dict(tramos)
+
+
+def costo_acumulado(dias, tramos):
+    """
+    Costo de `dias` días de demora con tarifa escalonada.
+    Cada tramo aplica desde su día hasta el anterior al siguiente tramo;
+    los días previos al primer tramo no se cobran.
+    Devuelve (costo_total, costo_diario_vigente).
+    """
+    total = Decimal('0')
+    diario = Decimal('0')
+    for i, (desde, costo, _) in enumerate(tramos):
+        if dias < desde:
+            break
+        fin = dias if i + 1 == len(tramos) else min(dias, tramos[i + 1][0] - 1)
+        total += costo * (fin - desde + 1)
+        diario = costo
+    return total, diario
+
+
+def _demoras_activas():
+    """Demora activa más reciente por contenedor activo"""
+    demoras = {}
+    consulta = (
+        Demora.objects.filter(estatus=Demora.Estatus.ACTIVO, contenedor__estatus=Contenedor.Estatus.ACTIVO)
+        .only('id', 'contenedor_id', *CAMPOS_CALCULADOS)
+        .order_by('contenedor_id', '-fecha_inicio_demora', '-id')
+    )
+    for demora in consulta:
+        demoras.setdefault(demora.contenedor_id, demora)
+    return demoras
+
+
+def calcular_demoras(hoy=None, ejecutar=True):
+    """
+    Recalcula las demoras al día `hoy` (default: hoy).
+    Con ejecutar=False solo cuenta lo que cambiaría.
+    """
+    hoy = hoy or date.today()
+    tramos = tramos_por_naviera()
+    existentes = _demoras_activas()
+    contenedores = (
+        Contenedor.objects.filter(
+            estatus=Contenedor.Estatus.ACTIVO,
+            eta__isnull=False, eta__lt=hoy,
+            naviera__isnull=False,
+        )
+        .values_list('id', 'naviera_id', 'eta', 'dias_libres')
+        .iterator(chunk_size=2000)
+    )
+
+    resumen = {'evaluados': 0, 'creadas': 0, 'actualizadas': 0, 'sin_cambios': 0, 'sin_tarifa': 0}
+    nuevas = []
+    cambiadas = []
+    ahora = timezone.now()
+
+    for contenedor_id, naviera_id, eta, dias_libres in contenedores:
+        fin_libres = eta + timedelta(days=dias_libres)
+        dias = (hoy - fin_libres).days
+        if dias <= 0:
+            continue
+        resumen['evaluados'] += 1
+        demora = existentes.get(contenedor_id)
+
+        if naviera_id in tramos:
+            costo_total, costo_diario = costo_acumulado(dias, tramos[naviera_id])
+            divisa = tramos[naviera_id][0][2]
+        elif demora is not None:
+            costo_diario = demora.costo_diario
+            costo_total = costo_diario * dias
+            divisa = demora.divisa
+        else:
+            resumen['sin_tarifa'] += 1
+            continue
+
+        valores = {
+            'naviera_id': naviera_id,
+            'fecha_inicio_demora': fin_libres + timedelta(days=1),
+            'fecha_corte': hoy,
+            'dias_demora': dias,
+            'costo_diario': costo_diario,
+            'costo_total': costo_total,
+            'divisa': divisa,
+        }
+        if demora is None:
+            nuevas.append(Demora(contenedor_id=contenedor_id, **valores))
+            continue
+        if all(getattr(demora, campo) == valor for campo, valor in valores.items()):
+            resumen['sin_cambios'] += 1
+            continue
+        for campo, valor in valores.items():
+            setattr(demora, campo, valor)
+        demora.fecha_actualizacion = ahora
+        cambiadas.append(demora)
+
+    resumen['creadas'] = len(nuevas)
+    resumen['actualizadas'] = len(cambiadas)
+    if ejecutar and (nuevas or cambiadas):
+        campos = [campo.removesuffix('_id') for campo in CAMPOS_CALCULADOS]
+        with transaction.atomic():
+            Demora.objects.bulk_create(nuevas, batch_size=TAMANO_LOTE)
+            Demora.objects.bulk_update(cambiadas, campos + ['fecha_actualizacion'], batch_size=TAMANO_LOTE)
+            # bulk_create/bulk_update no disparan señales
+            if nuevas:
+                publicar_lote(Demora.objects.filter(pk__in=[d.pk for d in nuevas]), [], accion='creado')
+            if cambiadas:
+                publicar_lote(Demora.objects.filter(pk__in=[d.pk for d in cambiadas]), campos)
+        # El pronóstico de demoras se cachea en el alcance de contenedores
+        invalidar('contenedores')
+    return resumen
+
+
+# ============ PRONÓSTICO ============
+
+def _segmentos(tramos, j_desde, j_hasta):
+    """
+    Tramos de tarifa que caen en los días de demora [j_desde, j_hasta]:
+    [(desde, hasta, costo_diario), ...] ya recortados al intervalo.
+    """
+    segmentos = []
+    for i, (desde, costo, _) in enumerate(tramos):
+        hasta = j_hasta if i + 1 == len(tramos) else tramos[i + 1][0] - 1
+        a, b = max(desde, j_desde, 1), min(hasta, j_hasta)
+        if a <= b:
+            segmentos.append((a, b, costo))
+    return segmentos
+
+
+def _acumular(grupos, clave, nombre, moneda, importe, contenedores):
+    grupo = grupos.setdefault(clave, {'id': clave, 'nombre': nombre, 'contenedores': 0, 'costo': defaultdict(Decimal)})
+    grupo['contenedores'] += contenedores
+    grupo['costo'][moneda] += importe
+
+
+def _a_float(importes):
+    return {moneda: float(valor) for moneda, valor in sorted(importes.items())}
+
+
+def _lista_grupos(grupos):
+    filas = sorted(grupos.values(), key=lambda g: -sum(g['costo'].values()))
+    return [{**g, 'costo': _a_float(g['costo'])} for g in filas]
+
+
+def pronosticar_demoras(contenedores, dias, hoy=None):
+    """
+    Costo de demora proyectado día por día para los próximos `dias` días
+    (hoy+1 .. hoy+dias) si ningún contenedor activo se mueve.
+
+    `contenedores` es un queryset de Contenedor (p. ej. ya filtrado por puerto).
+    La flota se agrupa en SQL por (naviera, puerto, cliente, eta, días libres):
+    los contenedores de un mismo grupo tienen exactamente la misma proyección,
+    así que se calcula una vez por grupo. La tarifa es constante dentro de cada
+    tramo, de modo que cada grupo aporta unos cuantos segmentos a un arreglo de
+    diferencias por moneda y la serie diaria sale de una sola suma acumulada.
+    """
+    hoy = hoy or date.today()
+    tramos = tramos_por_naviera()
+    demora_activa = Demora.objects.filter(
+        contenedor=OuterRef('pk'), estatus=Demora.Estatus.ACTIVO
+    ).order_by('-fecha_inicio_demora', '-id')
+    flota = (
+        contenedores.order_by()
+        .filter(
+            estatus=Contenedor.Estatus.ACTIVO,
+            eta__isnull=False, eta__lt=hoy + timedelta(days=dias),
+            naviera__isnull=False,
+        )
+        .annotate(
+            tarifa_plana=Subquery(demora_activa.values('costo_diario')[:1]),
+            divisa_plana=Subquery(demora_activa.values('divisa')[:1]),
+        )
+        .values(
+            'naviera_id', 'naviera__nombre', 'puerto_id', 'puerto__nombre',
+            'cliente_id', 'cliente__nombre', 'eta', 'dias_libres',
+            'tarifa_plana', 'divisa_plana',
+        )
+        .annotate(cantidad=Count('id'))
+    )
+
+    # diferencias[moneda][k]: cambio del costo diario en el día k (1..dias)
+    diferencias = defaultdict(lambda: [Decimal('0')] * (dias + 2))
+    en_demora = [0] * (dias + 2)
+    totales = defaultdict(Decimal)
+    por_puerto, por_naviera, por_cliente = {}, {}, {}
+    sin_tarifa = 0
+
+    for grupo in flota:
+        cantidad = grupo['cantidad']
+        # Día de demora que corresponde a hoy (negativo si aún tiene días libres)
+        j_hoy = (hoy - grupo['eta']).days - grupo['dias_libres']
+        if j_hoy + dias < 1:
+            continue
+
+        tramos_grupo = tramos.get(grupo['naviera_id'])
+        if tramos_grupo is None:
+            if grupo['tarifa_plana'] is None:
+                sin_tarifa += cantidad
+                continue
+            tramos_grupo = [(1, grupo['tarifa_plana'], grupo['divisa_plana'])]
+        moneda = tramos_grupo[0][2]
+
+        k_inicio = max(1, 1 - j_hoy)
+        en_demora[k_inicio] += cantidad
+        en_demora[dias + 1] -= cantidad
+
+        importe = Decimal('0')
+        for a, b, costo in _segmentos(tramos_grupo, j_hoy + 1, j_hoy + dias):
+            diario = costo * cantidad
+            diferencias[moneda][a - j_hoy] += diario
+            diferencias[moneda][b - j_hoy + 1] -= diario
+            importe += diario * (b - a + 1)
+        totales[moneda] += importe
+
+        _acumular(por_puerto, grupo['puerto_id'], grupo['puerto__nombre'], moneda, importe, cantidad)
+        _acumular(por_naviera, grupo['naviera_id'], grupo['naviera__nombre'], moneda, importe, cantidad)
+        _acumular(por_cliente, grupo['cliente_id'], grupo['cliente__nombre'], moneda, importe, cantidad)
+
+    serie = []
+    acumulado = defaultdict(Decimal)
+    contenedores_dia = 0
+    for k in range(1, dias + 1):
+        contenedores_dia += en_demora[k]
+        for moneda, deltas in diferencias.items():
+            acumulado[moneda] += deltas[k]
+        serie.append({
+            'fecha': hoy + timedelta(days=k),
+            'contenedores_en_demora': contenedores_dia,
+            'costo': _a_float(acumulado),
+        })
+
+    return {
+        'desde': hoy + timedelta(days=1),
+        'hasta': hoy + timedelta(days=dias),
+        'dias': dias,
+        'totales': _a_float(totales),
+        'serie': serie,
+        'por_puerto': _lista_grupos(por_puerto),
+        'por_naviera': _lista_grupos(por_naviera),
+        'por_cliente': _lista_grupos(por_cliente),
+        'sin_tarifa': sin_tarifa,
+    }
@@ -0,0 +1,103 @@
+"""
+Detección de tickets capturados dos veces.
+
+Un ticket es posible duplicado de otro con la misma huella (contenedor o BL,
+concepto e importe; ver Ticket.calcular_huella) y fecha de alta a
+±VENTANA_DIAS. La consulta usa el índice (huella, fecha_alta).
+
+Al capturar, los serializers rechazan el alta si hay posibles duplicados,
+salvo que el usuario la confirme con confirmar_duplicado=true.
+
+El historial se revisa con el comando detectar_duplicados: `calcular_huellas`
+llena las huellas faltantes por lotes de ids y `agrupar_duplicados` recorre
+las filas ordenadas por huella (el índice) sin cargarlas todas en memoria.
+"""
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from rest_framework import serializers
+
+from .models import Ticket
+
+
+VENTANA_DIAS = 7
+LIMITE = 5
+TAMANO_LOTE = 1000
+
+
+def tickets_duplicados(ticket, limite=LIMITE):
+    """Ids de los tickets con la misma huella en la ventana de fechas del ticket"""
+    huella = ticket.calcular_huella()
+    if not huella or not ticket.fecha_alta:
+        return []
+    margen = timedelta(days=VENTANA_DIAS)
+    queryset = Ticket.objects.filter(
+        huella=huella, fecha_alta__range=(ticket.fecha_alta - margen, ticket.fecha_alta + margen)
+    )
+    if ticket.pk:
+        queryset = queryset.exclude(pk=ticket.pk)
+    return list(queryset.order_by('-fecha_alta', '-id').values_list('id', flat=True)[:limite])
+
+
+def validar_duplicados(duplicados, confirmado, mensaje):
+    """Rechaza la captura si hay posibles duplicados y el usuario no la confirmó"""
+    if duplicados and not confirmado:
+        raise serializers.ValidationError(
+            {'confirmar_duplicado': mensaje, 'duplicados': duplicados},
+            code='posible_duplicado'
+        )
+
+
+# ============ HISTORIAL ============
+
+def calcular_huellas(modelo, todas=False, tamano_lote=TAMANO_LOTE):
+    """
+    Calcula la huella de los registros sin huella (todas=True: de todos) por
+    lotes de ids, con bulk_update. Devuelve cuántos registros cambiaron.
+    """
+    queryset = modelo._base_manager.order_by('pk').only('pk', 'huella', *modelo.campos_huella)
+    if not todas:
+        queryset = queryset.filter(huella='')
+    ultimo = 0
+    actualizados = 0
+    while lote := list(queryset.filter(pk__gt=ultimo)[:tamano_lote]):
+        ultimo = lote[-1].pk
+        cambiados = []
+        for registro in lote:
+            huella = registro.calcular_huella()
+            if huella != registro.huella:
+                registro.huella = huella
+                cambiados.append(registro)
+        modelo._base_manager.bulk_update(cambiados, ['huella'])
+        actualizados += len(cambiados)
+    return actualizados
+
+
+def filas_huella(queryset, campo_fecha, etiqueta):
+    """(huella, 'etiqueta:id', fecha) de los registros con huella, ordenados por huella y fecha"""
+    filas = (
+        queryset.exclude(huella='').order_by('huella', campo_fecha, 'id')
+        .values_list('huella', 'id', campo_fecha)
+        .iterator(chunk_size=TAMANO_LOTE)
+    )
+    for huella, registro_id, fecha in filas:
+        yield huella, f'{etiqueta}:{registro_id}', fecha
+
+
+def agrupar_duplicados(filas, ventana_dias=None):
+    """
+    `filas`: (huella, etiqueta, fecha) ordenadas por huella y fecha. Genera
+    (huella, [(etiqueta, fecha), ...]) por grupo de dos o más; con
+    ventana_dias, un grupo se corta donde dos fechas seguidas se separan más.
+    """
+    for huella, filas_grupo in groupby(filas, key=itemgetter(0)):
+        grupo = []
+        for _, etiqueta, fecha in filas_grupo:
+            if grupo and ventana_dias is not None and (fecha - grupo[-1][1]).days > ventana_dias:
+                if len(grupo) > 1:
+                    yield huella, grupo
+                grupo = []
+            grupo.append((etiqueta, fecha))
+        if len(grupo) > 1:
+            yield huella, grupo
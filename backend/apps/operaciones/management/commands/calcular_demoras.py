@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalogos.tipo_cambio import parsear_fecha
+from apps.operaciones.demoras import calcular_demoras
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula días y costo de demoras de los contenedores activos que ya '
+        'agotaron sus días libres (tarifas escalonadas por naviera). '
+        'Se ejecuta cada noche desde `tareas_nocturnas` o directamente por cron, p. ej.: '
+        '30 0 * * * python manage.py calcular_demoras'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Fecha de corte (dd/mm/aaaa o aaaa-mm-dd). Default: hoy')
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra cuántas filas cambiarían')
+
+    def handle(self, *args, **options):
+        try:
+            hoy = parsear_fecha(options['fecha']) if options['fecha'] else date.today()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        resumen = calcular_demoras(hoy, ejecutar=not options['dry_run'])
+        prefijo = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefijo}✓ Demoras al {hoy:%d/%m/%Y}: {resumen['evaluados']} contenedores en demora, "
+            f"{resumen['creadas']} creadas, {resumen['actualizadas']} actualizadas, "
+            f"{resumen['sin_cambios']} sin cambios"
+        ))
+        if resumen['sin_tarifa']:
+            self.stdout.write(self.style.WARNING(
+                f"{resumen['sin_tarifa']} contenedores en demora sin tarifa de naviera ni demora capturada"
+            ))
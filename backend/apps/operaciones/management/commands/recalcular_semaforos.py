@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.operaciones.semaforo import recalcular_semaforos
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula el semáforo almacenado de contenedores y tickets cuyo umbral '
+        'se cruzó (semaforo_cambia <= hoy) y registra las transiciones. '
+        'Se ejecuta pasada la medianoche desde `tareas_nocturnas`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help='Recalcular todos los registros, no solo los que vencen hoy')
+
+    def handle(self, *args, **options):
+        resumen = recalcular_semaforos(todos=options['todos'])
+        for modelo, (actualizados, transiciones) in resumen.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {modelo}: {actualizados} actualizados, {transiciones} cambios de semáforo'
+            ))
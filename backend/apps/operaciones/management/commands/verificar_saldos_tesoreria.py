@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.operaciones.models import SaldoCuenta, SaldoTesoreria
+from apps.operaciones.tesoreria import verificar_cuenta
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula la cadena de saldos de tesorería de cada cuenta (orden fecha, id) '
+        'y la compara con saldo_anterior/saldo_nuevo y el saldo actual guardados. '
+        'Con --corregir reescribe lo que no coincide.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cuenta', help='Solo esta cuenta origen')
+        parser.add_argument('--corregir', action='store_true', help='Reconstruye la cadena y el saldo actual')
+
+    def handle(self, *args, **options):
+        if options['cuenta']:
+            cuentas = [options['cuenta']]
+        else:
+            cuentas = sorted(
+                set(SaldoTesoreria.objects.order_by().values_list('cuenta_origen', flat=True).distinct())
+                | set(SaldoCuenta.objects.values_list('cuenta_origen', flat=True))
+            )
+
+        con_errores = 0
+        for cuenta in cuentas:
+            resumen = verificar_cuenta(cuenta, corregir=options['corregir'])
+            if not resumen['corregidos'] and resumen['saldo_correcto']:
+                self.stdout.write(
+                    f"✓ {cuenta}: {resumen['movimientos']} movimientos, saldo ${resumen['saldo_final']:,.2f}"
+                )
+                continue
+            con_errores += 1
+            verbo = 'corregidos' if options['corregir'] else 'con saldo incorrecto'
+            self.stdout.write(self.style.WARNING(
+                f"{cuenta}: {resumen['corregidos']} de {resumen['movimientos']} movimientos {verbo}; "
+                f"saldo actual guardado {resumen['saldo_guardado']}, calculado {resumen['saldo_final']}"
+            ))
+
+        if con_errores and not options['corregir']:
+            raise CommandError(f'{con_errores} cuentas con la cadena de saldos inconsistente (usar --corregir)')
+        self.stdout.write(self.style.SUCCESS(f'✓ {len(cuentas)} cuentas verificadas'))
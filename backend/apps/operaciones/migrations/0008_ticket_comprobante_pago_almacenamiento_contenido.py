@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:10
+
+import apps.archivos.almacenamiento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operaciones', '0007_ticket_apertura_expediente_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='comprobante_pago',
+            field=models.FileField(blank=True, help_text='Archivo PDF o imagen del comprobante de pago', null=True, storage=apps.archivos.almacenamiento.almacenamiento_contenido, upload_to='comprobantes/tickets/%Y/%m/', verbose_name='Comprobante de pago'),
+        ),
+        migrations.AlterField(
+            model_name='documento',
+            name='archivo',
+            field=models.FileField(storage=apps.archivos.almacenamiento.almacenamiento_contenido, upload_to='documentos/%Y/%m/', verbose_name='Archivo'),
+        ),
+        migrations.AlterField(
+            model_name='garantia',
+            name='comprobante',
+            field=models.FileField(blank=True, null=True, storage=apps.archivos.almacenamiento.almacenamiento_contenido, upload_to='garantias/%Y/%m/', verbose_name='Comprobante de pago'),
+        ),
+    ]
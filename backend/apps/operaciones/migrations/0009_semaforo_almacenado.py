@@ -0,0 +1,67 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def calcular_semaforos(apps, schema_editor):
+    """Valor inicial del semáforo almacenado para los registros existentes"""
+    from apps.operaciones.semaforo import calcular
+
+    for nombre in ('Contenedor', 'Ticket'):
+        modelo = apps.get_model('operaciones', nombre)
+        registros = []
+        for obj in modelo.objects.only('id', 'eta', 'dias_libres').iterator(chunk_size=2000):
+            obj.semaforo, obj.semaforo_cambia = calcular(obj.eta, obj.dias_libres)
+            registros.append(obj)
+        modelo.objects.bulk_update(registros, ['semaforo', 'semaforo_cambia'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operaciones', '0008_ticket_comprobante_pago_almacenamiento_contenido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contenedor',
+            name='semaforo',
+            field=models.CharField(choices=[('azul', 'Azul (pre-alerta)'), ('verde', 'Verde (a tiempo)'), ('amarillo', 'Amarillo (preventivo)'), ('rojo', 'Rojo (crítico)'), ('vencido', 'Vencido')], db_index=True, default='verde', editable=False, max_length=10, verbose_name='Semáforo'),
+        ),
+        migrations.AddField(
+            model_name='contenedor',
+            name='semaforo_cambia',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True, verbose_name='Próximo cambio de semáforo'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='semaforo',
+            field=models.CharField(choices=[('azul', 'Azul (pre-alerta)'), ('verde', 'Verde (a tiempo)'), ('amarillo', 'Amarillo (preventivo)'), ('rojo', 'Rojo (crítico)'), ('vencido', 'Vencido')], db_index=True, default='verde', editable=False, max_length=10, verbose_name='Semáforo'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='semaforo_cambia',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True, verbose_name='Próximo cambio de semáforo'),
+        ),
+        migrations.CreateModel(
+            name='TransicionSemaforo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anterior', models.CharField(blank=True, choices=[('azul', 'Azul (pre-alerta)'), ('verde', 'Verde (a tiempo)'), ('amarillo', 'Amarillo (preventivo)'), ('rojo', 'Rojo (crítico)'), ('vencido', 'Vencido')], max_length=10, verbose_name='Semáforo anterior')),
+                ('nuevo', models.CharField(choices=[('azul', 'Azul (pre-alerta)'), ('verde', 'Verde (a tiempo)'), ('amarillo', 'Amarillo (preventivo)'), ('rojo', 'Rojo (crítico)'), ('vencido', 'Vencido')], max_length=10, verbose_name='Semáforo nuevo')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('fecha_registro', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de registro')),
+                ('contenedor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transiciones_semaforo', to='operaciones.contenedor', verbose_name='Contenedor')),
+                ('ticket', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transiciones_semaforo', to='operaciones.ticket', verbose_name='Ticket')),
+            ],
+            options={
+                'verbose_name': 'Transición de semáforo',
+                'verbose_name_plural': 'Transiciones de semáforo',
+                'db_table': 'transiciones_semaforo',
+                'ordering': ['-fecha', '-id'],
+                'indexes': [models.Index(fields=['fecha', 'nuevo'], name='transicion_fecha_nuevo_idx')],
+            },
+        ),
+        migrations.RunPython(calcular_semaforos, migrations.RunPython.noop),
+    ]
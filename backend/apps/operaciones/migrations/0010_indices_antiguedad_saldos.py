@@ -0,0 +1,25 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operaciones', '0009_semaforo_almacenado'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='operacionlogistica',
+            index=models.Index(fields=['estatus', 'fecha'], name='operaciones_estatus_a8768f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='operacionrevalidacion',
+            index=models.Index(fields=['estatus', 'fecha'], name='operaciones_estatus_cba096_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['estatus', 'fecha_alta'], name='tickets_estatus_060a8e_idx'),
+        ),
+    ]
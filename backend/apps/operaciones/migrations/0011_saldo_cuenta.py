@@ -0,0 +1,49 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:35
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def calcular_saldos_actuales(apps, schema_editor):
+    """Saldo actual por cuenta = suma de sus movimientos con signo"""
+    from django.db.models import Max, Sum
+    from apps.operaciones.tesoreria import importe_con_signo
+
+    SaldoTesoreria = apps.get_model('operaciones', 'SaldoTesoreria')
+    SaldoCuenta = apps.get_model('operaciones', 'SaldoCuenta')
+    cuentas = (
+        SaldoTesoreria.objects.order_by().values('cuenta_origen')
+        .annotate(saldo=Sum(importe_con_signo()), ultima_fecha=Max('fecha'))
+    )
+    SaldoCuenta.objects.bulk_create([SaldoCuenta(**cuenta) for cuenta in cuentas], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operaciones', '0010_indices_antiguedad_saldos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoCuenta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cuenta_origen', models.CharField(max_length=100, unique=True, verbose_name='Cuenta origen')),
+                ('saldo', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Saldo actual')),
+                ('ultima_fecha', models.DateField(blank=True, null=True, verbose_name='Fecha del último movimiento')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+            ],
+            options={
+                'verbose_name': 'Saldo de cuenta',
+                'verbose_name_plural': 'Saldos de cuentas',
+                'db_table': 'saldos_tesoreria_cuentas',
+                'ordering': ['cuenta_origen'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='saldotesoreria',
+            index=models.Index(fields=['cuenta_origen', 'fecha', 'id'], name='saldos_teso_cuenta__fbeaf7_idx'),
+        ),
+        migrations.RunPython(calcular_saldos_actuales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operaciones', '0011_saldo_cuenta'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='operacionlogistica',
+            name='estatus',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso de pago'), ('pagado', 'Pagado'), ('cerrado', 'Cerrado')], default='pendiente', max_length=20, verbose_name='Estatus'),
+        ),
+        migrations.AlterField(
+            model_name='operacionrevalidacion',
+            name='estatus',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso de pago'), ('pagado', 'Pagado')], default='pendiente', max_length=20, verbose_name='Estatus'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operaciones', '0012_estatus_en_proceso'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='huella',
+            field=models.CharField(blank=True, editable=False, max_length=40, verbose_name='Huella de duplicado'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['huella', 'fecha_alta'], name='tickets_huella_9dcf7f_idx'),
+        ),
+    ]
@@ -1,11 +1,127 @@
 from django.db import models
+from django.db.models import Case, When, F, Q, Sum, Value, OuterRef, Subquery, DecimalField
+from django.db.models.functions import Coalesce, NullIf
 from django.conf import settings
 from django.core.validators import MinValueValidator
-from datetime import date, timedelta
+from datetime import date
 from decimal import Decimal
 
+from apps.archivos.almacenamiento import almacenamiento_contenido
+from apps.catalogos.models import TipoCambio
+from apps.core import huellas
+from . import semaforo as semaforo_utils
 
-class Contenedor(models.Model):
+
+class ImporteQuerySet(models.QuerySet):
+    """
+    Conversión de importes MXN/USD calculada en SQL.
+
+    El tipo de cambio de cada fila es, en orden: su propio campo `tipo_cambio`
+    (si el modelo lo tiene y no es 0), el del histórico TipoCambio vigente a la
+    fecha de la fila, o settings.TIPO_CAMBIO_DEFAULT. Si aun así fuera 0, el
+    importe en USD queda en NULL en lugar de fallar la consulta.
+
+    Cada modelo declara `campo_fecha_cambio` (fecha usada para el histórico).
+    """
+
+    def _tipo_cambio(self):
+        historico = Subquery(
+            TipoCambio.objects.filter(
+                fecha__lte=OuterRef(self.model.campo_fecha_cambio)
+            ).order_by('-fecha').values('valor')[:1]
+        )
+        fuentes = [historico, Value(Decimal(str(settings.TIPO_CAMBIO_DEFAULT)))]
+        if any(f.name == 'tipo_cambio' for f in self.model._meta.fields):
+            # Un tipo de cambio en 0 (captura incompleta) se trata como faltante
+            fuentes.insert(0, NullIf(F('tipo_cambio'), Value(Decimal('0'))))
+        return Coalesce(*fuentes, output_field=DecimalField(max_digits=8, decimal_places=4))
+
+    def _expresiones_importe(self):
+        monto = DecimalField(max_digits=20, decimal_places=4)
+        tipo_cambio = self._tipo_cambio()
+        return {
+            'importe_en_mxn': Case(
+                When(divisa='USD', then=F('importe') * tipo_cambio),
+                default=F('importe'),
+                output_field=monto
+            ),
+            'importe_en_usd': Case(
+                When(divisa='MXN', then=F('importe') / NullIf(tipo_cambio, Value(Decimal('0')))),
+                default=F('importe'),
+                output_field=monto
+            ),
+        }
+
+    def con_importes_normalizados(self):
+        """Anota importe_en_mxn e importe_en_usd en cada fila"""
+        return self.annotate(**self._expresiones_importe())
+
+    def _totales(self):
+        importes = self._expresiones_importe()
+        return {
+            'total_mxn': Sum('importe', filter=Q(divisa='MXN')),
+            'total_usd': Sum('importe', filter=Q(divisa='USD')),
+            'total_normalizado_mxn': Sum(importes['importe_en_mxn']),
+            'total_normalizado_usd': Sum(importes['importe_en_usd']),
+        }
+
+    def totales_por_divisa(self):
+        """Totales por divisa original y normalizados, en una sola consulta"""
+        return self.aggregate(cantidad=models.Count('id'), **self._totales())
+
+    def resumen_por(self, *campos):
+        """Agrupa por `campos` con totales por divisa y normalizados"""
+        return self.values(*campos).annotate(
+            cantidad=models.Count('id'), **self._totales()
+        ).order_by('-total_normalizado_mxn')
+
+
+class ConSemaforo(models.Model):
+    """
+    Semáforo almacenado (ver operaciones.semaforo). Se recalcula en cada save()
+    y, para los cambios por fecha, con el comando `recalcular_semaforos`.
+    El modelo concreto define `campo_transicion` (FK en TransicionSemaforo).
+    """
+    semaforo = models.CharField(
+        'Semáforo',
+        max_length=10,
+        choices=semaforo_utils.Semaforo.choices,
+        default=semaforo_utils.Semaforo.VERDE,
+        editable=False,
+        db_index=True
+    )
+    semaforo_cambia = models.DateField(
+        'Próximo cambio de semáforo',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+
+    campo_transicion = None
+
+    class Meta:
+        abstract = True
+
+    def nueva_transicion(self, anterior, fecha=None):
+        return TransicionSemaforo(
+            **{self.campo_transicion: self},
+            anterior=anterior,
+            nuevo=self.semaforo,
+            fecha=fecha or date.today()
+        )
+
+    def save(self, *args, **kwargs):
+        anterior = self.semaforo if self.pk else ''
+        self.semaforo, self.semaforo_cambia = semaforo_utils.calcular(self.eta, self.dias_libres)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'semaforo', 'semaforo_cambia'}
+        super().save(*args, **kwargs)
+        if anterior != self.semaforo:
+            self.nueva_transicion(anterior).save()
+
+
+class Contenedor(ConSemaforo):
     """
     Entidad central del sistema.
     Cliente está relacionado directamente con el contenedor y el pedimento.
@@ -120,6 +236,8 @@ class Contenedor(models.Model):
     fecha_creacion = models.DateTimeField('Fecha de creación', auto_now_add=True)
     fecha_actualizacion = models.DateTimeField('Última actualización', auto_now=True)
 
+    campo_transicion = 'contenedor'
+
     class Meta:
         db_table = 'contenedores'
         verbose_name = 'Contenedor'
@@ -158,41 +276,6 @@ class Contenedor(models.Model):
         dias_transcurridos = (date.today() - self.eta).days
         return max(0, dias_transcurridos - self.dias_libres)
 
-    @property
-    def semaforo(self):
-        """
-        Calcula el semáforo considerando ETA y días libres.
-        - AZUL: Faltan 10 días o menos para el ETA.
-        - VERDE: Llegó y tiene buen tiempo de días libres.
-        - AMARILLO/ROJO/VENCIDO: Se acaban los días libres.
-        """
-        if not self.eta:
-            return 'verde'  # Sin fecha, asumimos verde
-
-        hoy = date.today()
-
-        # --- LÓGICA NUEVA: PREVIO A LA LLEGADA (AZUL) ---
-        if hoy < self.eta:
-            dias_para_llegar = (self.eta - hoy).days
-            # Si faltan 10 días o menos para llegar, es AZUL (Pre-alerta)
-            if dias_para_llegar <= 10:
-                return 'azul'
-            return 'verde' # Si falta mucho más, se mantiene verde
-
-        # --- LÓGICA EXISTENTE: POST LLEGADA (Días Libres) ---
-        # Fecha Límite = ETA + Días Libres
-        fecha_limite = self.eta + timedelta(days=self.dias_libres)
-        dias_restantes = (fecha_limite - hoy).days
-
-        if dias_restantes < 0:
-            return 'vencido'  # Morado
-        elif dias_restantes <= 2: 
-            return 'rojo'     # Crítico
-        elif dias_restantes <= 5:
-            return 'amarillo' # Preventivo
-        else:
-            return 'verde'    # A tiempo
-
 
 class Pedimento(models.Model):
     """
@@ -270,6 +353,7 @@ class OperacionLogistica(models.Model):
 
     class Estatus(models.TextChoices):
         PENDIENTE = 'pendiente', 'Pendiente'
+        EN_PROCESO = 'en_proceso', 'En proceso de pago'  # Incluida en un lote de pago masivo
         PAGADO = 'pagado', 'Pagado'
         CERRADO = 'cerrado', 'Cerrado'
 
@@ -362,19 +446,27 @@ class OperacionLogistica(models.Model):
     fecha_creacion = models.DateTimeField('Fecha de creación', auto_now_add=True)
     fecha_actualizacion = models.DateTimeField('Última actualización', auto_now=True)
 
+    objects = ImporteQuerySet.as_manager()
+    campo_fecha_cambio = 'fecha'
+
     class Meta:
         db_table = 'operaciones_logistica'
         verbose_name = 'Operación de logística'
         verbose_name_plural = 'Operaciones de logística'
         ordering = ['-fecha', '-id']
+        indexes = [
+            # Antigüedad de saldos: pendientes por fecha
+            models.Index(fields=['estatus', 'fecha']),
+        ]
         # unique_together = ['prefijo', 'consecutivo']
 
     def __str__(self):
         return f"{self.comentarios} - ${self.importe:,.2f}"
 
     def save(self, *args, **kwargs):
-        # Generar comentarios automáticamente
-        if self.concepto and self.prefijo and self.contenedor:
+        # Generar comentarios automáticamente (no en guardados parciales de
+        # estatus, donde no se escribiría y solo costaría cargar relaciones)
+        if kwargs.get('update_fields') is None and self.concepto and self.prefijo and self.contenedor:
             self.comentarios = f"{self.concepto.nombre} {self.prefijo} {self.consecutivo} {self.contenedor.numero}"
         super().save(*args, **kwargs)
 
@@ -399,6 +491,7 @@ class OperacionRevalidacion(models.Model):
 
     class Estatus(models.TextChoices):
         PENDIENTE = 'pendiente', 'Pendiente'
+        EN_PROCESO = 'en_proceso', 'En proceso de pago'  # Incluida en un lote de pago masivo
         PAGADO = 'pagado', 'Pagado'
 
     class Divisa(models.TextChoices):
@@ -506,18 +599,24 @@ class OperacionRevalidacion(models.Model):
     fecha_creacion = models.DateTimeField('Fecha de creación', auto_now_add=True)
     fecha_actualizacion = models.DateTimeField('Última actualización', auto_now=True)
 
+    objects = ImporteQuerySet.as_manager()
+    campo_fecha_cambio = 'fecha'
+
     class Meta:
         db_table = 'operaciones_revalidacion'
         verbose_name = 'Operación de revalidación'
         verbose_name_plural = 'Operaciones de revalidación'
         ordering = ['-fecha', '-id']
+        indexes = [
+            models.Index(fields=['estatus', 'fecha']),
+        ]
 
     def __str__(self):
         return f"{self.referencia} - ${self.importe:,.2f}"
 
     def save(self, *args, **kwargs):
-        # Generar referencia automáticamente
-        if self.concepto and self.bl and self.cliente_prefijo:
+        # Generar referencia automáticamente (solo en guardados completos)
+        if kwargs.get('update_fields') is None and self.concepto and self.bl and self.cliente_prefijo:
             self.referencia = f"{self.concepto.nombre} {self.bl} {self.cliente_prefijo} {self.consecutivo}"
         super().save(*args, **kwargs)
 
@@ -701,7 +800,8 @@ class Documento(models.Model):
     )
     archivo = models.FileField(
         'Archivo',
-        upload_to='documentos/%Y/%m/'
+        upload_to='documentos/%Y/%m/',
+        storage=almacenamiento_contenido,
     )
     nombre_archivo = models.CharField('Nombre del archivo', max_length=255)
     descripcion = models.TextField('Descripción', blank=True)
@@ -878,6 +978,7 @@ class Garantia(models.Model):
     comprobante = models.FileField(
         'Comprobante de pago',
         upload_to='garantias/%Y/%m/',
+        storage=almacenamiento_contenido,
         null=True,
         blank=True
     )
@@ -1087,15 +1188,41 @@ class SaldoTesoreria(models.Model):
         verbose_name = 'Movimiento de saldo'
         verbose_name_plural = 'Movimientos de saldo'
         ordering = ['-fecha', '-id']
+        indexes = [
+            # Cadena de saldos por cuenta (ver tesoreria.py)
+            models.Index(fields=['cuenta_origen', 'fecha', 'id']),
+        ]
 
     def __str__(self):
         signo = '+' if self.tipo == 'deposito' else '-'
         return f"{self.cuenta_origen} {signo}${abs(self.monto):,.2f}"
 
 
+class SaldoCuenta(models.Model):
+    """
+    Saldo actual de cada cuenta de tesorería (una fila por cuenta_origen).
+    Lo mantiene tesoreria.registrar_movimiento, que además bloquea esta fila
+    para serializar las altas de movimientos de la misma cuenta.
+    """
+
+    cuenta_origen = models.CharField('Cuenta origen', max_length=100, unique=True)
+    saldo = models.DecimalField('Saldo actual', max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ultima_fecha = models.DateField('Fecha del último movimiento', null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField('Última actualización', auto_now=True)
+
+    class Meta:
+        db_table = 'saldos_tesoreria_cuentas'
+        verbose_name = 'Saldo de cuenta'
+        verbose_name_plural = 'Saldos de cuentas'
+        ordering = ['cuenta_origen']
+
+    def __str__(self):
+        return f"{self.cuenta_origen}: ${self.saldo:,.2f}"
+
+
 # ========== MODELO LEGACY - MANTENER PARA COMPATIBILIDAD ==========
 
-class Ticket(models.Model):
+class Ticket(ConSemaforo):
     """
     MODELO LEGACY - Mantener para compatibilidad con datos existentes.
     Las nuevas operaciones deben usar OperacionLogistica u OperacionRevalidacion.
@@ -1172,6 +1299,7 @@ class Ticket(models.Model):
     comprobante_pago = models.FileField(
         'Comprobante de pago',
         upload_to='comprobantes/tickets/%Y/%m/',
+        storage=almacenamiento_contenido,
         null=True,
         blank=True,
         help_text='Archivo PDF o imagen del comprobante de pago'
@@ -1259,11 +1387,23 @@ class Ticket(models.Model):
         help_text='Últimos 7 caracteres del pedimento'
     )
 
+    # Contenedor o BL + concepto + importe; ver operaciones/duplicados.py
+    huella = models.CharField('Huella de duplicado', max_length=40, blank=True, editable=False)
+
+    objects = ImporteQuerySet.as_manager()
+    campo_fecha_cambio = 'fecha_alta'
+    campo_transicion = 'ticket'
+    campos_huella = ('contenedor', 'bl_master', 'concepto', 'observaciones', 'importe')
+
     class Meta:
         db_table = 'tickets'
         verbose_name = 'Ticket (Legacy)'
         verbose_name_plural = 'Tickets (Legacy)'
         ordering = ['-fecha_alta', '-id']
+        indexes = [
+            models.Index(fields=['estatus', 'fecha_alta']),
+            models.Index(fields=['huella', 'fecha_alta']),
+        ]
         #  unique_together = ['prefijo', 'consecutivo']
 
     def __str__(self):
@@ -1271,13 +1411,24 @@ class Ticket(models.Model):
 
     def save(self, *args, **kwargs):
         identificador = self.contenedor if self.contenedor else self.bl_master
-        if self.prefijo and identificador:
+        if kwargs.get('update_fields') is None and self.prefijo and identificador:
             concepto_nombre = ''
             if self.concepto_id:
                 concepto_nombre = self.concepto.nombre
             self.comentarios = f"{concepto_nombre} {self.prefijo} {self.consecutivo} {identificador}".strip()
+        if kwargs.get('update_fields') is None:
+            self.huella = self.calcular_huella()
         super().save(*args, **kwargs)
 
+    def calcular_huella(self):
+        """
+        Contenedor (o BL) + concepto + importe. Sin concepto se usan las
+        observaciones, donde el frontend guarda el concepto.
+        """
+        return huellas.huella(
+            self.contenedor or self.bl_master, self.concepto_id or self.observaciones, self.importe
+        )
+
     @property
     def dias_restantes(self):
         if not self.eta:
@@ -1285,41 +1436,6 @@ class Ticket(models.Model):
         delta = self.eta - date.today()
         return delta.days
 
-    @property
-    def semaforo(self):
-        """
-        Calcula el semáforo considerando ETA y días libres.
-        - AZUL: Faltan 10 días o menos para el ETA.
-        - VERDE: Llegó y tiene buen tiempo de días libres.
-        - AMARILLO/ROJO/VENCIDO: Se acaban los días libres.
-        """
-        if not self.eta:
-            return 'verde'  # Sin fecha, asumimos verde
-
-        hoy = date.today()
-
-        # --- LÓGICA NUEVA: PREVIO A LA LLEGADA (AZUL) ---
-        if hoy < self.eta:
-            dias_para_llegar = (self.eta - hoy).days
-            # Si faltan 10 días o menos para llegar, es AZUL (Pre-alerta)
-            if dias_para_llegar <= 10:
-                return 'azul'
-            return 'verde' # Si falta mucho más, se mantiene verde
-
-        # --- LÓGICA EXISTENTE: POST LLEGADA (Días Libres) ---
-        # Fecha Límite = ETA + Días Libres
-        fecha_limite = self.eta + timedelta(days=self.dias_libres)
-        dias_restantes = (fecha_limite - hoy).days
-
-        if dias_restantes < 0:
-            return 'vencido'  # Morado
-        elif dias_restantes <= 2: 
-            return 'rojo'     # Crítico
-        elif dias_restantes <= 5:
-            return 'amarillo' # Preventivo
-        else:
-            return 'verde'    # A tiempo
-
     @property
     def puede_ser_editado_por_ejecutivo(self):
         return self.contador_ediciones < 2
@@ -1328,3 +1444,53 @@ class Ticket(models.Model):
     def obtener_siguiente_consecutivo(cls, prefijo):
         ultimo = cls.objects.filter(prefijo=prefijo).order_by('-consecutivo').first()
         return (ultimo.consecutivo + 1) if ultimo else 1
+
+
+class TransicionSemaforo(models.Model):
+    """
+    Historial de cambios de semáforo de contenedores y tickets.
+    Permite consultar alertas del tipo "pasó a rojo hoy" con un filtro indexado
+    por (fecha, nuevo). `anterior` vacío = semáforo inicial al crear el registro.
+    """
+    contenedor = models.ForeignKey(
+        Contenedor,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='transiciones_semaforo',
+        verbose_name='Contenedor'
+    )
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='transiciones_semaforo',
+        verbose_name='Ticket'
+    )
+    anterior = models.CharField(
+        'Semáforo anterior',
+        max_length=10,
+        choices=semaforo_utils.Semaforo.choices,
+        blank=True
+    )
+    nuevo = models.CharField(
+        'Semáforo nuevo',
+        max_length=10,
+        choices=semaforo_utils.Semaforo.choices
+    )
+    fecha = models.DateField('Fecha')
+    fecha_registro = models.DateTimeField('Fecha de registro', auto_now_add=True)
+
+    class Meta:
+        db_table = 'transiciones_semaforo'
+        verbose_name = 'Transición de semáforo'
+        verbose_name_plural = 'Transiciones de semáforo'
+        ordering = ['-fecha', '-id']
+        indexes = [
+            models.Index(fields=['fecha', 'nuevo'], name='transicion_fecha_nuevo_idx'),
+        ]
+
+    def __str__(self):
+        objeto = f"Contenedor {self.contenedor_id}" if self.contenedor_id else f"Ticket {self.ticket_id}"
+        return f"{objeto}: {self.anterior or '-'} → {self.nuevo} ({self.fecha:%d/%m/%Y})"
@@ -0,0 +1,101 @@
+"""
+Semáforo de contenedores y tickets.
+
+El semáforo depende de la fecha, así que además del valor se guarda la fecha
+en que va a cambiar (`semaforo_cambia`). El job nocturno solo recalcula las
+filas cuya fecha ya llegó, y el save() de los modelos lo recalcula cuando se
+editan la ETA o los días libres. Cada cambio queda en TransicionSemaforo.
+
+`calcular` es una función pura (sin modelos) para poder usarla también desde
+las migraciones.
+"""
+from datetime import date, timedelta
+
+from django.db import models, transaction
+
+
+DIAS_AZUL = 10      # Pre-alerta: faltan 10 días o menos para el ETA
+DIAS_AMARILLO = 5   # Preventivo: quedan 5 días libres o menos
+DIAS_ROJO = 2       # Crítico: quedan 2 días libres o menos
+
+
+class Semaforo(models.TextChoices):
+    AZUL = 'azul', 'Azul (pre-alerta)'
+    VERDE = 'verde', 'Verde (a tiempo)'
+    AMARILLO = 'amarillo', 'Amarillo (preventivo)'
+    ROJO = 'rojo', 'Rojo (crítico)'
+    VENCIDO = 'vencido', 'Vencido'
+
+
+def calcular(eta, dias_libres, hoy=None):
+    """
+    Semáforo a la fecha `hoy` considerando ETA y días libres.
+    Devuelve (semaforo, fecha del próximo cambio o None si ya no cambia).
+    - AZUL: Faltan 10 días o menos para el ETA.
+    - VERDE: Llegó y tiene buen tiempo de días libres (o falta mucho para el ETA).
+    - AMARILLO/ROJO/VENCIDO: Se acaban los días libres.
+    """
+    if not eta:
+        return Semaforo.VERDE, None  # Sin fecha, asumimos verde
+
+    hoy = hoy or date.today()
+
+    # Previo a la llegada
+    if hoy < eta:
+        if (eta - hoy).days <= DIAS_AZUL:
+            return Semaforo.AZUL, eta
+        return Semaforo.VERDE, eta - timedelta(days=DIAS_AZUL)
+
+    # Post llegada: Fecha Límite = ETA + Días Libres
+    fecha_limite = eta + timedelta(days=dias_libres)
+    dias_restantes = (fecha_limite - hoy).days
+
+    if dias_restantes < 0:
+        return Semaforo.VENCIDO, None
+    if dias_restantes <= DIAS_ROJO:
+        return Semaforo.ROJO, fecha_limite + timedelta(days=1)
+    if dias_restantes <= DIAS_AMARILLO:
+        return Semaforo.AMARILLO, fecha_limite - timedelta(days=DIAS_ROJO)
+    return Semaforo.VERDE, fecha_limite - timedelta(days=DIAS_AMARILLO)
+
+
+def recalcular_semaforos(hoy=None, todos=False):
+    """
+    Job diario: recalcula el semáforo de los contenedores activos y tickets
+    pendientes cuyo umbral se cruzó (semaforo_cambia <= hoy), o de todos con
+    todos=True, y registra las transiciones. Devuelve {'Contenedor': (actualizados, transiciones), ...}.
+    """
+    from apps.core.cache import invalidar
+    from apps.eventos.signals import publicar_lote
+    from .models import Contenedor, Ticket, TransicionSemaforo
+
+    hoy = hoy or date.today()
+    resumen = {}
+    # Solo los vigentes: los completados/cancelados (o pagados) ya no cambian
+    for modelo, estatus in ((Contenedor, Contenedor.Estatus.ACTIVO), (Ticket, Ticket.Estatus.PENDIENTE)):
+        queryset = modelo.objects.filter(estatus=estatus)
+        if not todos:
+            queryset = queryset.filter(semaforo_cambia__lte=hoy)
+        actualizados = []
+        transiciones = []
+        for obj in queryset.only('id', 'eta', 'dias_libres', 'semaforo', 'semaforo_cambia').iterator(chunk_size=2000):
+            anterior = obj.semaforo
+            nuevo, cambia = calcular(obj.eta, obj.dias_libres, hoy)
+            if nuevo == anterior and cambia == obj.semaforo_cambia:
+                continue
+            obj.semaforo, obj.semaforo_cambia = nuevo, cambia
+            actualizados.append(obj)
+            if nuevo != anterior:
+                transiciones.append(obj.nueva_transicion(anterior, hoy))
+
+        with transaction.atomic():
+            modelo.objects.bulk_update(actualizados, ['semaforo', 'semaforo_cambia'], batch_size=500)
+            TransicionSemaforo.objects.bulk_create(transiciones, batch_size=500)
+            if actualizados:
+                publicar_lote(
+                    modelo.objects.filter(pk__in=[o.pk for o in actualizados]), ['semaforo', 'semaforo_cambia']
+                )
+        resumen[modelo.__name__] = (len(actualizados), len(transiciones))
+
+    invalidar('contenedores', 'tickets')
+    return resumen
@@ -1,14 +1,19 @@
 from rest_framework import serializers
 from .models import (
     Contenedor, Pedimento, OperacionLogistica, OperacionRevalidacion,
-    Clasificacion, Documento, Demora, Garantia, Prestamo, SaldoTesoreria, Ticket
+    Clasificacion, Documento, Demora, Garantia, Prestamo, SaldoTesoreria, SaldoCuenta, Ticket,
+    TransicionSemaforo
 )
+from .duplicados import tickets_duplicados, validar_duplicados
 from apps.catalogos.serializers import (
     EmpresaSerializer, ConceptoSerializer, ProveedorSerializer,
     ClienteSerializer, NavieraCuentaSerializer, PuertoSerializer,
     TerminalSerializer, NavieraSerializer, AgenteAduanalSerializer
 )
 from apps.catalogos.models import Concepto, Proveedor, Naviera, NavieraCuenta, AgenteAduanal
+from apps.catalogos.tipo_cambio import obtener_tipo_cambio
+from apps.archivos.serializers import PreviewsField
+from apps.pagos.serializers import PagoSerializer, PagoLogisticaSerializer, PagoRevalidacionSerializer
 
 
 # ============ CONTENEDOR ============
@@ -200,6 +205,10 @@ class OperacionRevalidacionCreateSerializer(serializers.ModelSerializer):
         cliente_prefijo = validated_data.get('cliente_prefijo', '').upper()
         validated_data['cliente_prefijo'] = cliente_prefijo
         validated_data['consecutivo'] = OperacionRevalidacion.obtener_siguiente_consecutivo(cliente_prefijo)
+        # Si no se captura tipo de cambio, usar el del día de la operación
+        if validated_data.get('divisa', OperacionRevalidacion.Divisa.USD) == OperacionRevalidacion.Divisa.USD \
+                and not validated_data.get('tipo_cambio'):
+            validated_data['tipo_cambio'] = obtener_tipo_cambio(validated_data.get('fecha')).valor
         return super().create(validated_data)
 
 
@@ -232,12 +241,13 @@ class DocumentoSerializer(serializers.ModelSerializer):
     contenedor_numero = serializers.CharField(source='contenedor.numero', read_only=True)
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     subido_por_nombre = serializers.CharField(source='subido_por.nombre', read_only=True)
+    archivo_previews = PreviewsField(source='archivo')
 
     class Meta:
         model = Documento
         fields = [
             'id', 'clasificacion', 'contenedor', 'contenedor_numero',
-            'tipo', 'tipo_display', 'archivo', 'nombre_archivo', 'descripcion',
+            'tipo', 'tipo_display', 'archivo', 'archivo_previews', 'nombre_archivo', 'descripcion',
             'subido_por', 'subido_por_nombre', 'fecha_subida'
         ]
         read_only_fields = ['id', 'fecha_subida']
@@ -265,6 +275,21 @@ class DemoraSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'fecha_creacion', 'fecha_actualizacion']
 
 
+# ============ SEMÁFORO ============
+
+class TransicionSemaforoSerializer(serializers.ModelSerializer):
+    contenedor_numero = serializers.CharField(source='contenedor.numero', read_only=True, default=None)
+    ticket_comentarios = serializers.CharField(source='ticket.comentarios', read_only=True, default=None)
+
+    class Meta:
+        model = TransicionSemaforo
+        fields = [
+            'id', 'contenedor', 'contenedor_numero', 'ticket', 'ticket_comentarios',
+            'anterior', 'nuevo', 'fecha', 'fecha_registro'
+        ]
+        read_only_fields = fields
+
+
 # ============ GARANTIA ============
 
 class GarantiaSerializer(serializers.ModelSerializer):
@@ -273,6 +298,7 @@ class GarantiaSerializer(serializers.ModelSerializer):
     registrado_por_nombre = serializers.CharField(source='registrado_por.nombre', read_only=True)
     estatus_display = serializers.CharField(source='get_estatus_display', read_only=True)
     divisa_display = serializers.CharField(source='get_divisa_display', read_only=True)
+    comprobante_previews = PreviewsField(source='comprobante')
 
     class Meta:
         model = Garantia
@@ -281,7 +307,7 @@ class GarantiaSerializer(serializers.ModelSerializer):
             'naviera', 'naviera_nombre',
             'monto', 'divisa', 'divisa_display',
             'fecha_deposito', 'fecha_devolucion',
-            'comentarios', 'comprobante',
+            'comentarios', 'comprobante', 'comprobante_previews',
             'estatus', 'estatus_display',
             'eir_recibido', 'eir_documento',
             'registrado_por', 'registrado_por_nombre', 'fecha_creacion'
@@ -329,7 +355,71 @@ class SaldoTesoreriaSerializer(serializers.ModelSerializer):
             'saldo_anterior', 'saldo_nuevo',
             'fecha', 'registrado_por', 'registrado_por_nombre', 'fecha_creacion'
         ]
-        read_only_fields = ['id', 'fecha_creacion']
+        # Los saldos los calcula tesoreria.registrar_movimiento
+        read_only_fields = ['id', 'saldo_anterior', 'saldo_nuevo', 'registrado_por', 'fecha_creacion']
+
+
+class SaldoCuentaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SaldoCuenta
+        fields = ['cuenta_origen', 'saldo', 'ultima_fecha', 'fecha_actualizacion']
+
+
+# ============ CONTENEDOR COMPLETO ============
+
+class ContenedorCompletoSerializer(ContenedorDetailSerializer):
+    """
+    Contenedor con todas sus relaciones (contenedores/{id}/completo/).
+    Espera el contenedor de ContenedorViewSet.completo, con las relaciones
+    precargadas. Logística y revalidación (y sus pagos) se omiten si el
+    usuario no puede ver esa sábana.
+    """
+    pedimentos = PedimentoSerializer(many=True, read_only=True)
+    operaciones_logistica = OperacionLogisticaListSerializer(many=True, read_only=True)
+    operaciones_revalidacion = OperacionRevalidacionListSerializer(many=True, read_only=True)
+    clasificacion = ClasificacionSerializer(read_only=True)
+    documentos = serializers.SerializerMethodField()
+    demoras = DemoraSerializer(many=True, read_only=True)
+    garantias = GarantiaSerializer(many=True, read_only=True)
+    prestamos = PrestamoSerializer(many=True, read_only=True)
+    pagos = serializers.SerializerMethodField()
+
+    class Meta(ContenedorDetailSerializer.Meta):
+        fields = ContenedorDetailSerializer.Meta.fields + [
+            'pedimentos', 'operaciones_logistica', 'operaciones_revalidacion',
+            'clasificacion', 'documentos', 'demoras', 'garantias', 'prestamos', 'pagos'
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        user = self.context['request'].user
+        if not user.puede_ver_sabana_logistica:
+            self.fields.pop('operaciones_logistica')
+        if not user.puede_ver_sabana_revalidacion:
+            self.fields.pop('operaciones_revalidacion')
+
+    def get_documentos(self, obj):
+        """Documentos del contenedor y de su clasificación"""
+        documentos = list(obj.documentos.all())
+        clasificacion = getattr(obj, 'clasificacion', None)
+        if clasificacion is not None:
+            documentos += clasificacion.documentos.all()
+        return DocumentoSerializer(documentos, many=True, context=self.context).data
+
+    def get_pagos(self, obj):
+        """Pagos genéricos (obj.pagos_registros, cargado en la vista) y tipados de cada operación"""
+        pagos = {'registros': PagoSerializer(obj.pagos_registros, many=True, context=self.context).data}
+        if 'operaciones_logistica' in self.fields:
+            pagos['logistica'] = PagoLogisticaSerializer(
+                [pago for operacion in obj.operaciones_logistica.all() for pago in operacion.pagos.all()],
+                many=True, context=self.context
+            ).data
+        if 'operaciones_revalidacion' in self.fields:
+            pagos['revalidacion'] = PagoRevalidacionSerializer(
+                [pago for operacion in obj.operaciones_revalidacion.all() for pago in operacion.pagos.all()],
+                many=True, context=self.context
+            ).data
+        return pagos
 
 
 # ============ TICKET LEGACY ============
@@ -354,6 +444,7 @@ class TicketListSerializer(serializers.ModelSerializer):
     # Nuevos campos
     agente_aduanal_nombre = serializers.CharField(source='agente_aduanal.nombre', read_only=True, default='')
     sensibilidad_contenido_display = serializers.CharField(source='get_sensibilidad_contenido_display', read_only=True)
+    comprobante_pago_previews = PreviewsField(source='comprobante_pago')
 
     class Meta:
         model = Ticket
@@ -371,7 +462,7 @@ class TicketListSerializer(serializers.ModelSerializer):
             'agente_aduanal', 'agente_aduanal_nombre',
             'sensibilidad_contenido', 'sensibilidad_contenido_display',
             'importe', 'divisa',
-            'estatus', 'estatus_display', 'fecha_pago', 'comprobante_pago',
+            'estatus', 'estatus_display', 'fecha_pago', 'comprobante_pago', 'comprobante_pago_previews',
             'eta', 'dias_libres', 'dias_restantes', 'semaforo',
             'contador_ediciones', 'observaciones',
             'tipo_operacion', 'puerto', 'puerto_codigo',
@@ -510,6 +601,9 @@ class TicketCreateSerializer(serializers.ModelSerializer):
         default='verde'
     )
 
+    # Capturar aunque haya posibles duplicados (ver duplicados.py)
+    confirmar_duplicado = serializers.BooleanField(required=False, default=False, write_only=True)
+
     class Meta:
         model = Ticket
         fields = [
@@ -518,7 +612,7 @@ class TicketCreateSerializer(serializers.ModelSerializer):
             'naviera', 'naviera_cuenta', 'agente_aduanal',
             'pedimento_prefijo', 'pedimento_consecutivo', 'sensibilidad_contenido',
             'importe', 'divisa', 'eta', 'dias_libres', 'observaciones',
-            'tipo_operacion', 'puerto', 'consecutivo'
+            'tipo_operacion', 'puerto', 'consecutivo', 'confirmar_duplicado'
         ]
 
     def validate_bl_master(self, value):
@@ -541,6 +635,15 @@ class TicketCreateSerializer(serializers.ModelSerializer):
                         )
         return value
 
+    def validate(self, attrs):
+        confirmado = attrs.pop('confirmar_duplicado', False)
+        validar_duplicados(
+            tickets_duplicados(Ticket(**attrs)), confirmado,
+            'Ya existe un ticket con el mismo contenedor, concepto e importe en fechas cercanas. '
+            'Envía confirmar_duplicado=true para capturarlo de todos modos.'
+        )
+        return attrs
+
     def create(self, validated_data):
         prefijo = validated_data.get('prefijo', '').upper()
         validated_data['prefijo'] = prefijo
@@ -0,0 +1,148 @@
+"""
+Libro de saldos de tesorería por cuenta.
+
+Cada SaldoTesoreria guarda el saldo antes y después del movimiento y la
+cadena de una cuenta se ordena por (fecha, id). SaldoCuenta tiene el saldo
+actual de cada cuenta.
+
+`registrar_movimiento` agrega un movimiento con la fila de la cuenta en
+SaldoCuenta bloqueada (SELECT ... FOR UPDATE): dos altas simultáneas en la
+misma cuenta se serializan y no leen el mismo saldo anterior. Si el
+movimiento tiene fecha anterior al último de la cuenta, los saldos desde esa
+fecha se recalculan con `recalcular_saldos`: una consulta con
+SUM(importe) OVER (ORDER BY fecha, id) y un bulk_update de las filas que
+cambian.
+
+Signo del importe: el depósito suma, el uso y la devolución restan y el
+ajuste se aplica con el signo capturado.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Sum, When, Window
+from django.db.models.functions import Abs
+
+from .models import SaldoCuenta, SaldoTesoreria
+
+
+TAMANO_LOTE = 500
+CENTAVOS = Decimal('0.01')
+
+
+def importe_con_signo():
+    """Expresión SQL del importe con signo según el tipo (usable en migraciones)"""
+    return Case(
+        When(tipo='deposito', then=Abs('monto')),
+        When(tipo='ajuste', then=F('monto')),
+        default=-Abs('monto'),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def importe_movimiento(tipo, monto):
+    """Mismo cálculo que importe_con_signo() para un movimiento en memoria"""
+    if tipo == SaldoTesoreria.TipoMovimiento.DEPOSITO:
+        return abs(monto)
+    if tipo == SaldoTesoreria.TipoMovimiento.AJUSTE:
+        return monto
+    return -abs(monto)
+
+
+def bloquear_cuenta(cuenta_origen):
+    """Fila de SaldoCuenta bloqueada (la crea si no existe). Dentro de transaction.atomic()"""
+    SaldoCuenta.objects.get_or_create(cuenta_origen=cuenta_origen)
+    return SaldoCuenta.objects.select_for_update().get(cuenta_origen=cuenta_origen)
+
+
+def registrar_movimiento(**campos):
+    """
+    Crea un SaldoTesoreria con saldo_anterior/saldo_nuevo calculados y
+    actualiza el saldo actual de la cuenta, todo en una transacción.
+    """
+    movimiento = SaldoTesoreria(**campos)
+    importe = importe_movimiento(movimiento.tipo, Decimal(movimiento.monto))
+
+    with transaction.atomic():
+        cuenta = bloquear_cuenta(movimiento.cuenta_origen)
+        retroactivo = cuenta.ultima_fecha is not None and movimiento.fecha < cuenta.ultima_fecha
+
+        movimiento.saldo_anterior = cuenta.saldo
+        movimiento.saldo_nuevo = cuenta.saldo + importe
+        movimiento.save()
+        if retroactivo:
+            recalcular_saldos(movimiento.cuenta_origen, desde=movimiento.fecha)
+            movimiento.refresh_from_db(fields=['saldo_anterior', 'saldo_nuevo'])
+
+        cuenta.saldo += importe
+        if not retroactivo:
+            cuenta.ultima_fecha = movimiento.fecha
+        cuenta.save(update_fields=['saldo', 'ultima_fecha', 'fecha_actualizacion'])
+    return movimiento
+
+
+def recalcular_saldos(cuenta_origen, desde=None, hasta=None, ejecutar=True):
+    """
+    Recalcula saldo_anterior/saldo_nuevo de los movimientos de la cuenta con
+    fecha en [desde, hasta] (sin límites: toda la cadena). El punto de
+    partida es el saldo_nuevo del último movimiento anterior a `desde`.
+    Con ejecutar=False solo cuenta. Devuelve {'movimientos', 'corregidos',
+    'saldo_final', 'ultima_fecha'} (los dos últimos del rango recalculado).
+    """
+    movimientos = SaldoTesoreria.objects.filter(cuenta_origen=cuenta_origen).order_by()
+    base = Decimal('0')
+    if desde is not None:
+        base = movimientos.filter(fecha__lt=desde).order_by('-fecha', '-id').values_list(
+            'saldo_nuevo', flat=True
+        ).first() or Decimal('0')
+        movimientos = movimientos.filter(fecha__gte=desde)
+    if hasta is not None:
+        movimientos = movimientos.filter(fecha__lte=hasta)
+
+    filas = movimientos.annotate(
+        importe=importe_con_signo(),
+        acumulado=Window(Sum(importe_con_signo()), order_by=[F('fecha').asc(), F('id').asc()]),
+    ).values_list('id', 'fecha', 'saldo_anterior', 'saldo_nuevo', 'importe', 'acumulado')
+
+    resumen = {'movimientos': 0, 'corregidos': 0, 'saldo_final': base, 'ultima_fecha': None}
+    corregidos = []
+    for movimiento_id, fecha, anterior, nuevo, importe, acumulado in filas.iterator(chunk_size=2000):
+        saldo_nuevo = (base + acumulado).quantize(CENTAVOS)
+        saldo_anterior = (saldo_nuevo - importe).quantize(CENTAVOS)
+        resumen['movimientos'] += 1
+        resumen['saldo_final'] = saldo_nuevo
+        resumen['ultima_fecha'] = fecha
+        if anterior != saldo_anterior or nuevo != saldo_nuevo:
+            corregidos.append(SaldoTesoreria(
+                id=movimiento_id, saldo_anterior=saldo_anterior, saldo_nuevo=saldo_nuevo
+            ))
+
+    resumen['corregidos'] = len(corregidos)
+    if ejecutar and corregidos:
+        SaldoTesoreria.objects.bulk_update(corregidos, ['saldo_anterior', 'saldo_nuevo'], batch_size=TAMANO_LOTE)
+    return resumen
+
+
+def verificar_cuenta(cuenta_origen, corregir=False):
+    """
+    Recalcula la cadena completa de la cuenta y la compara con lo guardado
+    (incluido el saldo actual de SaldoCuenta). Con corregir=True reescribe
+    los saldos con la cuenta bloqueada. Devuelve el resumen de
+    recalcular_saldos más 'saldo_guardado' y 'saldo_correcto'.
+    """
+    with transaction.atomic():
+        if corregir:
+            cuenta = bloquear_cuenta(cuenta_origen)
+        else:
+            cuenta = SaldoCuenta.objects.filter(cuenta_origen=cuenta_origen).first()
+        resumen = recalcular_saldos(cuenta_origen, ejecutar=corregir)
+        saldo_guardado = cuenta.saldo if cuenta else None
+        resumen['saldo_guardado'] = saldo_guardado
+        resumen['saldo_correcto'] = (
+            saldo_guardado == resumen['saldo_final']
+            and cuenta.ultima_fecha == resumen['ultima_fecha']
+        )
+        if corregir and not resumen['saldo_correcto']:
+            cuenta.saldo = resumen['saldo_final']
+            cuenta.ultima_fecha = resumen['ultima_fecha']
+            cuenta.save(update_fields=['saldo', 'ultima_fecha', 'fecha_actualizacion'])
+    return resumen
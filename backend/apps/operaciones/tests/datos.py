@@ -0,0 +1,58 @@
+"""Datos mínimos para las pruebas de operaciones y pagos"""
+from datetime import date
+from decimal import Decimal
+
+from apps.catalogos.models import (
+    AgenteAduanal, Cliente, Concepto, Empresa, Naviera, NavieraCuenta, Proveedor, Puerto
+)
+from apps.usuarios.models import Usuario
+from ..models import Contenedor, OperacionLogistica, OperacionRevalidacion
+
+
+def crear_usuario(rol='admin', puerto=None, email=None):
+    return Usuario.objects.create_user(
+        email=email or f'{rol}@prueba.com', password='x', nombre=rol.capitalize(),
+        rol=rol, puerto_asignado=puerto
+    )
+
+
+def crear_catalogos():
+    """Catálogos con nombres que no chocan con los de las migraciones de datos"""
+    return {
+        'empresa': Empresa.objects.create(nombre='Empresa prueba'),
+        'cliente': Cliente.objects.create(nombre='Cliente prueba', prefijo='CP'),
+        'puerto': Puerto.objects.create(nombre='Puerto prueba', codigo='PPR'),
+        'otro_puerto': Puerto.objects.create(nombre='Otro puerto', codigo='OPR'),
+        'concepto': Concepto.objects.create(nombre='CONCEPTO PRUEBA'),
+        'naviera': Naviera.objects.create(nombre='NAVIERA PRUEBA'),
+        'proveedor': Proveedor.objects.create(nombre='Proveedor prueba', banco='BBVA', clabe='012345678901234567'),
+        'agente': AgenteAduanal.objects.create(nombre='Agente prueba'),
+    }
+
+
+def crear_contenedor(catalogos, usuario, numero='PRUE1234567', puerto=None):
+    return Contenedor.objects.create(
+        numero=numero, cliente=catalogos['cliente'], empresa=catalogos['empresa'],
+        puerto=puerto or catalogos['puerto'], naviera=catalogos['naviera'], creado_por=usuario
+    )
+
+
+def crear_logistica(contenedor, usuario, catalogos, consecutivo=1, importe=Decimal('100')):
+    return OperacionLogistica.objects.create(
+        contenedor=contenedor, ejecutivo=usuario, empresa=catalogos['empresa'],
+        concepto=catalogos['concepto'], prefijo='PR', consecutivo=consecutivo,
+        importe=importe, fecha=date.today(), proveedor=catalogos['proveedor']
+    )
+
+
+def crear_revalidacion(contenedor, usuario, catalogos, consecutivo=1, importe=Decimal('10')):
+    cuenta, _ = NavieraCuenta.objects.get_or_create(
+        naviera=catalogos['naviera'], beneficiario='Naviera prueba',
+        defaults={'banco': 'Citi', 'cuenta': '998877', 'moneda': 'USD'}
+    )
+    return OperacionRevalidacion.objects.create(
+        contenedor=contenedor, ejecutivo=usuario, empresa=catalogos['empresa'], bl='BLPRUEBA',
+        concepto=catalogos['concepto'], cliente_prefijo='CP', consecutivo=consecutivo,
+        importe=importe, divisa='USD', tipo_cambio=Decimal('18'), fecha=date.today(),
+        naviera_cuenta=cuenta
+    )
@@ -0,0 +1,92 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.catalogos.models import Naviera, TarifaDemora
+from apps.operaciones.demoras import costo_acumulado, pronosticar_demoras, tramos_por_naviera
+from apps.operaciones.models import Contenedor, Demora
+from apps.operaciones.tests.datos import crear_catalogos, crear_contenedor, crear_usuario
+
+
+HOY = date(2026, 3, 10)
+
+
+class CostoAcumuladoTests(SimpleTestCase):
+    """Tarifa escalonada: cada tramo aplica hasta el día anterior al siguiente"""
+
+    tramos = [(1, Decimal('80'), 'USD'), (6, Decimal('120'), 'USD'), (11, Decimal('200'), 'USD')]
+
+    def test_primer_dia(self):
+        self.assertEqual(costo_acumulado(1, self.tramos), (Decimal('80'), Decimal('80')))
+
+    def test_limites_de_tramo(self):
+        self.assertEqual(costo_acumulado(5, self.tramos), (Decimal('400'), Decimal('80')))
+        self.assertEqual(costo_acumulado(6, self.tramos), (Decimal('520'), Decimal('120')))
+        self.assertEqual(costo_acumulado(10, self.tramos), (Decimal('1000'), Decimal('120')))
+        self.assertEqual(costo_acumulado(11, self.tramos), (Decimal('1200'), Decimal('200')))
+
+    def test_despues_del_ultimo_tramo(self):
+        self.assertEqual(costo_acumulado(15, self.tramos), (Decimal('2000'), Decimal('200')))
+
+    def test_primer_tramo_despues_del_dia_1(self):
+        tramos = [(3, Decimal('50'), 'USD'), (6, Decimal('120'), 'USD')]
+        self.assertEqual(costo_acumulado(2, tramos), (Decimal('0'), Decimal('0')))
+        self.assertEqual(costo_acumulado(3, tramos), (Decimal('50'), Decimal('50')))
+        self.assertEqual(costo_acumulado(7, tramos), (Decimal('390'), Decimal('120')))
+
+
+class PronosticoDemorasTests(TestCase):
+    """El arreglo de diferencias da la misma serie que sumar día por día"""
+
+    def setUp(self):
+        usuario = crear_usuario('admin')
+        self.catalogos = crear_catalogos()
+        naviera = self.catalogos['naviera']
+        for desde, costo in [(3, '50'), (6, '120'), (11, '200')]:
+            TarifaDemora.objects.create(naviera=naviera, dia_desde=desde, costo_diario=Decimal(costo), moneda='USD')
+        sin_tarifa = Naviera.objects.create(nombre='NAVIERA SIN TARIFA')
+
+        # (eta relativa a hoy, días libres, naviera): en demora, en el límite
+        # de un tramo, por entrar dentro del horizonte y fuera de él
+        casos = [(-20, 7, naviera), (-20, 7, naviera), (-12, 7, naviera), (-8, 7, naviera),
+                 (-3, 7, naviera), (5, 7, naviera), (40, 7, naviera), (-10, 5, sin_tarifa)]
+        for n, (eta, dias_libres, naviera_contenedor) in enumerate(casos):
+            contenedor = crear_contenedor(self.catalogos, usuario, numero=f'DEMO{n:07d}')
+            Contenedor.objects.filter(pk=contenedor.pk).update(
+                eta=HOY + timedelta(days=eta), dias_libres=dias_libres, naviera=naviera_contenedor
+            )
+        plano = Contenedor.objects.get(numero='DEMO0000007')
+        Demora.objects.create(
+            contenedor=plano, naviera=sin_tarifa, fecha_inicio_demora=HOY,
+            costo_diario=Decimal('30'), costo_total=Decimal('0'), divisa='MXN'
+        )
+
+    def serie_dia_por_dia(self, dias):
+        tramos = tramos_por_naviera()
+        serie = [defaultdict(Decimal) for _ in range(dias)]
+        for contenedor in Contenedor.objects.all():
+            tramos_contenedor = tramos.get(contenedor.naviera_id)
+            if tramos_contenedor is None:
+                demora = contenedor.demoras.get()
+                tramos_contenedor = [(1, demora.costo_diario, demora.divisa)]
+            for k in range(1, dias + 1):
+                dia_demora = (HOY + timedelta(days=k) - contenedor.eta).days - contenedor.dias_libres
+                if dia_demora >= 1:
+                    _, diario = costo_acumulado(dia_demora, tramos_contenedor)
+                    serie[k - 1][tramos_contenedor[0][2]] += diario
+        return [{moneda: float(valor) for moneda, valor in sorted(dia.items()) if valor} for dia in serie]
+
+    def test_serie_coincide_con_calculo_dia_por_dia(self):
+        dias = 30
+        pronostico = pronosticar_demoras(Contenedor.objects.all(), dias, hoy=HOY)
+
+        obtenida = [{m: v for m, v in dia['costo'].items() if v} for dia in pronostico['serie']]
+        self.assertEqual(obtenida, self.serie_dia_por_dia(dias))
+
+        esperados = defaultdict(float)
+        for dia in obtenida:
+            for moneda, valor in dia.items():
+                esperados[moneda] += valor
+        self.assertEqual(pronostico['totales'], dict(esperados))
@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.catalogos.models import TipoCambio
+from apps.operaciones.models import OperacionRevalidacion
+from .datos import crear_catalogos, crear_contenedor, crear_revalidacion, crear_usuario
+
+
+class ImportesNormalizadosTests(TestCase):
+
+    def setUp(self):
+        usuario = crear_usuario('admin')
+        catalogos = crear_catalogos()
+        contenedor = crear_contenedor(catalogos, usuario)
+        self.operacion = crear_revalidacion(contenedor, usuario, catalogos, importe=Decimal('200'))
+        OperacionRevalidacion.objects.filter(pk=self.operacion.pk).update(divisa='MXN', tipo_cambio=Decimal('0'))
+
+    def test_tipo_cambio_en_cero_usa_el_historico(self):
+        TipoCambio.objects.create(fecha=self.operacion.fecha, valor=Decimal('20'), fuente=TipoCambio.Fuente.FIJO)
+        fila = OperacionRevalidacion.objects.con_importes_normalizados().get(pk=self.operacion.pk)
+        self.assertEqual(fila.importe_en_usd, Decimal('10'))
+
+    def test_sin_tipo_cambio_valido_no_divide_entre_cero(self):
+        TipoCambio.objects.create(fecha=self.operacion.fecha, valor=Decimal('0'), fuente=TipoCambio.Fuente.FIJO)
+        fila = OperacionRevalidacion.objects.con_importes_normalizados().get(pk=self.operacion.pk)
+        self.assertIsNone(fila.importe_en_usd)
+        totales = OperacionRevalidacion.objects.totales_por_divisa()
+        self.assertEqual(totales['total_mxn'], Decimal('200'))
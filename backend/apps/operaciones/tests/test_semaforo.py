@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from rest_framework.test import APITestCase
+
+from apps.operaciones.models import Contenedor, TransicionSemaforo
+from apps.operaciones.semaforo import Semaforo, recalcular_semaforos
+from .datos import crear_catalogos, crear_contenedor, crear_usuario
+
+
+class SemaforoVigentesTests(APITestCase):
+    """El job y los cambios del día solo consideran contenedores activos"""
+
+    def setUp(self):
+        self.usuario = crear_usuario('admin')
+        catalogos = crear_catalogos()
+        self.activo = crear_contenedor(catalogos, self.usuario, numero='PRUE0000001')
+        self.completado = crear_contenedor(catalogos, self.usuario, numero='PRUE0000002')
+        self.eta = date.today() + timedelta(days=5)
+        Contenedor.objects.update(eta=self.eta, dias_libres=7, semaforo=Semaforo.AZUL, semaforo_cambia=self.eta)
+        Contenedor.objects.filter(pk=self.completado.pk).update(estatus=Contenedor.Estatus.COMPLETADO)
+
+    def test_recalcula_solo_activos(self):
+        resumen = recalcular_semaforos(hoy=self.eta)
+        self.assertEqual(resumen['Contenedor'], (1, 1))
+        self.activo.refresh_from_db()
+        self.completado.refresh_from_db()
+        self.assertEqual(self.activo.semaforo, Semaforo.VERDE)
+        self.assertEqual(self.completado.semaforo, Semaforo.AZUL)
+
+    def test_cambios_semaforo_excluye_no_activos(self):
+        TransicionSemaforo.objects.all().delete()
+        for contenedor in (self.activo, self.completado):
+            TransicionSemaforo.objects.create(
+                contenedor=contenedor, anterior=Semaforo.AZUL, nuevo=Semaforo.VERDE, fecha=date.today()
+            )
+        self.client.force_authenticate(self.usuario)
+        respuesta = self.client.get('/api/operaciones/contenedores/cambios_semaforo/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([t['contenedor'] for t in respuesta.data], [self.activo.id])
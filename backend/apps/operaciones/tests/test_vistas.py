@@ -0,0 +1,85 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from rest_framework.test import APITestCase
+
+from apps.operaciones.models import (
+    Clasificacion, Demora, Documento, Garantia, OperacionLogistica, OperacionRevalidacion,
+    Pedimento, Prestamo
+)
+from apps.pagos.models import Pago, PagoLogistica, PagoRevalidacion
+from .datos import crear_catalogos, crear_contenedor, crear_logistica, crear_revalidacion, crear_usuario
+
+
+class ContenedorCompletoTests(APITestCase):
+    """contenedores/{id}/completo/ hace las mismas consultas sin importar cuántas filas tenga"""
+
+    def setUp(self):
+        self.catalogos = crear_catalogos()
+        self.admin = crear_usuario('admin')
+        self.contenedor = crear_contenedor(self.catalogos, self.admin)
+        # Caché de ContentType caliente, como en un proceso ya en marcha
+        ContentType.objects.get_for_models(Pago, OperacionLogistica, OperacionRevalidacion)
+
+    def poblar(self, filas):
+        catalogos, usuario, contenedor = self.catalogos, self.admin, self.contenedor
+        hoy = date.today()
+        clasificacion = Clasificacion.objects.create(
+            contenedor=contenedor, ejecutivo=usuario, agente_aduanal=catalogos['agente'],
+            prefijo='CP', consecutivo=1, bl='BLPRUEBA'
+        )
+        for n in range(filas):
+            Pedimento.objects.create(numero=f'PED{n}', contenedor=contenedor, agente_aduanal=catalogos['agente'])
+            logistica = crear_logistica(contenedor, usuario, catalogos, consecutivo=2 * n + 1)
+            otra = crear_logistica(contenedor, usuario, catalogos, consecutivo=2 * n + 2)
+            revalidacion = crear_revalidacion(contenedor, usuario, catalogos, consecutivo=n + 1)
+            PagoLogistica.objects.create(operacion=logistica, usuario=usuario, monto=Decimal('100'))
+            PagoRevalidacion.objects.create(operacion=revalidacion, usuario=usuario, monto=Decimal('10'))
+            Pago.objects.create(
+                content_type=ContentType.objects.get_for_model(OperacionLogistica),
+                object_id=otra.id, usuario=usuario, monto=Decimal('5')
+            )
+            Documento.objects.create(contenedor=contenedor, tipo='factura', archivo='x.pdf', subido_por=usuario)
+            Documento.objects.create(clasificacion=clasificacion, tipo='factura', archivo='y.pdf', subido_por=usuario)
+            Demora.objects.create(
+                contenedor=contenedor, naviera=catalogos['naviera'], fecha_inicio_demora=hoy,
+                costo_diario=Decimal('1'), costo_total=Decimal('1')
+            )
+            Garantia.objects.create(
+                contenedor=contenedor, naviera=catalogos['naviera'], monto=Decimal('1'),
+                fecha_deposito=hoy, registrado_por=usuario
+            )
+            Prestamo.objects.create(
+                cliente=catalogos['cliente'], contenedor=contenedor, monto=Decimal('1'), registrado_por=usuario
+            )
+
+    def consultar(self, usuario, consultas):
+        self.client.force_authenticate(usuario)
+        with self.assertNumQueries(consultas):
+            respuesta = self.client.get(f'/api/operaciones/contenedores/{self.contenedor.id}/completo/')
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.data
+
+    def test_admin_una_fila(self):
+        self.poblar(1)
+        datos = self.consultar(self.admin, 12)
+        self.assertEqual(len(datos['operaciones_logistica']), 2)
+        self.assertEqual(len(datos['documentos']), 2)
+
+    def test_admin_varias_filas(self):
+        self.poblar(4)
+        datos = self.consultar(self.admin, 12)
+        self.assertEqual(len(datos['pedimentos']), 4)
+        self.assertEqual(len(datos['operaciones_logistica']), 8)
+        self.assertEqual(len(datos['operaciones_revalidacion']), 4)
+        self.assertEqual(len(datos['documentos']), 8)
+        self.assertEqual(len(datos['prestamos']), 4)
+
+    def test_logistica_sin_revalidaciones(self):
+        self.poblar(4)
+        usuario = crear_usuario('logistica', puerto=self.catalogos['puerto'])
+        # Sin las consultas de operaciones de revalidación y sus pagos
+        datos = self.consultar(usuario, 10)
+        self.assertIn('operaciones_logistica', datos)
+        self.assertNotIn('operaciones_revalidacion', datos)
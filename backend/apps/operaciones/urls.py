@@ -5,7 +5,8 @@ from .views import (
     ContenedorViewSet,
     OperacionLogisticaViewSet,
     OperacionRevalidacionViewSet,
-    ClasificacionViewSet
+    ClasificacionViewSet,
+    SaldoTesoreriaViewSet
 )
 
 router = DefaultRouter()
@@ -15,6 +16,7 @@ router.register(r'contenedores', ContenedorViewSet, basename='contenedor')
 router.register(r'logistica', OperacionLogisticaViewSet, basename='operacion-logistica')
 router.register(r'revalidaciones', OperacionRevalidacionViewSet, basename='operacion-revalidacion')
 router.register(r'clasificaciones', ClasificacionViewSet, basename='clasificacion')
+router.register(r'saldos-tesoreria', SaldoTesoreriaViewSet, basename='saldo-tesoreria')
 
 # Endpoint legacy (mantener para compatibilidad)
 router.register(r'tickets', TicketViewSet, basename='ticket')
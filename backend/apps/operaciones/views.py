@@ -1,4 +1,4 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -6,12 +6,16 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Sum, Count, Q
-from datetime import date, timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Prefetch, Q
+from datetime import date
+from functools import partial
+import os
 
 from .models import (
     Ticket, Contenedor, OperacionLogistica, OperacionRevalidacion,
-    Clasificacion, Documento, Demora, Garantia, Prestamo
+    Clasificacion, Documento, Demora, Garantia, Prestamo, TransicionSemaforo,
+    SaldoCuenta, SaldoTesoreria, Pedimento
 )
 from .serializers import (
     TicketListSerializer, TicketDetailSerializer,
@@ -19,12 +23,73 @@ from .serializers import (
     TicketEditarEtaSerializer,
     # Nuevos serializers
     ContenedorListSerializer, ContenedorDetailSerializer, ContenedorCreateSerializer,
+    ContenedorCompletoSerializer,
     OperacionLogisticaListSerializer, OperacionLogisticaCreateSerializer,
     OperacionRevalidacionListSerializer, OperacionRevalidacionCreateSerializer,
     ClasificacionSerializer, DocumentoSerializer,
-    DemoraSerializer, GarantiaSerializer, PrestamoSerializer
+    DemoraSerializer, GarantiaSerializer, PrestamoSerializer,
+    TransicionSemaforoSerializer, SaldoTesoreriaSerializer, SaldoCuentaSerializer
 )
+from .demoras import pronosticar_demoras
+from .semaforo import Semaforo
+from .tesoreria import registrar_movimiento
+from apps.archivos.serializers import PreviewsField
+from apps.catalogos.tipo_cambio import parsear_fecha
 from apps.auditoria.utils import registrar_accion
+from apps.core.cache import cache_por_usuario
+from apps.core.exportacion import respuesta_csv
+from apps.core.zip import respuesta_zip, nombre_seguro, nombres_unicos
+from apps.pagos.models import Pago, PagoLogistica, PagoRevalidacion
+
+
+def _totales_a_float(totales):
+    """Convierte los totales (Decimal/None) de un aggregate a float para la respuesta"""
+    return {k: float(v or 0) if k.startswith('total_') else v for k, v in totales.items()}
+
+
+def _respuesta_cambios_semaforo(request, transiciones):
+    """
+    Transiciones de semáforo de un día: ?fecha= (default hoy) y opcionalmente
+    ?semaforo=rojo para "los que pasaron a rojo hoy".
+    """
+    try:
+        fecha = parsear_fecha(request.query_params['fecha']) if request.query_params.get('fecha') else date.today()
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    transiciones = transiciones.filter(fecha=fecha)
+    semaforo = request.query_params.get('semaforo')
+    if semaforo:
+        transiciones = transiciones.filter(nuevo=semaforo)
+    return Response(TransicionSemaforoSerializer(transiciones, many=True).data)
+
+
+class ImportesDivisaMixin:
+    """
+    Acciones de resumen y exportación con importes normalizados (MXN/USD)
+    calculados en SQL. El viewset define `columnas_exportacion`
+    [(encabezado, campo)] y `nombre_exportacion`.
+    """
+    columnas_exportacion = []
+    nombre_exportacion = 'exportacion'
+
+    @action(detail=False, methods=['get'])
+    def resumen(self, request):
+        """Totales por divisa y normalizados, global y por empresa"""
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        por_empresa = [_totales_a_float(fila) for fila in queryset.resumen_por('empresa__nombre')]
+        return Response({
+            'totales': _totales_a_float(queryset.totales_por_divisa()),
+            'por_empresa': por_empresa,
+        })
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """CSV de las operaciones filtradas, con importes normalizados"""
+        queryset = self.filter_queryset(self.get_queryset()).con_importes_normalizados()
+        encabezados = [encabezado for encabezado, _ in self.columnas_exportacion]
+        campos = [campo for _, campo in self.columnas_exportacion]
+        filas = queryset.values_list(*campos).iterator(chunk_size=2000)
+        return respuesta_csv(f'{self.nombre_exportacion}_{date.today():%Y%m%d}.csv', encabezados, filas)
 
 
 # ============ CONTENEDOR VIEWSET ============
@@ -54,6 +119,8 @@ class ContenedorViewSet(viewsets.ModelViewSet):
             return ContenedorCreateSerializer
         if self.action == 'retrieve':
             return ContenedorDetailSerializer
+        if self.action == 'completo':
+            return ContenedorCompletoSerializer
         return ContenedorListSerializer
 
     def get_queryset(self):
@@ -63,24 +130,15 @@ class ContenedorViewSet(viewsets.ModelViewSet):
         # Filtrar por puerto asignado (Admin y Pagos ven todos)
         queryset = user.filtrar_por_puerto(queryset, campo_puerto='puerto')
 
-        # Filtros adicionales por query params
+        if self.action == 'completo':
+            queryset = queryset.select_related(
+                'clasificacion__ejecutivo', 'clasificacion__visto_bueno_por'
+            ).prefetch_related(*_prefetch_completo(user))
+
+        # Filtros adicionales por query params (semáforo almacenado, indexado)
         semaforo = self.request.query_params.get('semaforo')
         if semaforo:
-            hoy = date.today()
-            if semaforo == 'verde':
-                queryset = queryset.filter(eta__gt=hoy + timedelta(days=21))
-            elif semaforo == 'amarillo':
-                queryset = queryset.filter(
-                    eta__lte=hoy + timedelta(days=21),
-                    eta__gte=hoy + timedelta(days=10)
-                )
-            elif semaforo == 'rojo':
-                queryset = queryset.filter(
-                    eta__lt=hoy + timedelta(days=10),
-                    eta__gte=hoy
-                )
-            elif semaforo == 'vencido':
-                queryset = queryset.filter(eta__lt=hoy)
+            queryset = queryset.filter(semaforo=semaforo)
 
         return queryset
 
@@ -101,21 +159,16 @@ class ContenedorViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=False, methods=['get'])
+    @cache_por_usuario('contenedores')
     def dashboard(self, request):
         """Dashboard de contenedores"""
-        hoy = date.today()
         queryset = self.get_queryset()
 
         activos = queryset.filter(estatus='activo')
 
         total_activos = activos.count()
-        alertas_preventivas = activos.filter(
-            eta__lte=hoy + timedelta(days=21),
-            eta__gte=hoy + timedelta(days=10)
-        ).count()
-        criticos = activos.filter(
-            Q(eta__lt=hoy + timedelta(days=10)) | Q(eta__lt=hoy)
-        ).count()
+        alertas_preventivas = activos.filter(semaforo=Semaforo.AMARILLO).count()
+        criticos = activos.filter(semaforo__in=[Semaforo.ROJO, Semaforo.VENCIDO]).count()
 
         por_estatus = queryset.values('estatus').annotate(
             cantidad=Count('id')
@@ -131,9 +184,162 @@ class ContenedorViewSet(viewsets.ModelViewSet):
         })
 
 
+    @action(detail=False, methods=['get'])
+    def cambios_semaforo(self, request):
+        """Contenedores activos (visibles para el usuario) que cambiaron de semáforo en una fecha"""
+        contenedores = self.get_queryset().filter(estatus=Contenedor.Estatus.ACTIVO)
+        transiciones = TransicionSemaforo.objects.filter(
+            contenedor__in=contenedores.order_by().values('id')
+        ).select_related('contenedor')
+        return _respuesta_cambios_semaforo(request, transiciones)
+
+    @action(detail=True, methods=['get'])
+    def completo(self, request, pk=None):
+        """
+        Contenedor con pedimentos, operaciones, clasificación, documentos,
+        demoras, garantías, préstamos y pagos. Una consulta por relación
+        (a lo más 12 para Admin), sin importar cuántos registros tenga.
+        """
+        contenedor = self.get_object()
+        contenedor.pagos_registros = _pagos_registros(contenedor, request.user)
+        return Response(self.get_serializer(contenedor).data)
+
+    @action(detail=True, methods=['get'])
+    def documentos_zip(self, request, pk=None):
+        """ZIP con todos los documentos del contenedor (incluye los de su clasificación)"""
+        contenedor = self.get_object()
+        return _respuesta_documentos_zip([contenedor.id], f'documentos_{contenedor.numero}.zip')
+
+    @action(detail=False, methods=['get'])
+    @cache_por_usuario('contenedores', 'catalogos')
+    def pronostico_demoras(self, request):
+        """
+        Costo de demoras proyectado para los próximos N días (?dias=7, máx. 90)
+        si ningún contenedor activo se mueve; serie diaria y totales por
+        puerto, naviera y cliente. Acepta los filtros del listado.
+        """
+        try:
+            dias = int(request.query_params.get('dias', 7))
+        except ValueError:
+            dias = 0
+        if not 1 <= dias <= 90:
+            return Response(
+                {'error': 'dias debe ser un entero entre 1 y 90'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(pronosticar_demoras(queryset, dias))
+
+    @action(detail=False, methods=['get'])
+    def documentos_bl_zip(self, request):
+        """ZIP con los documentos de todos los contenedores de un BL: ?bl=XXXX"""
+        bl = request.query_params.get('bl', '').strip()
+        if not bl:
+            return Response(
+                {'error': 'Debe indicar el BL (?bl=)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ids = list(self.get_queryset().filter(bl_master__iexact=bl).values_list('id', flat=True))
+        if not ids:
+            return Response(
+                {'error': 'No hay contenedores para ese BL'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return _respuesta_documentos_zip(ids, f'documentos_BL_{bl}.zip')
+
+
+def _prefetch_completo(user):
+    """Relaciones de ContenedorCompletoSerializer; logística y revalidación según permisos"""
+    documentos = Documento.objects.select_related('subido_por')
+    prefetch = [
+        Prefetch('pedimentos', queryset=Pedimento.objects.select_related('agente_aduanal', 'comercializadora')),
+        Prefetch('documentos', queryset=documentos),
+        Prefetch('clasificacion__documentos', queryset=documentos),
+        Prefetch('demoras', queryset=Demora.objects.select_related('naviera')),
+        Prefetch('garantias', queryset=Garantia.objects.select_related('naviera', 'registrado_por')),
+        Prefetch('prestamos', queryset=Prestamo.objects.select_related('cliente', 'registrado_por')),
+    ]
+    if user.puede_ver_sabana_logistica:
+        prefetch += [
+            Prefetch('operaciones_logistica', queryset=OperacionLogistica.objects.select_related(
+                'ejecutivo', 'empresa', 'concepto', 'proveedor'
+            )),
+            Prefetch('operaciones_logistica__pagos', queryset=PagoLogistica.objects.select_related('usuario')),
+        ]
+    if user.puede_ver_sabana_revalidacion:
+        prefetch += [
+            Prefetch('operaciones_revalidacion', queryset=OperacionRevalidacion.objects.select_related(
+                'ejecutivo', 'empresa', 'concepto', 'naviera_cuenta__naviera'
+            )),
+            Prefetch('operaciones_revalidacion__pagos', queryset=PagoRevalidacion.objects.select_related('usuario')),
+        ]
+    return prefetch
+
+
+def _pagos_registros(contenedor, user):
+    """
+    Pagos genéricos (Pago, relación polimórfica) de las operaciones ya
+    precargadas del contenedor, en una consulta; la operación de cada pago
+    se toma de las precargadas.
+    """
+    operaciones = {}
+    if user.puede_ver_sabana_logistica:
+        operaciones[OperacionLogistica] = contenedor.operaciones_logistica.all()
+    if user.puede_ver_sabana_revalidacion:
+        operaciones[OperacionRevalidacion] = contenedor.operaciones_revalidacion.all()
+
+    por_clave = {}
+    filtro = Q()
+    for modelo, lista in operaciones.items():
+        if not lista:
+            continue
+        content_type_id = ContentType.objects.get_for_model(modelo).id
+        por_clave.update({(content_type_id, operacion.id): operacion for operacion in lista})
+        filtro |= Q(content_type_id=content_type_id, object_id__in=[operacion.id for operacion in lista])
+    if not por_clave:
+        return []
+
+    pagos = list(Pago.objects.filter(filtro).select_related('usuario'))
+    campo = Pago._meta.get_field('operacion')
+    for pago in pagos:
+        campo.set_cached_value(pago, por_clave[(pago.content_type_id, pago.object_id)])
+    return pagos
+
+
+def _respuesta_documentos_zip(contenedor_ids, nombre_zip):
+    """
+    ZIP en streaming con los documentos de los contenedores indicados.
+    Cada archivo se lee por bloques del storage conforme se envía: no se arma
+    el ZIP en memoria ni en un temporal.
+    """
+    documentos = list(
+        Documento.objects
+        .filter(Q(contenedor__in=contenedor_ids) | Q(clasificacion__contenedor__in=contenedor_ids))
+        .values_list('contenedor__numero', 'clasificacion__contenedor__numero', 'tipo', 'nombre_archivo', 'archivo')
+        .order_by('contenedor__numero', 'tipo', 'id')
+    )
+    storage = Documento._meta.get_field('archivo').storage
+    documentos = [d for d in documentos if d[4] and storage.exists(d[4])]
+    if not documentos:
+        return Response(
+            {'error': 'No hay documentos para descargar'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    nombres = nombres_unicos(
+        f"{numero or numero_clasificacion}/{tipo}_{nombre_seguro(nombre or os.path.basename(archivo))}"
+        for numero, numero_clasificacion, tipo, nombre, archivo in documentos
+    )
+    archivos = (
+        (nombre, partial(storage.open, documento[4], 'rb'))
+        for nombre, documento in zip(nombres, documentos)
+    )
+    return respuesta_zip(nombre_zip, archivos)
+
+
 # ============ OPERACION LOGISTICA VIEWSET ============
 
-class OperacionLogisticaViewSet(viewsets.ModelViewSet):
+class OperacionLogisticaViewSet(ImportesDivisaMixin, viewsets.ModelViewSet):
     """
     Sábana de Logística - trabaja con TERMINALES, usa # CONTENEDOR como ID.
 
@@ -153,6 +359,15 @@ class OperacionLogisticaViewSet(viewsets.ModelViewSet):
     search_fields = ['contenedor__numero', 'comentarios', 'pedimento']
     ordering_fields = ['fecha', 'fecha_creacion', 'importe']
     ordering = ['-fecha', '-id']
+    nombre_exportacion = 'logistica'
+    columnas_exportacion = [
+        ('Fecha', 'fecha'), ('Contenedor', 'contenedor__numero'),
+        ('Comentarios', 'comentarios'), ('Empresa', 'empresa__nombre'),
+        ('Concepto', 'concepto__nombre'), ('Proveedor', 'proveedor__nombre'),
+        ('Divisa', 'divisa'), ('Importe', 'importe'),
+        ('Importe MXN', 'importe_en_mxn'), ('Importe USD', 'importe_en_usd'),
+        ('Estatus', 'estatus'), ('Fecha pago', 'fecha_pago'),
+    ]
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -205,7 +420,7 @@ class OperacionLogisticaViewSet(viewsets.ModelViewSet):
 
 # ============ OPERACION REVALIDACION VIEWSET ============
 
-class OperacionRevalidacionViewSet(viewsets.ModelViewSet):
+class OperacionRevalidacionViewSet(ImportesDivisaMixin, viewsets.ModelViewSet):
     """
     Sábana de Revalidaciones - trabaja con NAVIERAS, usa BL como ID.
 
@@ -224,6 +439,15 @@ class OperacionRevalidacionViewSet(viewsets.ModelViewSet):
     search_fields = ['bl', 'contenedor__numero', 'referencia']
     ordering_fields = ['fecha', 'fecha_creacion', 'importe']
     ordering = ['-fecha', '-id']
+    nombre_exportacion = 'revalidaciones'
+    columnas_exportacion = [
+        ('Fecha', 'fecha'), ('BL', 'bl'), ('Contenedor', 'contenedor__numero'),
+        ('Referencia', 'referencia'), ('Empresa', 'empresa__nombre'),
+        ('Concepto', 'concepto__nombre'), ('Divisa', 'divisa'), ('Importe', 'importe'),
+        ('Tipo de cambio', 'tipo_cambio'),
+        ('Importe MXN', 'importe_en_mxn'), ('Importe USD', 'importe_en_usd'),
+        ('Estatus', 'estatus'), ('Fecha pago tesorería', 'fecha_pago_tesoreria'),
+    ]
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -431,6 +655,7 @@ class TicketViewSet(viewsets.ModelViewSet):
             estatus_display = serializers.CharField(source='get_estatus_display', read_only=True)
             agente_aduanal_nombre = serializers.CharField(source='agente_aduanal.nombre', read_only=True, default='')
             sensibilidad_contenido_display = serializers.CharField(source='get_sensibilidad_contenido_display', read_only=True)
+            comprobante_pago_previews = PreviewsField(source='comprobante_pago')
 
             class Meta:
                 model = Ticket
@@ -444,7 +669,7 @@ class TicketViewSet(viewsets.ModelViewSet):
                     'sensibilidad_contenido', 'sensibilidad_contenido_display',
                     'semaforo', 'dias_restantes', 'observaciones',
                     'fecha_creacion', 'fecha_actualizacion', 'contador_ediciones',
-                    'concepto', 'proveedor', 'fecha_pago', 'comprobante_pago',
+                    'concepto', 'proveedor', 'fecha_pago', 'comprobante_pago', 'comprobante_pago_previews',
                     'tipo_operacion', 'puerto', 'puerto_codigo'
                 ]
         
@@ -649,6 +874,18 @@ class TicketViewSet(viewsets.ModelViewSet):
         })
     
     @action(detail=False, methods=['get'])
+    def cambios_semaforo(self, request):
+        """Tickets pendientes (del puerto del usuario) que cambiaron de semáforo en una fecha"""
+        tickets = request.user.filtrar_por_puerto(
+            self.get_queryset().filter(estatus=Ticket.Estatus.PENDIENTE), campo_puerto='puerto'
+        )
+        transiciones = TransicionSemaforo.objects.filter(
+            ticket__in=tickets.order_by().values('id')
+        ).select_related('ticket')
+        return _respuesta_cambios_semaforo(request, transiciones)
+
+    @action(detail=False, methods=['get'])
+    @cache_por_usuario('tickets')
     def dashboard(self, request):
         """
         Datos para el dashboard según documento:
@@ -657,53 +894,50 @@ class TicketViewSet(viewsets.ModelViewSet):
         - Casos críticos/vencidos (rojo)
         - Monto total por cobrar
         """
-        hoy = date.today()
         queryset = self.get_queryset()
         
         # Filtrar solo pendientes para KPIs
         pendientes = queryset.filter(estatus='pendiente')
         
-        # Contadores
+        # Contadores (semáforo almacenado)
         total_activos = pendientes.count()
         
-        alertas_preventivas = pendientes.filter(
-            eta__lte=hoy + timedelta(days=21),
-            eta__gte=hoy + timedelta(days=10)
-        ).count()
-        
-        criticos = pendientes.filter(
-            Q(eta__lt=hoy + timedelta(days=10)) | Q(eta__lt=hoy)
-        ).count()
+        alertas_preventivas = pendientes.filter(semaforo=Semaforo.AMARILLO).count()
         
-        monto_por_cobrar = pendientes.aggregate(
-            total=Sum('importe')
-        )['total'] or 0
+        criticos = pendientes.filter(semaforo__in=[Semaforo.ROJO, Semaforo.VENCIDO]).count()
         
+        # Importes MXN y USD por separado y normalizados a MXN (en SQL)
+        totales = pendientes.totales_por_divisa()
+
         # Por estatus
-        por_estatus = queryset.values('estatus').annotate(
-            cantidad=Count('id'),
-            monto=Sum('importe')
-        )
-        
+        por_estatus = [
+            _totales_a_float(fila) | {'monto': float(fila['total_normalizado_mxn'] or 0)}
+            for fila in queryset.order_by().resumen_por('estatus')
+        ]
+
         # Por empresa
-        por_empresa = queryset.filter(estatus='pendiente').values(
-            'empresa__nombre'
-        ).annotate(
-            cantidad=Count('id'),
-            monto=Sum('importe')
-        ).order_by('-monto')[:10]
-        
+        por_empresa = [
+            _totales_a_float(fila) | {'monto': float(fila['total_normalizado_mxn'] or 0)}
+            for fila in pendientes.order_by().resumen_por('empresa__nombre')[:10]
+        ]
+
         return Response({
             'kpis': {
                 'contenedores_activos': total_activos,
                 'alertas_preventivas': alertas_preventivas,
                 'casos_criticos': criticos,
-                'monto_por_cobrar': float(monto_por_cobrar)
+                # monto_por_cobrar: total normalizado a MXN
+                'monto_por_cobrar': float(totales['total_normalizado_mxn'] or 0),
+                'monto_por_cobrar_usd': float(totales['total_normalizado_usd'] or 0),
+                'monto_por_cobrar_por_divisa': {
+                    'MXN': float(totales['total_mxn'] or 0),
+                    'USD': float(totales['total_usd'] or 0),
+                },
             },
-            'por_estatus': list(por_estatus),
-            'por_empresa': list(por_empresa)
+            'por_estatus': por_estatus,
+            'por_empresa': por_empresa
         })
-    
+
     @action(detail=False, methods=['get'])
     def siguiente_consecutivo(self, request):
         """Obtener el siguiente consecutivo para un prefijo"""
@@ -716,3 +950,52 @@ class TicketViewSet(viewsets.ModelViewSet):
         
         siguiente = Ticket.obtener_siguiente_consecutivo(prefijo)
         return Response({'prefijo': prefijo, 'siguiente_consecutivo': siguiente})
+
+
+
+# ============ SALDOS TESORERIA ============
+
+class SaldoTesoreriaViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Movimientos de saldo de tesorería (Admin y Pagos).
+    Solo alta: saldo_anterior/saldo_nuevo los calcula el libro de saldos
+    (tesoreria.py); las correcciones se registran como ajuste.
+    """
+    queryset = SaldoTesoreria.objects.select_related('cliente', 'empresa', 'registrado_por').all()
+    serializer_class = SaldoTesoreriaSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_fields = ['cuenta_origen', 'tipo', 'cliente', 'empresa', 'fecha']
+    search_fields = ['cuenta_origen', 'referencia']
+    ordering_fields = ['fecha', 'monto']
+    ordering = ['-fecha', '-id']
+
+    def get_queryset(self):
+        if not self.request.user.puede_registrar_pagos:
+            raise PermissionDenied('No tienes permiso para ver los saldos de tesorería')
+        return super().get_queryset()
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        movimiento = registrar_movimiento(registrado_por=user, **serializer.validated_data)
+        serializer.instance = movimiento
+
+        registrar_accion(
+            usuario=user,
+            accion='MOVIMIENTO_SALDO',
+            descripcion=f'Movimiento de saldo: {movimiento}',
+            modelo='SaldoTesoreria',
+            objeto_id=movimiento.id,
+            datos_nuevos={
+                'cuenta_origen': movimiento.cuenta_origen,
+                'monto': str(movimiento.monto),
+                'saldo_nuevo': str(movimiento.saldo_nuevo)
+            }
+        )
+
+    @action(detail=False, methods=['get'])
+    def saldos(self, request):
+        """Saldo actual de cada cuenta"""
+        if not request.user.puede_registrar_pagos:
+            raise PermissionDenied('No tienes permiso para ver los saldos de tesorería')
+        return Response(SaldoCuentaSerializer(SaldoCuenta.objects.all(), many=True).data)
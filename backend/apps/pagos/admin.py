@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Pago, PagoLogistica, PagoRevalidacion,
-    CierreOperacion, CierreLegacy
+    CierreOperacion, CierreLegacy, EstadoCuenta, MovimientoBancario, LotePago
 )
 
 
@@ -58,4 +58,29 @@ class CierreLegacyAdmin(admin.ModelAdmin):
     list_filter = ['fecha_cierre', 'usuario']
     search_fields = ['ticket__comentarios', 'ticket__contenedor', 'observaciones']
     readonly_fields = ['fecha_cierre']
-    raw_id_fields = ['ticket']
\ No newline at end of file
+    raw_id_fields = ['ticket']
+
+@admin.register(EstadoCuenta)
+class EstadoCuentaAdmin(admin.ModelAdmin):
+    list_display = ['id', 'archivo', 'formato', 'cuenta', 'usuario', 'fecha_importacion']
+    list_filter = ['formato', 'fecha_importacion']
+    search_fields = ['archivo', 'cuenta']
+    readonly_fields = ['fecha_importacion']
+
+
+@admin.register(MovimientoBancario)
+class MovimientoBancarioAdmin(admin.ModelAdmin):
+    list_display = ['id', 'estado_cuenta', 'fecha', 'referencia', 'monto', 'estatus', 'candidatos']
+    list_filter = ['estatus', 'fecha']
+    search_fields = ['referencia', 'descripcion', 'id_banco']
+    readonly_fields = ['fecha_conciliacion']
+    date_hierarchy = 'fecha'
+    raw_id_fields = ['estado_cuenta']
+
+
+@admin.register(LotePago)
+class LotePagoAdmin(admin.ModelAdmin):
+    list_display = ['id', 'referencia', 'layout', 'estatus', 'usuario', 'fecha_creacion']
+    list_filter = ['estatus', 'layout', 'fecha_creacion']
+    search_fields = ['referencia']
+    readonly_fields = ['referencia', 'lineas', 'operaciones', 'fecha_creacion', 'fecha_cancelacion']
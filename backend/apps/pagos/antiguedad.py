@@ -0,0 +1,155 @@
+"""
+Antigüedad de saldos por pagar.
+
+Importes por pagar (pendientes o en proceso) de tickets, operaciones de
+logística y de revalidación agrupados en rangos de antigüedad (días desde
+fecha_alta / fecha) por empresa, proveedor o naviera.
+
+Cada origen se resuelve con una sola consulta agrupada por (grupo, divisa):
+los rangos son SUM(importe) FILTER (WHERE fecha BETWEEN ...) con límites
+calculados en Python, sin aritmética de fechas por fila, así que PostgreSQL
+puede usar el índice (estatus, fecha) de cada tabla.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import CharField, Count, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.operaciones.models import OperacionLogistica, OperacionRevalidacion, Ticket
+
+
+# (nombre, desde, hasta) en días de antigüedad; hasta=None es abierto
+RANGOS = [('0-7', 0, 7), ('8-15', 8, 15), ('16-30', 16, 30), ('30+', 31, None)]
+AGRUPACIONES = ('empresa', 'proveedor', 'naviera')
+# En proceso: incluida en un lote de pago masivo, aún no confirmada como pagada
+ESTATUS_POR_PAGAR = ('pendiente', 'en_proceso')
+
+
+def _relacion(*campos):
+    """(expresión id, expresión nombre) del grupo; varios campos = primero no nulo"""
+    if not campos:
+        return Value(None, output_field=IntegerField()), Value(None, output_field=CharField())
+    if len(campos) == 1:
+        return F(f'{campos[0]}_id'), F(f'{campos[0]}__nombre')
+    return Coalesce(*[f'{c}_id' for c in campos]), Coalesce(*[f'{c}__nombre' for c in campos])
+
+
+# origen -> (modelo, campo de fecha, campo de puerto, {agrupación: relaciones})
+ORIGENES = {
+    'tickets': (Ticket, 'fecha_alta', 'puerto', {
+        'empresa': ('empresa',),
+        'proveedor': ('proveedor',),
+        'naviera': ('naviera',),
+    }),
+    'logistica': (OperacionLogistica, 'fecha', 'contenedor__puerto', {
+        'empresa': ('empresa',),
+        'proveedor': ('proveedor',),
+        'naviera': ('contenedor__naviera',),
+    }),
+    # Revalidación no tiene proveedor: se paga a la naviera de la cuenta
+    'revalidacion': (OperacionRevalidacion, 'fecha', 'contenedor__puerto', {
+        'empresa': ('empresa',),
+        'proveedor': (),
+        'naviera': ('naviera_cuenta__naviera', 'contenedor__naviera'),
+    }),
+}
+
+
+def _filtros_rangos(campo_fecha, hoy):
+    """{nombre: Q} por rango; las fechas futuras caen en el primero"""
+    filtros = {}
+    for i, (nombre, desde, hasta) in enumerate(RANGOS):
+        q = Q()
+        if i > 0:
+            q &= Q(**{f'{campo_fecha}__lte': hoy - timedelta(days=desde)})
+        if hasta is not None:
+            q &= Q(**{f'{campo_fecha}__gte': hoy - timedelta(days=hasta)})
+        filtros[nombre] = q
+    return filtros
+
+
+def _vacio():
+    return {'cantidad': 0, **{nombre: Decimal('0') for nombre, _, _ in RANGOS}, 'total': Decimal('0')}
+
+
+def _sumar(destino, cantidad, importes):
+    destino['cantidad'] += cantidad
+    for nombre, importe in importes.items():
+        destino[nombre] += importe
+        destino['total'] += importe
+
+
+def _a_float(fila):
+    return {k: float(v) if isinstance(v, Decimal) else v for k, v in fila.items()}
+
+
+def reporte_a_float(reporte):
+    """Reporte con importes float para la respuesta JSON (la exportación usa los Decimal)"""
+    return {
+        **reporte,
+        'totales': {divisa: _a_float(t) for divisa, t in reporte['totales'].items()},
+        'por_origen': {
+            origen: {divisa: _a_float(t) for divisa, t in totales.items()}
+            for origen, totales in reporte['por_origen'].items()
+        },
+        'filas': [_a_float(f) for f in reporte['filas']],
+    }
+
+
+def consulta_origen(queryset, origen, agrupar, hoy):
+    """Consulta agrupada de un origen: una fila por (grupo, divisa) con un total por rango"""
+    _, campo_fecha, _, relaciones = ORIGENES[origen]
+    grupo_id, grupo_nombre = _relacion(*relaciones[agrupar])
+    rangos = _filtros_rangos(campo_fecha, hoy)
+    return (
+        queryset.order_by()
+        .filter(estatus__in=ESTATUS_POR_PAGAR)
+        .values('divisa', grupo_id=grupo_id, grupo_nombre=grupo_nombre)
+        .annotate(
+            cantidad=Count('id'),
+            **{f'rango_{i}': Sum('importe', filter=q) for i, q in enumerate(rangos.values())}
+        )
+    )
+
+
+def antiguedad_saldos(querysets, agrupar, hoy=None):
+    """
+    `querysets`: {origen: queryset del modelo del origen} (ya filtrado por
+    puerto). Devuelve filas por (grupo, divisa) sumando los orígenes, totales
+    por divisa y totales por origen y divisa, con importes Decimal.
+    """
+    hoy = hoy or date.today()
+    filas = {}
+    totales = defaultdict(_vacio)
+    por_origen = {}
+
+    for origen, queryset in querysets.items():
+        totales_origen = defaultdict(_vacio)
+        for fila in consulta_origen(queryset, origen, agrupar, hoy):
+            importes = {
+                nombre: fila[f'rango_{i}'] or Decimal('0')
+                for i, (nombre, _, _) in enumerate(RANGOS)
+            }
+            clave = (fila['grupo_id'], fila['divisa'])
+            if clave not in filas:
+                filas[clave] = {
+                    'id': fila['grupo_id'],
+                    'nombre': fila['grupo_nombre'] or f'Sin {agrupar}',
+                    'divisa': fila['divisa'],
+                    **_vacio(),
+                }
+            _sumar(filas[clave], fila['cantidad'], importes)
+            _sumar(totales[fila['divisa']], fila['cantidad'], importes)
+            _sumar(totales_origen[fila['divisa']], fila['cantidad'], importes)
+        por_origen[origen] = dict(sorted(totales_origen.items()))
+
+    return {
+        'fecha_corte': hoy,
+        'agrupar': agrupar,
+        'rangos': [nombre for nombre, _, _ in RANGOS],
+        'totales': dict(sorted(totales.items())),
+        'por_origen': por_origen,
+        'filas': sorted(filas.values(), key=lambda f: (f['divisa'], -f['total'])),
+    }
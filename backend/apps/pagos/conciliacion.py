@@ -0,0 +1,317 @@
+"""
+Importación de estados de cuenta y conciliación automática de pagos.
+
+Importación: el archivo se lee en streaming (CSV con csv.DictReader, OFX
+línea por línea) y los cargos se insertan en MovimientoBancario por lotes,
+sin cargar el archivo completo en memoria. Un archivo ya importado en la
+misma cuenta (mismo SHA-256) se rechaza, y los cargos OFX cuyo FITID ya
+existe en la cuenta (estados de cuenta que se traslapan) se omiten.
+
+Conciliación: una consulta por tabla de pagos (Pago, PagoLogistica,
+PagoRevalidacion) en el rango de fechas de los movimientos arma un
+diccionario {(referencia, monto): [pagos]}; cada movimiento se resuelve con
+una búsqueda en ese diccionario (join hash en memoria) y el resultado se
+escribe con bulk_update. Reglas:
+- Candidatos: misma referencia normalizada y monto, fecha de pago a
+  ±TOLERANCIA_DIAS del movimiento, y sin conciliar con otro movimiento.
+- Si hay varios se prefiere el de la misma fecha.
+- Un candidato único que ningún otro movimiento reclama concilia; varios
+  candidatos (o varios movimientos por el mismo pago) quedan ambiguos; sin
+  candidatos, sin coincidencia. Los no conciliados se reintentan después.
+"""
+import csv
+import hashlib
+import re
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.catalogos.tipo_cambio import parsear_fecha
+from .models import EstadoCuenta, MovimientoBancario, Pago, PagoLogistica, PagoRevalidacion
+
+
+TAMANO_LOTE = 1000
+TAMANO_BLOQUE = 64 * 1024
+TOLERANCIA_DIAS = 3
+
+# modelo de pago -> campo con la referencia bancaria
+REFERENCIAS_PAGO = {
+    Pago: 'referencia',
+    PagoLogistica: 'referencia_bancaria',
+    PagoRevalidacion: 'referencia_bancaria',
+}
+
+# campo -> encabezados aceptados en el CSV (sin acentos, minúsculas)
+COLUMNAS_CSV = {
+    'fecha': ('fecha', 'fecha operacion', 'fecha movimiento'),
+    'referencia': ('referencia', 'ref', 'referencia bancaria'),
+    'cargo': ('cargo', 'retiro'),
+    'monto': ('monto', 'importe'),
+    'descripcion': ('descripcion', 'concepto'),
+}
+
+ESTATUS_POR_CONCILIAR = (
+    MovimientoBancario.Estatus.PENDIENTE,
+    MovimientoBancario.Estatus.SIN_COINCIDENCIA,
+    MovimientoBancario.Estatus.AMBIGUO,
+)
+
+
+class ErrorImportacion(Exception):
+    """Archivo de estado de cuenta con formato inválido"""
+
+
+def normalizar_referencia(valor):
+    """Sin espacios y en mayúsculas, igual en movimientos y pagos"""
+    return ''.join((valor or '').split()).upper()
+
+
+def _monto(valor, linea):
+    texto = (valor or '').strip().replace('$', '').replace(',', '')
+    if not texto:
+        return None
+    try:
+        return Decimal(texto)
+    except InvalidOperation:
+        raise ErrorImportacion(f'Línea {linea}: monto inválido {valor!r}')
+
+
+def _encabezado(texto):
+    texto = (texto or '').strip().lower()
+    return texto.translate(str.maketrans('áéíóú', 'aeiou'))
+
+
+# ============ LECTORES ============
+
+def leer_csv(archivo):
+    """
+    Cargos de un CSV con encabezados (fecha, referencia, cargo o monto,
+    descripcion). Con columna de cargo las filas sin cargo (abonos) se omiten;
+    con monto se toma el valor absoluto.
+    """
+    lector = csv.DictReader(archivo)
+    encabezados = {_encabezado(h): h for h in lector.fieldnames or []}
+    columnas = {
+        campo: next((encabezados[a] for a in alias if a in encabezados), None)
+        for campo, alias in COLUMNAS_CSV.items()
+    }
+    columna_monto = columnas['cargo'] or columnas['monto']
+    if not columnas['fecha'] or not columna_monto:
+        raise ErrorImportacion('El CSV debe tener columnas de fecha y cargo o monto')
+
+    for linea, fila in enumerate(lector, start=2):
+        monto = _monto(fila.get(columna_monto), linea)
+        if not monto:
+            continue
+        try:
+            fecha = parsear_fecha((fila.get(columnas['fecha']) or '').strip())
+        except ValueError as e:
+            raise ErrorImportacion(f'Línea {linea}: {e}')
+        yield {
+            'fecha': fecha,
+            'referencia': normalizar_referencia(fila.get(columnas['referencia']) if columnas['referencia'] else ''),
+            'monto': abs(monto),
+            'descripcion': (fila.get(columnas['descripcion']) or '').strip()[:255] if columnas['descripcion'] else '',
+            'id_banco': '',
+        }
+
+
+_ETIQUETA_OFX = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+
+
+def _movimiento_ofx(datos, linea):
+    monto = _monto(datos.get('TRNAMT'), linea)
+    if monto is None or monto >= 0:
+        return None  # Abono
+    try:
+        fecha = datetime.strptime(datos.get('DTPOSTED', '')[:8], '%Y%m%d').date()
+    except ValueError:
+        raise ErrorImportacion(f'Línea {linea}: DTPOSTED inválido')
+    descripcion = ' '.join(filter(None, [datos.get('NAME'), datos.get('MEMO')]))
+    return {
+        'fecha': fecha,
+        'referencia': normalizar_referencia(datos.get('REFNUM') or datos.get('CHECKNUM')),
+        'monto': -monto,
+        'descripcion': descripcion[:255],
+        'id_banco': datos.get('FITID', '')[:100],
+    }
+
+
+def leer_ofx(archivo):
+    """Cargos (TRNAMT negativo) de un OFX 1.x (SGML) o 2.x (XML)"""
+    actual = None
+    for linea, texto in enumerate(archivo, start=1):
+        for cierre, etiqueta, valor in _ETIQUETA_OFX.findall(texto):
+            etiqueta = etiqueta.upper()
+            if etiqueta == 'STMTTRN':
+                if cierre and actual is not None:
+                    movimiento = _movimiento_ofx(actual, linea)
+                    if movimiento:
+                        yield movimiento
+                actual = None if cierre else {}
+            elif actual is not None and not cierre:
+                actual[etiqueta] = valor.strip()
+
+
+LECTORES = {
+    EstadoCuenta.Formato.CSV: leer_csv,
+    EstadoCuenta.Formato.OFX: leer_ofx,
+}
+
+
+def sha256_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        while bloque := archivo.read(TAMANO_BLOQUE):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def _sin_repetidos(lote, cuenta, vistos):
+    """Quita del lote los cargos cuyo id_banco ya se importó en la cuenta"""
+    ids = {datos['id_banco'] for datos in lote if datos['id_banco']} - vistos
+    if ids:
+        vistos |= set(
+            MovimientoBancario.objects.filter(estado_cuenta__cuenta=cuenta, id_banco__in=ids)
+            .values_list('id_banco', flat=True)
+        )
+    nuevos = []
+    for datos in lote:
+        if datos['id_banco']:
+            if datos['id_banco'] in vistos:
+                continue
+            vistos.add(datos['id_banco'])
+        nuevos.append(datos)
+    return nuevos
+
+
+def importar_estado_cuenta(ruta, formato=None, cuenta='', usuario=None, encoding='utf-8-sig'):
+    """
+    Importa los cargos del archivo en `ruta` (formato por extensión si no se
+    indica). Todo o nada: un error de formato no deja movimientos a medias.
+    Devuelve (estado_cuenta, movimientos importados, movimientos omitidos por
+    tener un id_banco ya importado en la cuenta).
+    """
+    formato = (formato or Path(ruta).suffix.lstrip('.')).lower()
+    if formato not in LECTORES:
+        raise ErrorImportacion(f'Formato no soportado: {formato} (csv u ofx)')
+
+    sha256 = sha256_archivo(ruta)
+    anterior = EstadoCuenta.objects.filter(cuenta=cuenta, sha256=sha256).first()
+    if anterior is not None:
+        raise ErrorImportacion(f'El archivo ya se importó como estado de cuenta #{anterior.id}')
+
+    total = omitidos = 0
+    vistos = set()
+    try:
+        with open(ruta, encoding=encoding, newline='') as archivo, transaction.atomic():
+            estado = EstadoCuenta.objects.create(
+                archivo=Path(ruta).name[:255], formato=formato, cuenta=cuenta, sha256=sha256, usuario=usuario
+            )
+            filas = LECTORES[formato](archivo)
+            while lote := list(islice(filas, TAMANO_LOTE)):
+                nuevos = _sin_repetidos(lote, cuenta, vistos)
+                MovimientoBancario.objects.bulk_create(
+                    [MovimientoBancario(estado_cuenta=estado, **datos) for datos in nuevos]
+                )
+                total += len(nuevos)
+                omitidos += len(lote) - len(nuevos)
+    except IntegrityError:
+        # Otra importación del mismo archivo terminó primero
+        raise ErrorImportacion('El archivo ya se importó en esta cuenta')
+    return estado, total, omitidos
+
+
+# ============ CONCILIACIÓN ============
+
+def _indice_pagos(desde, hasta, conciliados):
+    """{(referencia, monto): [(fecha_pago, content_type_id, pago_id), ...]}"""
+    indice = defaultdict(list)
+    for modelo, campo in REFERENCIAS_PAGO.items():
+        content_type_id = ContentType.objects.get_for_model(modelo).id
+        pagos = (
+            modelo.objects.filter(fecha_pago__range=(desde, hasta))
+            .exclude(**{campo: ''})
+            .order_by()
+            .values_list('id', campo, 'monto', 'fecha_pago')
+            .iterator(chunk_size=5000)
+        )
+        for pago_id, referencia, monto, fecha in pagos:
+            if (content_type_id, pago_id) not in conciliados:
+                indice[(normalizar_referencia(referencia), monto)].append((fecha, content_type_id, pago_id))
+    return indice
+
+
+def conciliar(movimientos=None, tolerancia=TOLERANCIA_DIAS):
+    """
+    Concilia los movimientos no conciliados de `movimientos` (queryset;
+    default: todos). Devuelve {'conciliados', 'ambiguos', 'sin_coincidencia'}.
+    """
+    Estatus = MovimientoBancario.Estatus
+    queryset = movimientos if movimientos is not None else MovimientoBancario.objects.all()
+    pendientes = list(
+        queryset.filter(estatus__in=ESTATUS_POR_CONCILIAR)
+        .select_related(None)
+        .only('id', 'fecha', 'referencia', 'monto', 'estatus')
+        .order_by()
+    )
+    resumen = {'conciliados': 0, 'ambiguos': 0, 'sin_coincidencia': 0}
+    if not pendientes:
+        return resumen
+
+    margen = timedelta(days=tolerancia)
+    desde = min(m.fecha for m in pendientes) - margen
+    hasta = max(m.fecha for m in pendientes) + margen
+    conciliados = set(
+        MovimientoBancario.objects.filter(
+            estatus=Estatus.CONCILIADO, fecha__range=(desde - margen, hasta + margen)
+        ).values_list('content_type_id', 'object_id')
+    )
+    indice = _indice_pagos(desde, hasta, conciliados)
+
+    candidatos_por_movimiento = {}
+    for movimiento in pendientes:
+        candidatos = [
+            (fecha, content_type_id, pago_id)
+            for fecha, content_type_id, pago_id in indice.get((movimiento.referencia, movimiento.monto), ())
+            if abs((fecha - movimiento.fecha).days) <= tolerancia
+        ] if movimiento.referencia else []
+        if len(candidatos) > 1:
+            mismo_dia = [c for c in candidatos if c[0] == movimiento.fecha]
+            if len(mismo_dia) == 1:
+                candidatos = mismo_dia
+        candidatos_por_movimiento[movimiento.id] = [c[1:] for c in candidatos]
+
+    # Un pago reclamado por varios movimientos no se concilia con ninguno
+    reclamos = Counter(
+        candidatos[0] for candidatos in candidatos_por_movimiento.values() if len(candidatos) == 1
+    )
+    ahora = timezone.now()
+    for movimiento in pendientes:
+        candidatos = candidatos_por_movimiento[movimiento.id]
+        movimiento.candidatos = len(candidatos)
+        movimiento.content_type_id = movimiento.object_id = movimiento.fecha_conciliacion = None
+        if len(candidatos) == 1 and reclamos[candidatos[0]] == 1:
+            movimiento.estatus = Estatus.CONCILIADO
+            movimiento.content_type_id, movimiento.object_id = candidatos[0]
+            movimiento.fecha_conciliacion = ahora
+            resumen['conciliados'] += 1
+        elif candidatos:
+            movimiento.estatus = Estatus.AMBIGUO
+            resumen['ambiguos'] += 1
+        else:
+            movimiento.estatus = Estatus.SIN_COINCIDENCIA
+            resumen['sin_coincidencia'] += 1
+
+    MovimientoBancario.objects.bulk_update(
+        pendientes,
+        ['estatus', 'candidatos', 'content_type', 'object_id', 'fecha_conciliacion'],
+        batch_size=TAMANO_LOTE
+    )
+    return resumen
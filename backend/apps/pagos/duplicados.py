@@ -0,0 +1,43 @@
+"""
+Detección de pagos registrados dos veces.
+
+Un pago es posible duplicado de otro con la misma huella (referencia
+bancaria normalizada + monto; ver PagoDeOperacion.calcular_huella) en
+cualquiera de las tres tablas de pagos: una búsqueda por índice en cada una.
+Los pagos sin referencia no tienen huella y no se comparan.
+
+Al registrar, los serializers rechazan el pago si hay posibles duplicados,
+salvo que el usuario lo confirme con confirmar_duplicado=true.
+"""
+from apps.operaciones.duplicados import LIMITE, validar_duplicados
+from .models import Pago, PagoLogistica, PagoRevalidacion
+
+
+MODELOS_PAGO = (Pago, PagoLogistica, PagoRevalidacion)
+MENSAJE_DUPLICADO = (
+    'Ya existe un pago con la misma referencia bancaria y monto. '
+    'Envía confirmar_duplicado=true para registrarlo de todos modos.'
+)
+
+
+def pagos_duplicados(pago, limite=LIMITE):
+    """Pagos con la misma huella, como 'modelo:id' (p. ej. 'pagologistica:12')"""
+    huella = pago.calcular_huella()
+    if not huella:
+        return []
+    duplicados = []
+    for modelo in MODELOS_PAGO:
+        queryset = modelo.objects.filter(huella=huella)
+        if isinstance(pago, modelo) and pago.pk:
+            queryset = queryset.exclude(pk=pago.pk)
+        ids = queryset.order_by('-id').values_list('id', flat=True)[:limite]
+        duplicados += [f'{modelo._meta.model_name}:{pago_id}' for pago_id in ids]
+    return duplicados[:limite]
+
+
+def validar_duplicados_pago(modelo, attrs):
+    """Para el validate() de los serializers de alta: quita confirmar_duplicado de attrs"""
+    confirmado = attrs.pop('confirmar_duplicado', False)
+    campo = modelo.campo_referencia
+    pago = modelo(monto=attrs.get('monto'), **{campo: attrs.get(campo, '')})
+    validar_duplicados(pagos_duplicados(pago), confirmado, MENSAJE_DUPLICADO)
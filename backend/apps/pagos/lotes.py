@@ -0,0 +1,258 @@
+"""
+Lotes de pago masivo a proveedores y navieras.
+
+Las operaciones seleccionadas se agrupan por cuenta beneficiaria y divisa
+(logística se paga al proveedor, revalidación a la cuenta de naviera): una
+línea del archivo por grupo con el importe total. El archivo sigue un layout
+de settings.LAYOUTS_PAGO_MASIVO (CSV o ancho fijo) y se genera en streaming.
+
+`preparar_lote` bloquea las operaciones, valida que estén pendientes y con
+cuenta bancaria, las marca "en proceso" con un UPDATE por tabla y guarda el
+lote (LotePago) con sus líneas, todo en una transacción. El archivo se puede
+regenerar después a partir del lote guardado; `cancelar_lote` regresa a
+pendiente las operaciones que sigan en proceso. El pago de cada operación se
+registra después, como siempre, cuando el banco lo confirma.
+"""
+import csv
+import unicodedata
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.auditoria.utils import registrar_acciones
+from apps.core.cache import invalidar
+from apps.eventos.signals import publicar_lote
+from apps.operaciones.models import OperacionLogistica, OperacionRevalidacion
+from .models import LotePago
+
+
+# origen -> (modelo, relación con la cuenta beneficiaria, campo de referencia, alcance de caché)
+ORIGENES_LOTE = {
+    'logistica': (OperacionLogistica, 'proveedor', 'comentarios', 'logistica'),
+    'revalidacion': (OperacionRevalidacion, 'naviera_cuenta', 'referencia', 'revalidaciones'),
+}
+
+
+class ErrorLote(Exception):
+    """Operaciones que no se pueden incluir en el lote; `detalle` = {'logistica:12': motivo}"""
+
+    def __init__(self, mensaje, detalle):
+        super().__init__(mensaje)
+        self.detalle = detalle
+
+
+def _cuenta(origen, operacion):
+    """Datos bancarios del beneficiario de la operación, o None si no tiene cuenta"""
+    if origen == 'logistica':
+        proveedor = operacion.proveedor
+        if proveedor is None:
+            return None
+        return {
+            'beneficiario': proveedor.nombre, 'banco': proveedor.banco,
+            'cuenta': proveedor.cuenta, 'clabe': proveedor.clabe, 'aba_swift': '',
+        }
+    cuenta = operacion.naviera_cuenta
+    if cuenta is None:
+        return None
+    return {
+        'beneficiario': cuenta.beneficiario, 'banco': cuenta.banco,
+        'cuenta': cuenta.cuenta, 'clabe': cuenta.clabe, 'aba_swift': cuenta.aba_swift,
+    }
+
+
+def _validar(origen, operacion):
+    """Motivo por el que la operación no puede ir en el lote, o None"""
+    if operacion.estatus != 'pendiente':
+        return f'La operación está {operacion.get_estatus_display().lower()}'
+    datos = _cuenta(origen, operacion)
+    if datos is None:
+        return 'La operación no tiene proveedor' if origen == 'logistica' else 'La operación no tiene cuenta de naviera'
+    if not (datos['clabe'] or datos['cuenta']):
+        return f"{datos['beneficiario']} no tiene CLABE ni número de cuenta"
+    if origen == 'revalidacion' and operacion.naviera_cuenta.moneda != operacion.divisa:
+        return f'La cuenta de naviera es en {operacion.naviera_cuenta.moneda} y la operación en {operacion.divisa}'
+    return None
+
+
+def preparar_lote(usuario, ids, layout, ip_address=None):
+    """
+    `ids`: {'logistica': [id, ...], 'revalidacion': [id, ...]}.
+    Marca las operaciones en proceso y devuelve el LotePago guardado, con una
+    línea por (cuenta beneficiaria, divisa). Todo o nada: lanza ErrorLote si
+    alguna operación no existe, no es visible para el usuario, no está
+    pendiente o no tiene cuenta.
+    """
+    ahora = timezone.localtime()
+    grupos = {}
+    errores = {}
+
+    with transaction.atomic():
+        lote = LotePago.objects.create(usuario=usuario, layout=layout)
+        lote.referencia = referencia_lote = LotePago.referencia_para(lote.id)
+        seleccion = {}
+        for origen, (modelo, relacion, _, _) in ORIGENES_LOTE.items():
+            pedidas = set(ids.get(origen) or ())
+            if not pedidas:
+                continue
+            queryset = usuario.filtrar_por_puerto(
+                modelo.objects.filter(id__in=pedidas), campo_puerto='contenedor__puerto'
+            ).select_related(relacion).select_for_update(of=('self',)).order_by('id')
+            operaciones = list(queryset)
+            for operacion_id in pedidas - {o.id for o in operaciones}:
+                errores[f'{origen}:{operacion_id}'] = 'La operación no existe o no tienes acceso a ella'
+            for operacion in operaciones:
+                motivo = _validar(origen, operacion)
+                if motivo:
+                    errores[f'{origen}:{operacion.id}'] = motivo
+            seleccion[origen] = operaciones
+
+        if errores:
+            raise ErrorLote('Hay operaciones que no se pueden incluir en el lote', errores)
+        if not seleccion:
+            raise ErrorLote('Debe seleccionar al menos una operación', {})
+
+        for origen, operaciones in seleccion.items():
+            modelo, relacion, campo_referencia, alcance = ORIGENES_LOTE[origen]
+            for operacion in operaciones:
+                clave = (origen, getattr(operacion, f'{relacion}_id'), operacion.divisa)
+                if clave not in grupos:
+                    grupos[clave] = {
+                        **_cuenta(origen, operacion), 'moneda': operacion.divisa,
+                        'importe': Decimal('0'), 'conceptos': [], 'operaciones': [],
+                    }
+                grupo = grupos[clave]
+                grupo['importe'] += operacion.importe
+                grupo['conceptos'].append(getattr(operacion, campo_referencia))
+                grupo['operaciones'].append(f'{origen[0].upper()}{operacion.id}')
+
+            # update() no dispara señales: fecha_actualizacion, caché y eventos a mano
+            actualizadas = modelo.objects.filter(id__in=[o.id for o in operaciones])
+            actualizadas.update(estatus=modelo.Estatus.EN_PROCESO, fecha_actualizacion=ahora)
+            invalidar(alcance)
+            publicar_lote(actualizadas, ['estatus'])
+            registrar_acciones(
+                usuario=usuario,
+                accion='LOTE_PAGO',
+                modelo=modelo.__name__,
+                ip_address=ip_address,
+                registros=[
+                    {
+                        'descripcion': f'Operación en lote de pago {referencia_lote}: {getattr(o, campo_referencia)}',
+                        'objeto_id': o.id,
+                        'datos_anteriores': {'estatus': o.estatus},
+                        'datos_nuevos': {'estatus': modelo.Estatus.EN_PROCESO, 'lote': referencia_lote},
+                    }
+                    for o in operaciones
+                ]
+            )
+
+        lineas = []
+        for numero, grupo in enumerate(sorted(grupos.values(), key=lambda g: (g['moneda'], g['beneficiario'])), start=1):
+            conceptos = grupo.pop('conceptos')
+            lineas.append({
+                **grupo,
+                'referencia': f'{referencia_lote}{numero:03d}',
+                'concepto': conceptos[0] if len(conceptos) == 1 else f'{len(conceptos)} OPERACIONES {referencia_lote}',
+                'operaciones': ' '.join(grupo['operaciones']),
+            })
+        lote.lineas = lineas
+        lote.operaciones = {origen: [o.id for o in operaciones] for origen, operaciones in seleccion.items()}
+        lote.save(update_fields=['referencia', 'lineas', 'operaciones'])
+    return lote
+
+
+def cancelar_lote(usuario, lote, ip_address=None):
+    """
+    Cancela el lote: las operaciones que siguen en proceso vuelven a
+    pendiente (las que ya se pagaron no cambian). Devuelve cuántas volvieron.
+    """
+    ahora = timezone.localtime()
+    total = 0
+    with transaction.atomic():
+        lote = LotePago.objects.select_for_update().get(pk=lote.pk)
+        if lote.estatus == LotePago.Estatus.CANCELADO:
+            raise ErrorLote(f'El lote {lote.referencia} ya está cancelado', {})
+
+        for origen, ids in lote.operaciones.items():
+            modelo, _, campo_referencia, alcance = ORIGENES_LOTE[origen]
+            en_proceso = list(
+                modelo.objects.filter(id__in=ids, estatus=modelo.Estatus.EN_PROCESO)
+                .select_for_update().only('id', campo_referencia).order_by('id')
+            )
+            if not en_proceso:
+                continue
+            # update() no dispara señales: fecha_actualizacion, caché y eventos a mano
+            actualizadas = modelo.objects.filter(id__in=[o.id for o in en_proceso])
+            actualizadas.update(estatus=modelo.Estatus.PENDIENTE, fecha_actualizacion=ahora)
+            invalidar(alcance)
+            publicar_lote(actualizadas, ['estatus'])
+            registrar_acciones(
+                usuario=usuario,
+                accion='CANCELAR_LOTE_PAGO',
+                modelo=modelo.__name__,
+                ip_address=ip_address,
+                registros=[
+                    {
+                        'descripcion': f'Lote de pago {lote.referencia} cancelado: {getattr(o, campo_referencia)}',
+                        'objeto_id': o.id,
+                        'datos_anteriores': {'estatus': modelo.Estatus.EN_PROCESO, 'lote': lote.referencia},
+                        'datos_nuevos': {'estatus': modelo.Estatus.PENDIENTE},
+                    }
+                    for o in en_proceso
+                ]
+            )
+            total += len(en_proceso)
+
+        lote.estatus = LotePago.Estatus.CANCELADO
+        lote.fecha_cancelacion = ahora
+        lote.save(update_fields=['estatus', 'fecha_cancelacion'])
+    return total
+
+
+def lineas_lote(lote):
+    """Líneas guardadas del lote, con el importe de nuevo como Decimal"""
+    return [{**linea, 'importe': Decimal(linea['importe'])} for linea in lote.lineas]
+
+
+# ============ ARCHIVO ============
+
+class _Eco:
+    """Pseudo-buffer para csv.writer: devuelve la línea escrita"""
+
+    def write(self, value):
+        return value
+
+
+def _ascii(valor):
+    texto = unicodedata.normalize('NFKD', str(valor or '')).encode('ascii', 'ignore').decode()
+    return texto.upper()
+
+
+def _valores(linea):
+    importe = linea['importe']
+    return {
+        **linea,
+        'importe': f'{importe:.2f}',
+        'importe_centavos': str(int((importe * 100).to_integral_value())),
+    }
+
+
+def generar_archivo(lineas, layout):
+    """Genera el archivo línea por línea según el layout (ver settings.LAYOUTS_PAGO_MASIVO)"""
+    if layout['tipo'] == 'csv':
+        writer = csv.writer(_Eco(), delimiter=layout.get('separador', ','), lineterminator='\r\n')
+        if layout.get('encabezado'):
+            yield writer.writerow(layout['campos'])
+        for linea in lineas:
+            valores = _valores(linea)
+            yield writer.writerow([valores[campo] for campo in layout['campos']])
+        return
+
+    for linea in lineas:
+        valores = _valores(linea)
+        partes = []
+        for campo, ancho, alineacion, relleno in layout['campos']:
+            texto = _ascii(valores[campo])[:ancho]
+            partes.append(texto.rjust(ancho, relleno) if alineacion == 'der' else texto.ljust(ancho, relleno))
+        yield ''.join(partes) + '\r\n'
@@ -0,0 +1,60 @@
+import heapq
+
+from django.core.management.base import BaseCommand
+
+from apps.operaciones.duplicados import (
+    TAMANO_LOTE, VENTANA_DIAS, agrupar_duplicados, calcular_huellas, filas_huella
+)
+from apps.operaciones.models import Ticket
+from apps.pagos.duplicados import MODELOS_PAGO
+
+
+class Command(BaseCommand):
+    help = (
+        'Revisa el historial en busca de tickets (mismo contenedor o BL, concepto e importe '
+        f'a ±{VENTANA_DIAS} días) y pagos (misma referencia y monto) capturados dos veces. '
+        'Primero calcula por lotes las huellas que falten.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solo', choices=['tickets', 'pagos'], help='Revisar solo tickets o solo pagos')
+        parser.add_argument('--recalcular', action='store_true', help='Recalcular todas las huellas, no solo las vacías')
+        parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE)
+
+    def handle(self, *args, **options):
+        modelos = {
+            'tickets': [Ticket],
+            'pagos': list(MODELOS_PAGO),
+        }
+        if options['solo']:
+            modelos = {options['solo']: modelos[options['solo']]}
+
+        for modelo in sum(modelos.values(), []):
+            actualizados = calcular_huellas(
+                modelo, todas=options['recalcular'], tamano_lote=options['tamano_lote']
+            )
+            if actualizados:
+                self.stdout.write(f'{modelo._meta.verbose_name_plural}: {actualizados} huellas calculadas')
+
+        total = 0
+        if 'tickets' in modelos:
+            filas = filas_huella(Ticket.objects.all(), 'fecha_alta', 'ticket')
+            total += self._reportar('Tickets', agrupar_duplicados(filas, ventana_dias=VENTANA_DIAS))
+        if 'pagos' in modelos:
+            # Las tres tablas ordenadas por huella y fecha, mezcladas en un solo recorrido
+            filas = heapq.merge(
+                *(filas_huella(m.objects.all(), 'fecha_pago', m._meta.model_name) for m in MODELOS_PAGO),
+                key=lambda fila: (fila[0], fila[2])
+            )
+            total += self._reportar('Pagos', agrupar_duplicados(filas))
+
+        estilo = self.style.WARNING if total else self.style.SUCCESS
+        self.stdout.write(estilo(f'{total} grupos de posibles duplicados'))
+
+    def _reportar(self, titulo, grupos):
+        cantidad = 0
+        for _, grupo in grupos:
+            cantidad += 1
+            registros = ', '.join(f'{etiqueta} ({fecha})' for etiqueta, fecha in grupo)
+            self.stdout.write(f'{titulo}: {registros}')
+        return cantidad
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.pagos.conciliacion import ErrorImportacion, conciliar, importar_estado_cuenta
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa los cargos de un estado de cuenta bancario (CSV u OFX) y los '
+        'concilia contra los pagos registrados por referencia, monto y fecha.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo .csv u .ofx')
+        parser.add_argument('--formato', choices=['csv', 'ofx'], help='Default: según la extensión')
+        parser.add_argument('--cuenta', default='', help='Cuenta bancaria del estado de cuenta')
+        parser.add_argument('--encoding', default='utf-8-sig', help='Codificación del archivo (p. ej. latin-1)')
+        parser.add_argument('--sin-conciliar', action='store_true', help='Solo importar los movimientos')
+
+    def handle(self, *args, **options):
+        try:
+            estado, total, omitidos = importar_estado_cuenta(
+                options['archivo'], formato=options['formato'],
+                cuenta=options['cuenta'], encoding=options['encoding']
+            )
+        except (ErrorImportacion, OSError, UnicodeDecodeError) as e:
+            raise CommandError(f'No se pudo importar {options["archivo"]}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Estado de cuenta #{estado.id}: {total} cargos importados'))
+        if omitidos:
+            self.stdout.write(self.style.WARNING(f'{omitidos} cargos omitidos (ya importados en la cuenta)'))
+        if options['sin_conciliar']:
+            return
+
+        resumen = conciliar(estado.movimientos.all())
+        self.stdout.write(self.style.SUCCESS(f"✓ {resumen['conciliados']} conciliados"))
+        if resumen['ambiguos'] or resumen['sin_coincidencia']:
+            self.stdout.write(self.style.WARNING(
+                f"{resumen['ambiguos']} ambiguos, {resumen['sin_coincidencia']} sin coincidencia "
+                '(revisar en /api/pagos/movimientos-bancarios/)'
+            ))
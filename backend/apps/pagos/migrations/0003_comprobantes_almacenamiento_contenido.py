@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:10
+
+import apps.archivos.almacenamiento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pagos', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pago',
+            name='comprobante',
+            field=models.FileField(blank=True, null=True, storage=apps.archivos.almacenamiento.almacenamiento_contenido, upload_to='comprobantes/%Y/%m/', verbose_name='Comprobante'),
+        ),
+        migrations.AlterField(
+            model_name='pagologistica',
+            name='comprobante',
+            field=models.FileField(blank=True, null=True, storage=apps.archivos.almacenamiento.almacenamiento_contenido, upload_to='comprobantes/logistica/%Y/%m/', verbose_name='Comprobante'),
+        ),
+        migrations.AlterField(
+            model_name='pagorevalidacion',
+            name='comprobante',
+            field=models.FileField(blank=True, null=True, storage=apps.archivos.almacenamiento.almacenamiento_contenido, upload_to='comprobantes/revalidacion/%Y/%m/', verbose_name='Comprobante'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('pagos', '0003_comprobantes_almacenamiento_contenido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoCuenta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.CharField(max_length=255, verbose_name='Archivo')),
+                ('formato', models.CharField(choices=[('csv', 'CSV'), ('ofx', 'OFX')], max_length=3, verbose_name='Formato')),
+                ('cuenta', models.CharField(blank=True, max_length=50, verbose_name='Cuenta bancaria')),
+                ('fecha_importacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de importación')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='estados_cuenta', to=settings.AUTH_USER_MODEL, verbose_name='Importado por')),
+            ],
+            options={
+                'verbose_name': 'Estado de cuenta',
+                'verbose_name_plural': 'Estados de cuenta',
+                'db_table': 'pagos_estados_cuenta',
+                'ordering': ['-fecha_importacion'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MovimientoBancario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('referencia', models.CharField(blank=True, max_length=100, verbose_name='Referencia')),
+                ('monto', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Monto')),
+                ('descripcion', models.CharField(blank=True, max_length=255, verbose_name='Descripción')),
+                ('id_banco', models.CharField(blank=True, max_length=100, verbose_name='ID del banco (FITID)')),
+                ('estatus', models.CharField(choices=[('pendiente', 'Pendiente'), ('conciliado', 'Conciliado'), ('sin_coincidencia', 'Sin coincidencia'), ('ambiguo', 'Ambiguo')], default='pendiente', max_length=20, verbose_name='Estatus')),
+                ('candidatos', models.PositiveSmallIntegerField(default=0, verbose_name='Pagos candidatos')),
+                ('object_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='ID de pago')),
+                ('fecha_conciliacion', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de conciliación')),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='contenttypes.contenttype', verbose_name='Tipo de pago')),
+                ('estado_cuenta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='pagos.estadocuenta', verbose_name='Estado de cuenta')),
+            ],
+            options={
+                'verbose_name': 'Movimiento bancario',
+                'verbose_name_plural': 'Movimientos bancarios',
+                'db_table': 'pagos_movimientos_bancarios',
+                'ordering': ['fecha', 'id'],
+                'indexes': [models.Index(fields=['referencia', 'monto', 'fecha'], name='pagos_movim_referen_e3c44a_idx'), models.Index(fields=['estatus'], name='pagos_movim_estatus_e9a468_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='movimientobancario',
+            constraint=models.UniqueConstraint(condition=models.Q(('estatus', 'conciliado')), fields=('content_type', 'object_id'), name='uniq_movimiento_pago_conciliado'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pagos', '0004_conciliacion_bancaria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pago',
+            name='huella',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=40, verbose_name='Huella de duplicado'),
+        ),
+        migrations.AddField(
+            model_name='pagologistica',
+            name='huella',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=40, verbose_name='Huella de duplicado'),
+        ),
+        migrations.AddField(
+            model_name='pagorevalidacion',
+            name='huella',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=40, verbose_name='Huella de duplicado'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pagos', '0005_huella_pagos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estadocuenta',
+            name='sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='SHA-256 del archivo'),
+        ),
+        migrations.AddConstraint(
+            model_name='estadocuenta',
+            constraint=models.UniqueConstraint(condition=models.Q(('sha256', ''), _negated=True), fields=('cuenta', 'sha256'), name='uniq_estado_cuenta_archivo'),
+        ),
+    ]
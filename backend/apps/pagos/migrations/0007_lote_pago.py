@@ -0,0 +1,37 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:16
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('pagos', '0006_estado_cuenta_sha256'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LotePago',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('referencia', models.CharField(editable=False, max_length=12, null=True, unique=True, verbose_name='Referencia')),
+                ('layout', models.CharField(max_length=30, verbose_name='Layout')),
+                ('lineas', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Líneas del archivo')),
+                ('operaciones', models.JSONField(default=dict, help_text='{"logistica": [ids], "revalidacion": [ids]}', verbose_name='Operaciones')),
+                ('estatus', models.CharField(choices=[('generado', 'Generado'), ('cancelado', 'Cancelado')], default='generado', max_length=20, verbose_name='Estatus')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('fecha_cancelacion', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de cancelación')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lotes_pago', to=settings.AUTH_USER_MODEL, verbose_name='Generado por')),
+            ],
+            options={
+                'verbose_name': 'Lote de pago',
+                'verbose_name_plural': 'Lotes de pago',
+                'db_table': 'pagos_lotes',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+    ]
@@ -1,12 +1,93 @@
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from datetime import date
 
+from apps.archivos.almacenamiento import almacenamiento_contenido
+from apps.core import huellas
+
+
+# select_related al cargar la operación de un pago (por modelo de operación)
+RELACIONADOS_OPERACION = {
+    'operacionlogistica': ('contenedor__cliente', 'concepto'),
+    'operacionrevalidacion': ('contenedor__cliente', 'concepto'),
+    'ticket': ('empresa', 'concepto'),
+}
+
+
+def prefetch_operaciones(pagos):
+    """
+    Carga la operación (GenericForeignKey) de una lista de pagos con una
+    consulta por tipo de operación, y la deja en la caché de cada pago.
+    """
+    ids_por_tipo = defaultdict(set)
+    for pago in pagos:
+        ids_por_tipo[pago.content_type_id].add(pago.object_id)
+
+    operaciones = {}
+    for content_type_id, ids in ids_por_tipo.items():
+        modelo = ContentType.objects.get_for_id(content_type_id).model_class()
+        if modelo is None:
+            continue
+        relacionados = RELACIONADOS_OPERACION.get(modelo._meta.model_name, ())
+        for operacion in modelo._default_manager.filter(pk__in=ids).select_related(*relacionados):
+            operaciones[(content_type_id, operacion.pk)] = operacion
+
+    campo = Pago._meta.get_field('operacion')
+    for pago in pagos:
+        campo.set_cached_value(pago, operaciones.get((pago.content_type_id, pago.object_id)))
+
+
+class PagoDeOperacion:
+    """
+    save() común de los pagos: en el alta, dentro de una transacción bloquea
+    la fila de la operación (FOR UPDATE), rechaza el pago si ya está pagada o
+    cerrada, guarda el pago y actualiza la operación con `datos_operacion()`.
+    Editar un pago existente no modifica la operación.
+    Ver pagos/registro.py.
+
+    También calcula la huella de duplicado (referencia + monto, ver
+    pagos/duplicados.py); `campo_referencia` es el campo de la referencia.
+    """
+    campo_referencia = 'referencia_bancaria'
+    campos_huella = ('referencia_bancaria', 'monto')
+
+    def calcular_huella(self):
+        return huellas.huella(getattr(self, self.campo_referencia), self.monto)
+
+    def datos_operacion(self, operacion):
+        """Asigna en la operación los datos del pago; devuelve los campos a guardar"""
+        raise NotImplementedError
+
+    def save(self, *args, **kwargs):
+        from .registro import ESTATUS_NO_PAGABLES, OperacionYaPagada, bloquear_operacion
 
-class Pago(models.Model):
+        # Solo el alta paga la operación; editar un pago (observaciones,
+        # comprobante...) no toca la operación ni su estatus
+        alta = self._state.adding
+        with transaction.atomic():
+            operacion = self.operacion if alta else None
+            if operacion is not None:
+                operacion = bloquear_operacion(operacion)
+                if operacion.estatus in ESTATUS_NO_PAGABLES:
+                    raise OperacionYaPagada()
+                self.operacion = operacion
+
+            if kwargs.get('update_fields') is None:
+                self.huella = self.calcular_huella()
+            super().save(*args, **kwargs)
+
+            if operacion is not None:
+                operacion.estatus = 'pagado'
+                operacion.save(update_fields=['estatus', *self.datos_operacion(operacion)])
+
+
+class Pago(PagoDeOperacion, models.Model):
     """
     Registro de pagos según documento de requerimientos actualizado.
 
@@ -70,9 +151,11 @@ class Pago(models.Model):
     # Datos de referencia
     concepto_pago = models.CharField('Concepto del pago', max_length=200, blank=True)
     referencia = models.CharField('Referencia bancaria', max_length=100, blank=True)
+    huella = models.CharField('Huella de duplicado', max_length=40, blank=True, editable=False, db_index=True)
     comprobante = models.FileField(
         'Comprobante',
         upload_to='comprobantes/%Y/%m/',
+        storage=almacenamiento_contenido,
         blank=True,
         null=True
     )
@@ -80,6 +163,9 @@ class Pago(models.Model):
     observaciones = models.TextField('Observaciones', blank=True)
     fecha_registro = models.DateTimeField('Fecha de registro', auto_now_add=True)
 
+    campo_referencia = 'referencia'
+    campos_huella = ('referencia', 'monto')
+
     class Meta:
         db_table = 'pagos'
         verbose_name = 'Pago'
@@ -94,29 +180,28 @@ class Pago(models.Model):
         return f"Pago ${self.monto:,.2f} - {self.concepto_pago}"
 
     def save(self, *args, **kwargs):
-        # Determinar tipo de operación automáticamente
-        if self.content_type:
-            model_name = self.content_type.model
+        # Determinar tipo de operación automáticamente (ContentType cacheado)
+        if self.content_type_id:
+            model_name = ContentType.objects.get_for_id(self.content_type_id).model
             if model_name == 'operacionlogistica':
                 self.tipo_operacion = self.TipoOperacion.LOGISTICA
             elif model_name == 'operacionrevalidacion':
                 self.tipo_operacion = self.TipoOperacion.REVALIDACION
             else:
                 self.tipo_operacion = self.TipoOperacion.LEGACY
-
         super().save(*args, **kwargs)
 
-        # Actualizar estatus de la operación
-        if self.operacion:
-            self.operacion.estatus = 'pagado'
-            if hasattr(self.operacion, 'fecha_pago'):
-                self.operacion.fecha_pago = self.fecha_pago
-            elif hasattr(self.operacion, 'fecha_pago_tesoreria'):
-                self.operacion.fecha_pago_tesoreria = self.fecha_pago
-            self.operacion.save()
+    def datos_operacion(self, operacion):
+        if hasattr(operacion, 'fecha_pago'):
+            operacion.fecha_pago = self.fecha_pago
+            return ['fecha_pago']
+        if hasattr(operacion, 'fecha_pago_tesoreria'):
+            operacion.fecha_pago_tesoreria = self.fecha_pago
+            return ['fecha_pago_tesoreria']
+        return []
 
 
-class PagoLogistica(models.Model):
+class PagoLogistica(PagoDeOperacion, models.Model):
     """
     Pago específico para operaciones de logística.
     Vinculado directamente a OperacionLogistica.
@@ -145,9 +230,11 @@ class PagoLogistica(models.Model):
 
     # Datos bancarios
     referencia_bancaria = models.CharField('Referencia bancaria', max_length=100, blank=True)
+    huella = models.CharField('Huella de duplicado', max_length=40, blank=True, editable=False, db_index=True)
     comprobante = models.FileField(
         'Comprobante',
         upload_to='comprobantes/logistica/%Y/%m/',
+        storage=almacenamiento_contenido,
         blank=True,
         null=True
     )
@@ -164,15 +251,12 @@ class PagoLogistica(models.Model):
     def __str__(self):
         return f"Pago Logística ${self.monto:,.2f} - {self.operacion.contenedor.numero}"
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Actualizar estatus de la operación
-        self.operacion.estatus = 'pagado'
-        self.operacion.fecha_pago = self.fecha_pago
-        self.operacion.save(update_fields=['estatus', 'fecha_pago'])
+    def datos_operacion(self, operacion):
+        operacion.fecha_pago = self.fecha_pago
+        return ['fecha_pago']
 
 
-class PagoRevalidacion(models.Model):
+class PagoRevalidacion(PagoDeOperacion, models.Model):
     """
     Pago específico para operaciones de revalidación.
     Vinculado directamente a OperacionRevalidacion.
@@ -214,9 +298,11 @@ class PagoRevalidacion(models.Model):
 
     # Datos bancarios
     referencia_bancaria = models.CharField('Referencia bancaria', max_length=100, blank=True)
+    huella = models.CharField('Huella de duplicado', max_length=40, blank=True, editable=False, db_index=True)
     comprobante = models.FileField(
         'Comprobante',
         upload_to='comprobantes/revalidacion/%Y/%m/',
+        storage=almacenamiento_contenido,
         blank=True,
         null=True
     )
@@ -240,14 +326,11 @@ class PagoRevalidacion(models.Model):
         tipo = self.get_tipo_pago_display()
         return f"Pago Revalidación ({tipo}) ${self.monto:,.2f} - BL: {self.operacion.bl}"
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Actualizar estatus de la operación
-        self.operacion.estatus = 'pagado'
-        self.operacion.fecha_pago_tesoreria = self.fecha_pago
+    def datos_operacion(self, operacion):
+        operacion.fecha_pago_tesoreria = self.fecha_pago
         if self.observaciones_tesoreria:
-            self.operacion.observaciones_tesoreria = self.observaciones_tesoreria
-        self.operacion.save(update_fields=['estatus', 'fecha_pago_tesoreria', 'observaciones_tesoreria'])
+            operacion.observaciones_tesoreria = self.observaciones_tesoreria
+        return ['fecha_pago_tesoreria', 'observaciones_tesoreria']
 
 
 class CierreOperacion(models.Model):
@@ -305,14 +388,36 @@ class CierreOperacion(models.Model):
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-
-        # Actualizar estatus del contenedor a completado
         self.contenedor.estatus = 'completado'
-        self.contenedor.save(update_fields=['estatus'])
-
-        # Cerrar todas las operaciones del contenedor
-        self.contenedor.operaciones_logistica.filter(estatus='pendiente').update(estatus='cerrado')
-        self.contenedor.operaciones_revalidacion.filter(estatus='pendiente').update(estatus='pagado')
+        self.aplicar_cascada([self.contenedor_id])
+
+    @staticmethod
+    def aplicar_cascada(contenedor_ids):
+        """
+        Marca los contenedores como completados y cierra sus operaciones
+        pendientes con tres UPDATE, sin importar cuántos contenedores sean.
+        """
+        from apps.operaciones.models import Contenedor, OperacionLogistica, OperacionRevalidacion
+        from apps.core.cache import invalidar
+        from apps.eventos.signals import publicar_lote
+
+        contenedores = Contenedor.objects.filter(id__in=contenedor_ids)
+        logistica = OperacionLogistica.objects.filter(
+            contenedor_id__in=contenedor_ids, estatus__in=['pendiente', 'en_proceso']
+        )
+        revalidaciones = OperacionRevalidacion.objects.filter(
+            contenedor_id__in=contenedor_ids, estatus__in=['pendiente', 'en_proceso']
+        )
+        with transaction.atomic():
+            # update() no dispara señales. Los eventos se ubican antes del
+            # UPDATE (después ya no coincide el filtro por estatus) y salen
+            # al confirmar la transacción
+            for queryset in (contenedores, logistica, revalidaciones):
+                publicar_lote(queryset, ['estatus'])
+            contenedores.update(estatus='completado')
+            logistica.update(estatus='cerrado')
+            revalidaciones.update(estatus='pagado')
+        invalidar('contenedores', 'logistica', 'revalidaciones')
 
 
 class CierreLegacy(models.Model):
@@ -362,3 +467,162 @@ class CierreLegacy(models.Model):
         super().save(*args, **kwargs)
         self.ticket.estatus = 'cerrado'
         self.ticket.save(update_fields=['estatus'])
+
+
+class EstadoCuenta(models.Model):
+    """
+    Estado de cuenta bancario importado (CSV u OFX).
+    Sus movimientos se concilian contra los pagos registrados (ver conciliacion.py).
+    """
+
+    class Formato(models.TextChoices):
+        CSV = 'csv', 'CSV'
+        OFX = 'ofx', 'OFX'
+
+    archivo = models.CharField('Archivo', max_length=255)
+    formato = models.CharField('Formato', max_length=3, choices=Formato.choices)
+    cuenta = models.CharField('Cuenta bancaria', max_length=50, blank=True)
+    sha256 = models.CharField('SHA-256 del archivo', max_length=64, blank=True, editable=False)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='estados_cuenta',
+        verbose_name='Importado por'
+    )
+    fecha_importacion = models.DateTimeField('Fecha de importación', auto_now_add=True)
+
+    class Meta:
+        db_table = 'pagos_estados_cuenta'
+        verbose_name = 'Estado de cuenta'
+        verbose_name_plural = 'Estados de cuenta'
+        ordering = ['-fecha_importacion']
+        constraints = [
+            # El mismo archivo no se importa dos veces en una cuenta
+            models.UniqueConstraint(
+                fields=['cuenta', 'sha256'],
+                condition=~models.Q(sha256=''),
+                name='uniq_estado_cuenta_archivo'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.archivo} ({self.fecha_importacion:%d/%m/%Y})"
+
+
+class MovimientoBancario(models.Model):
+    """
+    Cargo de un estado de cuenta (tabla de staging para la conciliación).
+    La referencia se guarda normalizada y el monto en valor absoluto.
+    Al conciliarse apunta al pago (Pago, PagoLogistica o PagoRevalidacion).
+    """
+
+    class Estatus(models.TextChoices):
+        PENDIENTE = 'pendiente', 'Pendiente'
+        CONCILIADO = 'conciliado', 'Conciliado'
+        SIN_COINCIDENCIA = 'sin_coincidencia', 'Sin coincidencia'
+        AMBIGUO = 'ambiguo', 'Ambiguo'
+
+    estado_cuenta = models.ForeignKey(
+        EstadoCuenta,
+        on_delete=models.CASCADE,
+        related_name='movimientos',
+        verbose_name='Estado de cuenta'
+    )
+    fecha = models.DateField('Fecha')
+    referencia = models.CharField('Referencia', max_length=100, blank=True)
+    monto = models.DecimalField('Monto', max_digits=12, decimal_places=2)
+    descripcion = models.CharField('Descripción', max_length=255, blank=True)
+    id_banco = models.CharField('ID del banco (FITID)', max_length=100, blank=True)
+
+    estatus = models.CharField(
+        'Estatus',
+        max_length=20,
+        choices=Estatus.choices,
+        default=Estatus.PENDIENTE
+    )
+    candidatos = models.PositiveSmallIntegerField('Pagos candidatos', default=0)
+
+    # Pago conciliado (relación genérica, como Pago.operacion)
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        verbose_name='Tipo de pago'
+    )
+    object_id = models.PositiveIntegerField('ID de pago', null=True, blank=True)
+    pago = GenericForeignKey('content_type', 'object_id')
+    fecha_conciliacion = models.DateTimeField('Fecha de conciliación', null=True, blank=True)
+
+    class Meta:
+        db_table = 'pagos_movimientos_bancarios'
+        verbose_name = 'Movimiento bancario'
+        verbose_name_plural = 'Movimientos bancarios'
+        ordering = ['fecha', 'id']
+        indexes = [
+            models.Index(fields=['referencia', 'monto', 'fecha']),
+            models.Index(fields=['estatus']),
+        ]
+        constraints = [
+            # Un pago solo puede conciliarse con un movimiento
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id'],
+                condition=models.Q(estatus='conciliado'),
+                name='uniq_movimiento_pago_conciliado'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} {self.referencia} ${self.monto:,.2f}"
+
+
+class LotePago(models.Model):
+    """
+    Lote de pago masivo (ver lotes.py).
+    Guarda las líneas del archivo y las operaciones incluidas para poder
+    regenerar el archivo o cancelar el lote (las operaciones vuelven a
+    pendiente). La referencia se deriva del id, así es única.
+    """
+
+    class Estatus(models.TextChoices):
+        GENERADO = 'generado', 'Generado'
+        CANCELADO = 'cancelado', 'Cancelado'
+
+    referencia = models.CharField('Referencia', max_length=12, unique=True, null=True, editable=False)
+    layout = models.CharField('Layout', max_length=30)
+    lineas = models.JSONField('Líneas del archivo', default=list, encoder=DjangoJSONEncoder)
+    operaciones = models.JSONField(
+        'Operaciones',
+        default=dict,
+        help_text='{"logistica": [ids], "revalidacion": [ids]}'
+    )
+    estatus = models.CharField(
+        'Estatus',
+        max_length=20,
+        choices=Estatus.choices,
+        default=Estatus.GENERADO
+    )
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='lotes_pago',
+        verbose_name='Generado por'
+    )
+    fecha_creacion = models.DateTimeField('Fecha de creación', auto_now_add=True)
+    fecha_cancelacion = models.DateTimeField('Fecha de cancelación', null=True, blank=True)
+
+    class Meta:
+        db_table = 'pagos_lotes'
+        verbose_name = 'Lote de pago'
+        verbose_name_plural = 'Lotes de pago'
+        ordering = ['-fecha_creacion']
+
+    def __str__(self):
+        return f"Lote {self.referencia} ({self.get_estatus_display()})"
+
+    @staticmethod
+    def referencia_para(lote_id):
+        # 9 caracteres: con el número de línea (3) cabe en los 15 del layout de ancho fijo
+        return f'L{lote_id:08d}'
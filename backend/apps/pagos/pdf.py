@@ -0,0 +1,126 @@
+"""
+Comprobante PDF de cierre de operación.
+
+Se genera con ReportLab a partir de `datos_comprobante` (los mismos datos que
+devuelve CierreOperacionViewSet.datos_comprobante). Ver apps.core.pdf para la
+caché por hash y la generación en lote.
+"""
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+from apps.core.pdf import obtener_pdf, generar_lote
+
+
+TIPO = 'comprobantes_cierre'
+
+AZUL = colors.HexColor('#2563eb')
+GRIS = colors.HexColor('#e2e8f0')
+
+
+def datos_comprobante(cierre):
+    """Datos del comprobante (requiere contenedor, empresa, cliente y usuario cargados)"""
+    contenedor = cierre.contenedor
+    desglose = cierre.desglose or {}
+    return {
+        'empresa': contenedor.empresa.nombre if contenedor.empresa else '',
+        'cliente': contenedor.cliente.nombre if contenedor.cliente else '',
+        'bl': contenedor.bl_master,
+        'contenedor': contenedor.numero,
+        'fecha_cierre': cierre.fecha_cierre.strftime('%d/%m/%Y'),
+        'monto_final': float(cierre.monto_final),
+        'divisa': desglose.get('divisa', 'MXN') if isinstance(desglose, dict) else 'MXN',
+        'desglose': desglose,
+        'garantias_verificadas': cierre.garantias_verificadas,
+        'observaciones': cierre.observaciones,
+        'cerrado_por': cierre.usuario.nombre if cierre.usuario else '',
+    }
+
+
+def _filas_desglose(desglose, divisa):
+    # El desglose puede ser {concepto: monto} o [{"concepto": ..., "monto": ...}]
+    if isinstance(desglose, dict):
+        pares = [(k, v) for k, v in desglose.items() if k != 'divisa']
+    else:
+        pares = [(d.get('concepto', ''), d.get('monto', '')) for d in desglose if isinstance(d, dict)]
+
+    filas = []
+    for concepto, monto in pares:
+        try:
+            monto = f"${float(monto):,.2f} {divisa}"
+        except (TypeError, ValueError):
+            monto = str(monto)
+        filas.append([str(concepto), monto])
+    return filas
+
+
+def renderizar_comprobante(datos):
+    """datos (datos_comprobante) -> bytes del PDF"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=letter,
+        leftMargin=20 * mm, rightMargin=20 * mm, topMargin=15 * mm, bottomMargin=15 * mm,
+        title=f"Comprobante de cierre {datos['contenedor']}"
+    )
+    titulo = ParagraphStyle('titulo', fontName='Helvetica-Bold', fontSize=16, leading=20)
+    texto = ParagraphStyle('texto', fontName='Helvetica', fontSize=10, leading=14)
+
+    elementos = [
+        Paragraph(escape(datos['empresa'] or 'Comprobante de cierre'), titulo),
+        Paragraph('COMPROBANTE DE CIERRE DE OPERACIÓN', texto),
+        Spacer(1, 4 * mm),
+    ]
+
+    generales = [
+        ['Contenedor', datos['contenedor']],
+        ['BL', datos['bl'] or ''],
+        ['Cliente', datos['cliente']],
+        ['Fecha de cierre', datos['fecha_cierre']],
+        ['Cerrado por', datos['cerrado_por']],
+        ['Garantías verificadas', 'Sí' if datos['garantias_verificadas'] else 'No'],
+    ]
+    tabla = Table(generales, colWidths=[50 * mm, 120 * mm])
+    tabla.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, GRIS),
+    ]))
+    elementos += [tabla, Spacer(1, 6 * mm)]
+
+    divisa = datos['divisa']
+    filas = [['CONCEPTO', f'MONTO ({divisa})']]
+    filas += _filas_desglose(datos['desglose'], divisa)
+    filas.append(['TOTAL', f"${datos['monto_final']:,.2f} {divisa}"])
+    tabla = Table(filas, colWidths=[110 * mm, 60 * mm])
+    tabla.setStyle(TableStyle([
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, GRIS),
+        ('BACKGROUND', (0, 0), (-1, 0), AZUL),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ]))
+    elementos.append(tabla)
+
+    if datos['observaciones']:
+        elementos += [Spacer(1, 6 * mm), Paragraph(f"Observaciones: {escape(datos['observaciones'])}", texto)]
+
+    doc.build(elementos)
+    return buffer.getvalue()
+
+
+def pdf_comprobante(cierre):
+    """Ruta del PDF cacheado del comprobante (lo genera si cambió)"""
+    return obtener_pdf(TIPO, cierre.id, datos_comprobante(cierre), renderizar_comprobante)
+
+
+def pdfs_comprobantes(cierres, procesos=None):
+    """Genera en lote (pool de procesos) los comprobantes de un queryset de cierres"""
+    trabajos = [(c.id, datos_comprobante(c)) for c in cierres]
+    return generar_lote(TIPO, trabajos, renderizar_comprobante, procesos=procesos)
@@ -0,0 +1,65 @@
+"""
+Registro de pagos con bloqueo de la operación.
+
+Dos usuarios pueden enviar a la vez el pago de la misma operación: la
+validación del serializer lee el estatus sin bloquear y ambos lo ven
+pendiente. Por eso el save() de los pagos vuelve a leer la operación con
+SELECT ... FOR UPDATE dentro de una transacción; el segundo espera a que el
+primero confirme, ve la operación ya pagada y se rechaza con 409.
+
+`registrar_pago` es la entrada única de las vistas: pago, estatus de la
+operación y bitácora se escriben en la misma transacción.
+"""
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.auditoria.utils import registrar_accion
+from .models import RELACIONADOS_OPERACION
+
+
+ESTATUS_NO_PAGABLES = ('pagado', 'cerrado')
+
+
+class OperacionYaPagada(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Esta operación ya está pagada o cerrada'
+    default_code = 'operacion_ya_pagada'
+
+
+def bloquear_operacion(operacion):
+    """
+    Relee la operación con FOR UPDATE (solo su fila, no las relacionadas).
+    Debe llamarse dentro de transaction.atomic().
+    """
+    modelo = type(operacion)
+    relacionados = RELACIONADOS_OPERACION.get(modelo._meta.model_name, ())
+    return (
+        modelo._base_manager.select_related(*relacionados)
+        .select_for_update(of=('self',))
+        .get(pk=operacion.pk)
+    )
+
+
+def registrar_pago(pago, usuario, ip_address=None):
+    """
+    Guarda un pago nuevo (Pago, PagoLogistica o PagoRevalidacion, sin guardar)
+    y su registro en bitácora. Lanza OperacionYaPagada si otra transacción
+    pagó o cerró la operación antes.
+    """
+    with transaction.atomic():
+        pago.save()
+        registrar_accion(
+            usuario=usuario,
+            accion='REGISTRAR_PAGO',
+            descripcion=f'Pago registrado: ${pago.monto:,.2f} para {pago.operacion}',
+            modelo=type(pago).__name__,
+            objeto_id=pago.id,
+            datos_nuevos={
+                'monto': str(pago.monto),
+                'fecha_pago': str(pago.fecha_pago),
+                'operacion': pago.operacion.pk,
+            },
+            ip_address=ip_address,
+        )
+    return pago
@@ -1,34 +1,92 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from .models import (
     Pago, PagoLogistica, PagoRevalidacion,
-    CierreOperacion, CierreLegacy
+    CierreOperacion, CierreLegacy, MovimientoBancario, RELACIONADOS_OPERACION
 )
+from .duplicados import validar_duplicados_pago
+from apps.archivos.serializers import PreviewsField
+from apps.operaciones.models import OperacionLogistica, OperacionRevalidacion
 
 
 # ============ PAGO GENERICO ============
 
 class PagoSerializer(serializers.ModelSerializer):
-    """Pago genérico con relación polimórfica"""
+    """
+    Pago genérico con relación polimórfica.
+    Para listas precargar las operaciones con models.prefetch_operaciones()
+    y evitar una consulta por fila.
+    """
     usuario_nombre = serializers.CharField(source='usuario.nombre', read_only=True)
     tipo_operacion_display = serializers.CharField(source='get_tipo_operacion_display', read_only=True)
+    comprobante_previews = PreviewsField(source='comprobante')
+    operacion_detalle = serializers.SerializerMethodField()
 
     class Meta:
         model = Pago
         fields = [
             'id', 'content_type', 'object_id', 'tipo_operacion', 'tipo_operacion_display',
+            'operacion_detalle',
             'usuario', 'usuario_nombre',
             'monto', 'fecha_pago', 'dias_retraso',
-            'concepto_pago', 'referencia', 'comprobante',
+            'concepto_pago', 'referencia', 'comprobante', 'comprobante_previews',
             'observaciones', 'fecha_registro'
         ]
         read_only_fields = ['id', 'usuario', 'dias_retraso', 'fecha_registro']
 
+    def get_operacion_detalle(self, obj):
+        operacion = obj.operacion
+        if operacion is None:
+            return None
+        contenedor = getattr(operacion, 'contenedor', None)
+        if isinstance(contenedor, str):
+            # Ticket legacy: contenedor es texto y no hay cliente relacionado
+            numero, cliente = contenedor, None
+        else:
+            numero = contenedor.numero if contenedor else None
+            cliente = contenedor.cliente.nombre if contenedor else None
+        return {
+            'descripcion': str(operacion),
+            'estatus': operacion.estatus,
+            'importe': str(operacion.importe),
+            'divisa': operacion.divisa,
+            'contenedor_numero': numero,
+            'cliente_nombre': cliente,
+        }
+
+
+class OperacionContentTypeField(serializers.PrimaryKeyRelatedField):
+    """
+    ContentType de la operación a pagar. Resuelve con la caché de ContentType
+    (sin consulta) y solo acepta los modelos que admiten pagos.
+    """
+    modelos_validos = ('operacionlogistica', 'operacionrevalidacion', 'ticket')
+
+    def get_queryset(self):
+        return ContentType.objects.filter(app_label='operaciones', model__in=self.modelos_validos)
+
+    def to_internal_value(self, data):
+        try:
+            content_type = ContentType.objects.get_for_id(int(data))
+        except (TypeError, ValueError, ContentType.DoesNotExist):
+            self.fail('does_not_exist', pk_value=data)
+        if content_type.app_label != 'operaciones' or content_type.model not in self.modelos_validos:
+            self.fail('does_not_exist', pk_value=data)
+        return content_type
+
 
 class PagoCreateSerializer(serializers.ModelSerializer):
-    """Serializer para crear pagos genéricos"""
+    """
+    Serializer para crear pagos genéricos.
+    La operación se carga aquí (con sus relaciones) y se asigna al pago;
+    Pago.save() la vuelve a leer bloqueada antes de marcarla pagada.
+    """
     # Campo opcional para enviar ticket directamente
     ticket = serializers.IntegerField(write_only=True, required=False)
+    content_type = OperacionContentTypeField(required=False)
+    # Registrar aunque haya posibles duplicados (ver duplicados.py)
+    confirmar_duplicado = serializers.BooleanField(required=False, default=False, write_only=True)
 
     class Meta:
         model = Pago
@@ -36,32 +94,22 @@ class PagoCreateSerializer(serializers.ModelSerializer):
             'content_type', 'object_id', 'ticket',
             'monto', 'fecha_pago',
             'concepto_pago', 'referencia', 'comprobante',
-            'observaciones'
+            'observaciones', 'confirmar_duplicado'
         ]
         extra_kwargs = {
-            'content_type': {'required': False},
             'object_id': {'required': False},
         }
 
     def validate(self, attrs):
+        validar_duplicados_pago(Pago, attrs)
+
         # Si viene 'ticket', convertir a content_type y object_id
         ticket_id = attrs.pop('ticket', None)
 
         if ticket_id:
             from apps.operaciones.models import Ticket
-
-            try:
-                ticket = Ticket.objects.get(pk=ticket_id)
-                if ticket.estatus in ['pagado', 'cerrado']:
-                    raise serializers.ValidationError(
-                        'Este ticket ya está pagado o cerrado'
-                    )
-                attrs['content_type'] = ContentType.objects.get_for_model(Ticket)
-                attrs['object_id'] = ticket_id
-            except Ticket.DoesNotExist:
-                raise serializers.ValidationError(
-                    {'ticket': 'El ticket especificado no existe'}
-                )
+            attrs['content_type'] = ContentType.objects.get_for_model(Ticket)
+            attrs['object_id'] = ticket_id
 
         # Validar que tengamos content_type y object_id
         content_type = attrs.get('content_type')
@@ -72,27 +120,33 @@ class PagoCreateSerializer(serializers.ModelSerializer):
                 'Debe especificar ticket o (content_type y object_id)'
             )
 
-        # Validar que la operación exista
-        if content_type and object_id:
-            model_class = content_type.model_class()
-            if model_class:
-                try:
-                    obj = model_class.objects.get(pk=object_id)
-                    if hasattr(obj, 'estatus') and obj.estatus in ['pagado', 'cerrado']:
-                        raise serializers.ValidationError(
-                            'Esta operación ya está pagada o cerrada'
-                        )
-                except model_class.DoesNotExist:
-                    raise serializers.ValidationError(
-                        'La operación especificada no existe'
-                    )
-
+        # Validar que la operación exista (con sus relaciones para no recargarlas después)
+        modelo = content_type.model_class()
+        try:
+            operacion = modelo._base_manager.select_related(
+                *RELACIONADOS_OPERACION.get(content_type.model, ())
+            ).get(pk=object_id)
+        except modelo.DoesNotExist:
+            if ticket_id:
+                raise serializers.ValidationError({'ticket': 'El ticket especificado no existe'})
+            raise serializers.ValidationError('La operación especificada no existe')
+
+        if operacion.estatus in ['pagado', 'cerrado']:
+            raise serializers.ValidationError('Esta operación ya está pagada o cerrada')
+
+        attrs['operacion'] = operacion
         return attrs
-    
-    def create(self, validated_data):
-        # Remover 'ticket' antes de crear el objeto
-        validated_data.pop('ticket', None)
-        return super().create(validated_data)
+
+
+class OperacionDelPuertoMixin:
+    """Limita el campo `operacion` a las operaciones del puerto del usuario"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            campo = self.fields['operacion']
+            campo.queryset = request.user.filtrar_por_puerto(campo.queryset, campo_puerto='contenedor__puerto')
 
 
 # ============ PAGO LOGISTICA ============
@@ -101,29 +155,36 @@ class PagoLogisticaSerializer(serializers.ModelSerializer):
     """Pago específico para operaciones de logística"""
     operacion_comentarios = serializers.CharField(source='operacion.comentarios', read_only=True)
     contenedor_numero = serializers.CharField(source='operacion.contenedor.numero', read_only=True)
+    cliente_nombre = serializers.CharField(source='operacion.contenedor.cliente.nombre', read_only=True)
     usuario_nombre = serializers.CharField(source='usuario.nombre', read_only=True)
+    comprobante_previews = PreviewsField(source='comprobante')
 
     class Meta:
         model = PagoLogistica
         fields = [
-            'id', 'operacion', 'operacion_comentarios', 'contenedor_numero',
+            'id', 'operacion', 'operacion_comentarios', 'contenedor_numero', 'cliente_nombre',
             'usuario', 'usuario_nombre',
             'monto', 'fecha_pago',
-            'referencia_bancaria', 'comprobante',
+            'referencia_bancaria', 'comprobante', 'comprobante_previews',
             'observaciones', 'fecha_registro'
         ]
         read_only_fields = ['id', 'usuario', 'fecha_registro']
 
 
-class PagoLogisticaCreateSerializer(serializers.ModelSerializer):
+class PagoLogisticaCreateSerializer(OperacionDelPuertoMixin, serializers.ModelSerializer):
     """Serializer para registrar pagos de logística"""
 
+    confirmar_duplicado = serializers.BooleanField(required=False, default=False, write_only=True)
+
     class Meta:
         model = PagoLogistica
         fields = [
             'operacion', 'monto', 'fecha_pago',
-            'referencia_bancaria', 'comprobante', 'observaciones'
+            'referencia_bancaria', 'comprobante', 'observaciones', 'confirmar_duplicado'
         ]
+        extra_kwargs = {
+            'operacion': {'queryset': OperacionLogistica.objects.select_related('contenedor')},
+        }
 
     def validate_operacion(self, value):
         if value.estatus == 'pagado':
@@ -132,6 +193,10 @@ class PagoLogisticaCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Esta operación ya está cerrada')
         return value
 
+    def validate(self, attrs):
+        validar_duplicados_pago(self.Meta.model, attrs)
+        return attrs
+
 
 # ============ PAGO REVALIDACION ============
 
@@ -139,33 +204,41 @@ class PagoRevalidacionSerializer(serializers.ModelSerializer):
     """Pago específico para operaciones de revalidación"""
     operacion_referencia = serializers.CharField(source='operacion.referencia', read_only=True)
     bl = serializers.CharField(source='operacion.bl', read_only=True)
+    contenedor_numero = serializers.CharField(source='operacion.contenedor.numero', read_only=True)
+    cliente_nombre = serializers.CharField(source='operacion.contenedor.cliente.nombre', read_only=True)
     usuario_nombre = serializers.CharField(source='usuario.nombre', read_only=True)
     tipo_pago_display = serializers.CharField(source='get_tipo_pago_display', read_only=True)
+    comprobante_previews = PreviewsField(source='comprobante')
 
     class Meta:
         model = PagoRevalidacion
         fields = [
-            'id', 'operacion', 'operacion_referencia', 'bl',
+            'id', 'operacion', 'operacion_referencia', 'bl', 'contenedor_numero', 'cliente_nombre',
             'usuario', 'usuario_nombre',
             'tipo_pago', 'tipo_pago_display',
             'monto', 'fecha_pago',
-            'referencia_bancaria', 'comprobante',
+            'referencia_bancaria', 'comprobante', 'comprobante_previews',
             'observaciones', 'observaciones_tesoreria',
             'fecha_registro'
         ]
         read_only_fields = ['id', 'usuario', 'fecha_registro']
 
 
-class PagoRevalidacionCreateSerializer(serializers.ModelSerializer):
+class PagoRevalidacionCreateSerializer(OperacionDelPuertoMixin, serializers.ModelSerializer):
     """Serializer para registrar pagos de revalidación"""
 
+    confirmar_duplicado = serializers.BooleanField(required=False, default=False, write_only=True)
+
     class Meta:
         model = PagoRevalidacion
         fields = [
             'operacion', 'tipo_pago', 'monto', 'fecha_pago',
             'referencia_bancaria', 'comprobante',
-            'observaciones', 'observaciones_tesoreria'
+            'observaciones', 'observaciones_tesoreria', 'confirmar_duplicado'
         ]
+        extra_kwargs = {
+            'operacion': {'queryset': OperacionRevalidacion.objects.select_related('contenedor')},
+        }
 
     def validate_operacion(self, value):
         if value.estatus == 'pagado':
@@ -173,6 +246,7 @@ class PagoRevalidacionCreateSerializer(serializers.ModelSerializer):
         return value
 
     def validate(self, attrs):
+        validar_duplicados_pago(self.Meta.model, attrs)
         # Si es pago de demora, verificar que el usuario tenga permiso
         request = self.context.get('request')
         if request and attrs.get('tipo_pago') == 'demora':
@@ -227,6 +301,26 @@ class CierreOperacionCreateSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class CierreLoteItemSerializer(serializers.Serializer):
+    """Un contenedor dentro de un cierre en lote (se valida en conjunto en la vista)"""
+    contenedor = serializers.IntegerField()
+    monto_final = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0)
+    desglose = serializers.JSONField(required=False, default=dict)
+    garantias_verificadas = serializers.BooleanField(required=False, default=False)
+    observaciones = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class CierreOperacionLoteSerializer(serializers.Serializer):
+    """Serializer para cerrar varios contenedores en una sola operación"""
+    cierres = CierreLoteItemSerializer(many=True, allow_empty=False)
+
+    def validate_cierres(self, value):
+        ids = [c['contenedor'] for c in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Hay contenedores repetidos')
+        return value
+
+
 # ============ CIERRE LEGACY ============
 
 class CierreLegacySerializer(serializers.ModelSerializer):
@@ -258,4 +352,41 @@ class CierreLegacyCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Este ticket ya está cerrado')
         if hasattr(value, 'cierre'):
             raise serializers.ValidationError('Este ticket ya tiene un cierre registrado')
-        return value
\ No newline at end of file
+        return value
+
+
+# ============ CONCILIACIÓN BANCARIA ============
+
+class MovimientoBancarioSerializer(serializers.ModelSerializer):
+    """Cargo de un estado de cuenta y el pago con el que se concilió"""
+    estado_cuenta_archivo = serializers.CharField(source='estado_cuenta.archivo', read_only=True)
+    estatus_display = serializers.CharField(source='get_estatus_display', read_only=True)
+    tipo_pago = serializers.CharField(source='content_type.model', read_only=True, default=None)
+
+    class Meta:
+        model = MovimientoBancario
+        fields = [
+            'id', 'estado_cuenta', 'estado_cuenta_archivo',
+            'fecha', 'referencia', 'monto', 'descripcion', 'id_banco',
+            'estatus', 'estatus_display', 'candidatos',
+            'tipo_pago', 'object_id', 'fecha_conciliacion'
+        ]
+        read_only_fields = fields
+
+
+# ============ LOTE DE PAGO MASIVO ============
+
+class LotePagoSerializer(serializers.Serializer):
+    """Operaciones a incluir en un archivo de pago masivo"""
+    logistica = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    revalidacion = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    layout = serializers.ChoiceField(choices=[])
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['layout'].choices = list(settings.LAYOUTS_PAGO_MASIVO)
+
+    def validate(self, attrs):
+        if not attrs['logistica'] and not attrs['revalidacion']:
+            raise serializers.ValidationError('Debe seleccionar al menos una operación')
+        return attrs
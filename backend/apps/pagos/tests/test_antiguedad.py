@@ -0,0 +1,32 @@
+import csv
+from decimal import Decimal
+from io import StringIO
+
+from rest_framework.test import APITestCase
+
+from apps.operaciones.tests.datos import crear_catalogos, crear_contenedor, crear_logistica, crear_usuario
+
+
+class ExportarAntiguedadTests(APITestCase):
+
+    def setUp(self):
+        self.usuario = crear_usuario('admin')
+        catalogos = crear_catalogos()
+        contenedor = crear_contenedor(catalogos, self.usuario)
+        for consecutivo, importe in enumerate(('0.10', '0.20', '1234.5'), start=1):
+            crear_logistica(contenedor, self.usuario, catalogos, consecutivo=consecutivo, importe=Decimal(importe))
+        self.client.force_authenticate(self.usuario)
+
+    def test_csv_con_importes_a_dos_decimales(self):
+        respuesta = self.client.get('/api/pagos/antiguedad/exportar/', {'origenes': 'logistica'})
+        self.assertEqual(respuesta.status_code, 200)
+        contenido = b''.join(respuesta.streaming_content).decode('utf-8-sig')
+        encabezados, fila = list(csv.reader(StringIO(contenido)))
+        self.assertEqual(encabezados, ['Empresa', 'Divisa', 'Cantidad', '0-7', '8-15', '16-30', '30+', 'Total'])
+        self.assertEqual(fila, ['Empresa prueba', 'MXN', '3', '1234.80', '0.00', '0.00', '0.00', '1234.80'])
+
+    def test_listado_json(self):
+        respuesta = self.client.get('/api/pagos/antiguedad/', {'origenes': 'logistica'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['filas'][0]['total'], 1234.8)
+        self.assertEqual(respuesta.data['totales']['MXN']['0-7'], 1234.8)
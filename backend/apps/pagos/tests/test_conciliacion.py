@@ -0,0 +1,189 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.operaciones.tests.datos import crear_catalogos, crear_contenedor, crear_logistica, crear_usuario
+from apps.pagos.conciliacion import ErrorImportacion, conciliar, importar_estado_cuenta, leer_csv, leer_ofx
+from apps.pagos.models import EstadoCuenta, MovimientoBancario, PagoLogistica
+
+
+OFX_SGML = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260305120000
+<TRNAMT>-1,500.00
+<FITID>F001
+<REFNUM>ab 12
+<NAME>PROVEEDOR
+<MEMO>Flete
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260306
+<TRNAMT>300.00
+<FITID>F002
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+OFX_XML = (
+    '<?xml version="1.0"?><OFX><STMTTRN><DTPOSTED>20260307</DTPOSTED><TRNAMT>-80.5</TRNAMT>'
+    '<FITID>F003</FITID><CHECKNUM>555</CHECKNUM></STMTTRN></OFX>\n'
+)
+
+
+class LectoresTests(SimpleTestCase):
+
+    def test_csv_con_cargo_omite_abonos(self):
+        archivo = io.StringIO(
+            'Fecha Operación,Referencia,Descripción,Cargo,Abono\n'
+            '05/03/2026, ab 12 ,Flete,"$1,500.00",\n'
+            '06/03/2026,XY,Depósito,,300\n'
+            '2026-03-07,,Comisión,10,\n'
+        )
+        self.assertEqual(list(leer_csv(archivo)), [
+            {'fecha': date(2026, 3, 5), 'referencia': 'AB12', 'monto': Decimal('1500.00'),
+             'descripcion': 'Flete', 'id_banco': ''},
+            {'fecha': date(2026, 3, 7), 'referencia': '', 'monto': Decimal('10'),
+             'descripcion': 'Comisión', 'id_banco': ''},
+        ])
+
+    def test_csv_con_monto_toma_el_valor_absoluto(self):
+        filas = list(leer_csv(io.StringIO('fecha,importe\n05/03/2026,-250.10\n')))
+        self.assertEqual(filas[0]['monto'], Decimal('250.10'))
+
+    def test_csv_sin_columnas_requeridas(self):
+        with self.assertRaises(ErrorImportacion):
+            list(leer_csv(io.StringIO('referencia,descripcion\nA,B\n')))
+
+    def test_csv_monto_invalido_indica_la_linea(self):
+        with self.assertRaisesMessage(ErrorImportacion, 'Línea 3'):
+            list(leer_csv(io.StringIO('fecha,cargo\n05/03/2026,10\n06/03/2026,diez\n')))
+
+    def test_ofx_sgml_solo_cargos(self):
+        self.assertEqual(list(leer_ofx(io.StringIO(OFX_SGML))), [
+            {'fecha': date(2026, 3, 5), 'referencia': 'AB12', 'monto': Decimal('1500.00'),
+             'descripcion': 'PROVEEDOR Flete', 'id_banco': 'F001'},
+        ])
+
+    def test_ofx_xml_en_una_linea(self):
+        self.assertEqual(list(leer_ofx(io.StringIO(OFX_XML))), [
+            {'fecha': date(2026, 3, 7), 'referencia': '555', 'monto': Decimal('80.5'),
+             'descripcion': '', 'id_banco': 'F003'},
+        ])
+
+
+class ImportacionTests(TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+
+    def archivo(self, nombre, contenido):
+        ruta = os.path.join(self.directorio, nombre)
+        with open(ruta, 'w', encoding='utf-8') as salida:
+            salida.write(contenido)
+        return ruta
+
+    def test_rechaza_el_mismo_archivo_en_la_misma_cuenta(self):
+        ruta = self.archivo('marzo.ofx', OFX_SGML)
+        estado, total, _ = importar_estado_cuenta(ruta, cuenta='0123')
+        self.assertEqual(total, 1)
+
+        with self.assertRaisesMessage(ErrorImportacion, f'#{estado.id}'):
+            importar_estado_cuenta(ruta, cuenta='0123')
+        self.assertEqual(EstadoCuenta.objects.count(), 1)
+
+        # En otra cuenta sí se importa
+        importar_estado_cuenta(ruta, cuenta='9999')
+        self.assertEqual(EstadoCuenta.objects.count(), 2)
+
+    def test_estado_traslapado_omite_fitid_repetidos(self):
+        importar_estado_cuenta(self.archivo('marzo.ofx', OFX_SGML), cuenta='0123')
+        # Repite F001 y agrega un cargo nuevo
+        traslapado = OFX_SGML.replace(
+            '</BANKTRANLIST>', '<STMTTRN><DTPOSTED>20260307</DTPOSTED><TRNAMT>-80.5</TRNAMT><FITID>F003</FITID></STMTTRN>\n</BANKTRANLIST>'
+        )
+
+        _, total, omitidos = importar_estado_cuenta(self.archivo('marzo-2.ofx', traslapado), cuenta='0123')
+        self.assertEqual((total, omitidos), (1, 1))
+        self.assertEqual(
+            sorted(MovimientoBancario.objects.values_list('id_banco', flat=True)), ['F001', 'F003']
+        )
+
+
+class ConciliarTests(TestCase):
+
+    def setUp(self):
+        self.usuario = crear_usuario('admin')
+        self.catalogos = crear_catalogos()
+        self.contenedor = crear_contenedor(self.catalogos, self.usuario)
+        self.estado = EstadoCuenta.objects.create(archivo='marzo.csv', formato='csv')
+        self.consecutivo = 0
+        self.hoy = date(2026, 3, 10)
+
+    def pago(self, referencia, monto, dias=0):
+        self.consecutivo += 1
+        operacion = crear_logistica(self.contenedor, self.usuario, self.catalogos, consecutivo=self.consecutivo)
+        return PagoLogistica.objects.create(
+            operacion=operacion, usuario=self.usuario, monto=Decimal(monto),
+            referencia_bancaria=referencia, fecha_pago=self.hoy + timedelta(days=dias)
+        )
+
+    def movimiento(self, referencia, monto, dias=0):
+        return MovimientoBancario.objects.create(
+            estado_cuenta=self.estado, fecha=self.hoy + timedelta(days=dias),
+            referencia=referencia, monto=Decimal(monto)
+        )
+
+    def test_coincidencia_unica_concilia(self):
+        pago = self.pago('ref 1', '100', dias=-2)
+        self.pago('REF1', '100', dias=-10)  # Fuera de la tolerancia
+        self.pago('REF1', '99')  # Otro monto
+        movimiento = self.movimiento('REF1', '100')
+
+        self.assertEqual(conciliar(), {'conciliados': 1, 'ambiguos': 0, 'sin_coincidencia': 0})
+        movimiento.refresh_from_db()
+        self.assertEqual(movimiento.estatus, MovimientoBancario.Estatus.CONCILIADO)
+        self.assertEqual(movimiento.pago, pago)
+
+    def test_empate_se_resuelve_por_la_misma_fecha(self):
+        self.pago('REF1', '100', dias=-1)
+        mismo_dia = self.pago('REF1', '100')
+        movimiento = self.movimiento('REF1', '100')
+
+        conciliar()
+        movimiento.refresh_from_db()
+        self.assertEqual(movimiento.pago, mismo_dia)
+        self.assertEqual(movimiento.candidatos, 1)
+
+    def test_empate_sin_la_misma_fecha_es_ambiguo(self):
+        self.pago('REF1', '100', dias=-1)
+        self.pago('REF1', '100', dias=1)
+        movimiento = self.movimiento('REF1', '100')
+
+        self.assertEqual(conciliar()['ambiguos'], 1)
+        movimiento.refresh_from_db()
+        self.assertEqual(movimiento.candidatos, 2)
+
+    def test_pago_reclamado_por_dos_movimientos_es_ambiguo(self):
+        self.pago('REF1', '100')
+        primero = self.movimiento('REF1', '100')
+        segundo = self.movimiento('REF1', '100', dias=1)
+
+        self.assertEqual(conciliar(), {'conciliados': 0, 'ambiguos': 2, 'sin_coincidencia': 0})
+        for movimiento in (primero, segundo):
+            movimiento.refresh_from_db()
+            self.assertEqual(movimiento.estatus, MovimientoBancario.Estatus.AMBIGUO)
+            self.assertIsNone(movimiento.object_id)
+
+    def test_sin_candidatos(self):
+        self.pago('REF1', '100')
+        self.movimiento('OTRA', '100')
+        self.assertEqual(conciliar()['sin_coincidencia'], 1)
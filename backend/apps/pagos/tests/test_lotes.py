@@ -0,0 +1,105 @@
+import csv
+import io
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework.test import APITestCase
+
+from apps.operaciones.models import OperacionLogistica, OperacionRevalidacion
+from apps.operaciones.tests.datos import (
+    crear_catalogos, crear_contenedor, crear_logistica, crear_revalidacion, crear_usuario
+)
+from apps.pagos.models import LotePago
+
+
+class LotePagoTests(APITestCase):
+
+    def setUp(self):
+        self.usuario = crear_usuario('admin')
+        self.client.force_authenticate(self.usuario)
+        catalogos = crear_catalogos()
+        contenedor = crear_contenedor(catalogos, self.usuario)
+        self.flete = crear_logistica(contenedor, self.usuario, catalogos, consecutivo=1, importe=Decimal('100'))
+        self.maniobra = crear_logistica(contenedor, self.usuario, catalogos, consecutivo=2, importe=Decimal('250.50'))
+        self.revalidacion = crear_revalidacion(contenedor, self.usuario, catalogos, importe=Decimal('10'))
+
+    def generar(self, layout='csv', **ids):
+        ids = ids or {'logistica': [self.flete.id, self.maniobra.id], 'revalidacion': [self.revalidacion.id]}
+        return self.client.post('/api/pagos/lotes/', {**ids, 'layout': layout}, format='json')
+
+    def contenido(self, respuesta):
+        self.assertEqual(respuesta.status_code, 200)
+        return b''.join(respuesta.streaming_content).decode()
+
+    def test_agrupa_por_beneficiario_y_divisa(self):
+        respuesta = self.generar()
+        referencia = respuesta['X-Lote-Referencia']
+        filas = list(csv.DictReader(io.StringIO(self.contenido(respuesta))))
+
+        self.assertEqual(len(filas), 2)
+        logistica, revalidacion = filas
+        self.assertEqual(logistica['beneficiario'], 'Proveedor prueba')
+        self.assertEqual((logistica['moneda'], logistica['importe']), ('MXN', '350.50'))
+        self.assertEqual(logistica['concepto'], f'2 OPERACIONES {referencia}')
+        self.assertEqual(logistica['operaciones'], f'L{self.flete.id} L{self.maniobra.id}')
+        self.assertEqual(logistica['referencia'], f'{referencia}001')
+        self.assertEqual((revalidacion['cuenta'], revalidacion['moneda'], revalidacion['importe']), ('998877', 'USD', '10.00'))
+        self.assertEqual(revalidacion['concepto'], self.revalidacion.referencia)
+        self.assertEqual(revalidacion['referencia'], f'{referencia}002')
+
+        self.flete.refresh_from_db()
+        self.assertEqual(self.flete.estatus, OperacionLogistica.Estatus.EN_PROCESO)
+        lote = LotePago.objects.get(referencia=referencia)
+        self.assertEqual(lote.operaciones, {
+            'logistica': [self.flete.id, self.maniobra.id], 'revalidacion': [self.revalidacion.id]
+        })
+
+    def test_layout_ancho_fijo(self):
+        lineas = self.contenido(self.generar('ancho_fijo')).split('\r\n')
+        ancho = sum(campo[1] for campo in settings.LAYOUTS_PAGO_MASIVO['ancho_fijo']['campos'])
+
+        self.assertEqual(lineas[-1], '')
+        self.assertEqual([len(linea) for linea in lineas[:-1]], [ancho, ancho])
+        primera = lineas[0]
+        self.assertEqual(primera[:18], '012345678901234567')
+        self.assertEqual(primera[38:53], '000000000035050')
+        self.assertEqual(primera[53:56], 'MXN')
+        self.assertEqual(primera[56:96].rstrip(), 'PROVEEDOR PRUEBA')
+        self.assertTrue(primera.isascii())
+
+    def test_referencias_unicas_en_el_mismo_segundo(self):
+        primera = self.generar(logistica=[self.flete.id])['X-Lote-Referencia']
+        segunda = self.generar(logistica=[self.maniobra.id])['X-Lote-Referencia']
+        self.assertNotEqual(primera, segunda)
+
+    def test_regenerar_por_referencia(self):
+        respuesta = self.generar()
+        original = self.contenido(respuesta)
+        referencia = respuesta['X-Lote-Referencia']
+
+        self.assertEqual(self.contenido(self.client.get(f'/api/pagos/lotes/{referencia}/archivo/')), original)
+        ancho_fijo = self.client.get(f'/api/pagos/lotes/{referencia}/archivo/', {'layout': 'ancho_fijo'})
+        self.assertEqual(ancho_fijo['Content-Type'], 'text/plain; charset=ascii')
+        self.assertEqual(self.client.get(f'/api/pagos/lotes/{referencia}/archivo/', {'layout': 'x'}).status_code, 400)
+
+    def test_cancelar_regresa_las_operaciones_a_pendiente(self):
+        referencia = self.generar()['X-Lote-Referencia']
+        # Una ya la confirmó el banco: no vuelve a pendiente
+        OperacionLogistica.objects.filter(pk=self.maniobra.pk).update(estatus='pagado')
+
+        respuesta = self.client.post(f'/api/pagos/lotes/{referencia}/cancelar/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['operaciones_pendientes'], 2)
+        self.assertEqual(OperacionLogistica.objects.get(pk=self.flete.pk).estatus, 'pendiente')
+        self.assertEqual(OperacionLogistica.objects.get(pk=self.maniobra.pk).estatus, 'pagado')
+        self.assertEqual(OperacionRevalidacion.objects.get(pk=self.revalidacion.pk).estatus, 'pendiente')
+        self.assertEqual(LotePago.objects.get(referencia=referencia).estatus, LotePago.Estatus.CANCELADO)
+
+        self.assertEqual(self.client.post(f'/api/pagos/lotes/{referencia}/cancelar/').status_code, 400)
+        self.assertEqual(self.client.get(f'/api/pagos/lotes/{referencia}/archivo/').status_code, 400)
+
+    def test_lote_de_otro_usuario_con_puerto(self):
+        referencia = self.generar()['X-Lote-Referencia']
+        otro = crear_usuario('pagos', puerto=self.flete.contenedor.puerto)
+        self.client.force_authenticate(otro)
+        self.assertEqual(self.client.post(f'/api/pagos/lotes/{referencia}/cancelar/').status_code, 404)
@@ -0,0 +1,60 @@
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from rest_framework.test import APIClient
+
+from apps.operaciones.tests.datos import crear_catalogos, crear_contenedor, crear_logistica, crear_usuario
+from apps.pagos import views
+from apps.pagos.models import PagoLogistica
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class RegistroPagoConcurrenteTests(TransactionTestCase):
+    """Dos pagos simultáneos de la misma operación: solo uno se registra"""
+
+    def setUp(self):
+        self.usuario = crear_usuario('pagos')
+        catalogos = crear_catalogos()
+        contenedor = crear_contenedor(catalogos, self.usuario)
+        self.operacion = crear_logistica(contenedor, self.usuario, catalogos)
+
+    def test_segundo_pago_simultaneo_recibe_409(self):
+        # Ambas peticiones pasan la validación del serializer (operación
+        # pendiente) antes de que cualquiera guarde; el FOR UPDATE decide.
+        barrera = threading.Barrier(2, timeout=10)
+        registrar_pago = views.registrar_pago
+
+        def registrar_tras_barrera(*args, **kwargs):
+            barrera.wait()
+            return registrar_pago(*args, **kwargs)
+
+        respuestas = []
+
+        def pagar(referencia):
+            cliente = APIClient()
+            cliente.force_authenticate(self.usuario)
+            try:
+                respuestas.append(cliente.post('/api/pagos/logistica/', {
+                    'operacion': self.operacion.id, 'monto': '100.00',
+                    'referencia_bancaria': referencia,
+                }, format='json'))
+            finally:
+                connection.close()
+
+        with mock.patch.object(views, 'registrar_pago', registrar_tras_barrera):
+            hilos = [threading.Thread(target=pagar, args=(f'REF-{n}',)) for n in range(2)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+
+        self.assertEqual(sorted(r.status_code for r in respuestas), [201, 409])
+        conflicto = next(r for r in respuestas if r.status_code == 409)
+        self.assertEqual(conflicto.data['detail'].code, 'operacion_ya_pagada')
+        self.assertEqual(PagoLogistica.objects.filter(operacion=self.operacion).count(), 1)
+        self.operacion.refresh_from_db()
+        self.assertEqual(self.operacion.estatus, 'pagado')
+        self.assertEqual(PagoLogistica.objects.get().monto, Decimal('100.00'))
@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from rest_framework.test import APITestCase
+
+from apps.operaciones.models import OperacionLogistica
+from apps.operaciones.tests.datos import (
+    crear_catalogos, crear_contenedor, crear_logistica, crear_revalidacion, crear_usuario
+)
+from apps.pagos.models import Pago, PagoLogistica, PagoRevalidacion
+
+
+class ListadoPagosTests(APITestCase):
+    """Los listados hacen las mismas consultas con una fila que con varias"""
+
+    def setUp(self):
+        self.usuario = crear_usuario('admin')
+        self.catalogos = crear_catalogos()
+        self.client.force_authenticate(self.usuario)
+        # Caché de ContentType caliente, como en un proceso ya en marcha
+        ContentType.objects.get_for_models(Pago, OperacionLogistica)
+
+    def crear_pagos(self, filas):
+        tipo_logistica = ContentType.objects.get_for_model(OperacionLogistica)
+        for n in range(filas):
+            contenedor = crear_contenedor(self.catalogos, self.usuario, numero=f'PRUE{n:07d}')
+            logistica = crear_logistica(contenedor, self.usuario, self.catalogos, consecutivo=2 * n + 1)
+            otra = crear_logistica(contenedor, self.usuario, self.catalogos, consecutivo=2 * n + 2)
+            revalidacion = crear_revalidacion(contenedor, self.usuario, self.catalogos, consecutivo=n + 1)
+            PagoLogistica.objects.create(operacion=logistica, usuario=self.usuario, monto=Decimal('100'))
+            PagoRevalidacion.objects.create(operacion=revalidacion, usuario=self.usuario, monto=Decimal('10'))
+            Pago.objects.create(
+                content_type=tipo_logistica, object_id=otra.id, usuario=self.usuario, monto=Decimal('100')
+            )
+
+    def assert_consultas(self, url, filas, consultas):
+        self.crear_pagos(filas)
+        with self.assertNumQueries(consultas):
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['count'], filas)
+
+    def test_logistica_una_fila(self):
+        self.assert_consultas('/api/pagos/logistica/', 1, 2)
+
+    def test_logistica_varias_filas(self):
+        self.assert_consultas('/api/pagos/logistica/', 5, 2)
+
+    def test_revalidacion_una_fila(self):
+        self.assert_consultas('/api/pagos/revalidacion/', 1, 2)
+
+    def test_revalidacion_varias_filas(self):
+        self.assert_consultas('/api/pagos/revalidacion/', 5, 2)
+
+    def test_registros_una_fila(self):
+        self.assert_consultas('/api/pagos/registros/', 1, 3)
+
+    def test_registros_varias_filas(self):
+        self.assert_consultas('/api/pagos/registros/', 5, 3)
+
+
+class AltaPagoPorPuertoTests(APITestCase):
+    """Un usuario con puerto asignado solo paga operaciones de su puerto"""
+
+    def setUp(self):
+        self.catalogos = crear_catalogos()
+        self.usuario = crear_usuario('pagos', puerto=self.catalogos['puerto'])
+        self.client.force_authenticate(self.usuario)
+        propio = crear_contenedor(self.catalogos, self.usuario, numero='PRUE0000001')
+        ajeno = crear_contenedor(
+            self.catalogos, self.usuario, numero='PRUE0000002', puerto=self.catalogos['otro_puerto']
+        )
+        self.operaciones = {
+            'logistica': (
+                crear_logistica(propio, self.usuario, self.catalogos, consecutivo=1),
+                crear_logistica(ajeno, self.usuario, self.catalogos, consecutivo=2),
+            ),
+            'revalidacion': (
+                crear_revalidacion(propio, self.usuario, self.catalogos, consecutivo=1),
+                crear_revalidacion(ajeno, self.usuario, self.catalogos, consecutivo=2),
+            ),
+        }
+
+    def test_operacion_de_otro_puerto_se_rechaza(self):
+        for ruta, (propia, ajena) in self.operaciones.items():
+            with self.subTest(ruta=ruta):
+                respuesta = self.client.post(f'/api/pagos/{ruta}/', {'operacion': ajena.id, 'monto': '1'})
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('operacion', respuesta.data)
+
+                respuesta = self.client.post(f'/api/pagos/{ruta}/', {'operacion': propia.id, 'monto': '1'})
+                self.assertEqual(respuesta.status_code, 201)
+
+        self.assertFalse(PagoLogistica.objects.filter(operacion=self.operaciones['logistica'][1]).exists())
+        self.assertFalse(PagoRevalidacion.objects.filter(operacion=self.operaciones['revalidacion'][1]).exists())
+
+
+class EdicionPagoTests(APITestCase):
+    """Editar un pago no cambia el estatus de su operación"""
+
+    def test_editar_no_reabre_operacion_cerrada(self):
+        catalogos = crear_catalogos()
+        usuario = crear_usuario('admin')
+        operacion = crear_logistica(crear_contenedor(catalogos, usuario), usuario, catalogos)
+        pago = PagoLogistica.objects.create(operacion=operacion, usuario=usuario, monto=Decimal('100'))
+        OperacionLogistica.objects.filter(pk=operacion.pk).update(estatus='cerrado')
+
+        self.client.force_authenticate(usuario)
+        respuesta = self.client.patch(f'/api/pagos/logistica/{pago.id}/', {'observaciones': 'Corregido'})
+        self.assertEqual(respuesta.status_code, 200)
+        operacion.refresh_from_db()
+        self.assertEqual(operacion.estatus, 'cerrado')
+        pago.refresh_from_db()
+        self.assertEqual(pago.observaciones, 'Corregido')
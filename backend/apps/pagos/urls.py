@@ -1,10 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PagoViewSet, CierreOperacionViewSet
+from .views import (
+    PagoViewSet, PagoLogisticaViewSet, PagoRevalidacionViewSet, CierreOperacionViewSet,
+    AntiguedadSaldosViewSet, MovimientoBancarioViewSet, LotePagoViewSet
+)
 
 router = DefaultRouter()
 router.register(r'registros', PagoViewSet, basename='pago')
+router.register(r'logistica', PagoLogisticaViewSet, basename='pago-logistica')
+router.register(r'revalidacion', PagoRevalidacionViewSet, basename='pago-revalidacion')
 router.register(r'cierres', CierreOperacionViewSet, basename='cierre')
+router.register(r'antiguedad', AntiguedadSaldosViewSet, basename='antiguedad-saldos')
+router.register(r'movimientos-bancarios', MovimientoBancarioViewSet, basename='movimiento-bancario')
+router.register(r'lotes', LotePagoViewSet, basename='lote-pago')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,37 +1,90 @@
+from datetime import date
+from functools import partial
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, OuterRef, Q
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-from .models import Pago, CierreOperacion
+from .models import (
+    Pago, PagoLogistica, PagoRevalidacion, CierreOperacion, MovimientoBancario, LotePago, prefetch_operaciones
+)
 from .serializers import (
     PagoSerializer, PagoCreateSerializer,
-    CierreOperacionSerializer, CierreOperacionCreateSerializer
+    PagoLogisticaSerializer, PagoLogisticaCreateSerializer,
+    PagoRevalidacionSerializer, PagoRevalidacionCreateSerializer,
+    CierreOperacionSerializer, CierreOperacionCreateSerializer, CierreOperacionLoteSerializer,
+    MovimientoBancarioSerializer, LotePagoSerializer
+)
+from .conciliacion import conciliar
+from .lotes import ErrorLote, cancelar_lote, generar_archivo, lineas_lote, preparar_lote
+from .antiguedad import AGRUPACIONES, ORIGENES, antiguedad_saldos, reporte_a_float
+from .registro import registrar_pago
+from .pdf import datos_comprobante, pdf_comprobante, pdfs_comprobantes
+from apps.auditoria.utils import registrar_accion, registrar_acciones, get_client_ip
+from apps.catalogos.tipo_cambio import parsear_fecha
+from apps.core.cache import cache_por_usuario
+from apps.core.exportacion import respuesta_csv
+from apps.core.zip import respuesta_zip, nombres_unicos
+from apps.operaciones.models import (
+    Contenedor, Garantia, OperacionLogistica, OperacionRevalidacion, Ticket
 )
-from apps.auditoria.utils import registrar_accion
 
 
 class PagoViewSet(viewsets.ModelViewSet):
     """
-    API de Pagos.
+    API de Pagos (genérico, relación polimórfica a la operación).
     
     Permisos:
     - Admin: Acceso total
     - Pagos: Puede registrar pagos y ver listado
     - Revalidaciones: Solo lectura
     """
-    queryset = Pago.objects.select_related(
-        'ticket', 'ticket__empresa', 'usuario'
-    ).all()
+    queryset = Pago.objects.select_related('content_type', 'usuario')
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['ticket', 'ticket__empresa', 'usuario']
-    search_fields = ['ticket__comentarios', 'ticket__contenedor', 'referencia']
+    filterset_fields = ['tipo_operacion', 'content_type', 'object_id', 'usuario']
+    search_fields = ['referencia', 'concepto_pago']
     ordering_fields = ['fecha_pago', 'monto', 'fecha_registro']
     ordering = ['-fecha_pago']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.es_admin or (user.es_pagos and not user.puerto_asignado_id):
+            return queryset
+        # Puerto de la operación según su tipo (subconsultas, sin cargar objetos)
+        visibles = Q()
+        for modelo, campo_puerto in (
+            (OperacionLogistica, 'contenedor__puerto'),
+            (OperacionRevalidacion, 'contenedor__puerto'),
+            (Ticket, 'puerto'),
+        ):
+            ids = user.filtrar_por_puerto(modelo.objects.all(), campo_puerto=campo_puerto).values('id')
+            visibles |= Q(content_type=ContentType.objects.get_for_model(modelo), object_id__in=ids)
+        return queryset.filter(visibles)
+
+    def list(self, request, *args, **kwargs):
+        # La operación es una GenericForeignKey: se precarga para la página
+        # completa (una consulta por tipo de operación) antes de serializar
+        queryset = self.filter_queryset(self.get_queryset())
+        pagina = self.paginate_queryset(queryset)
+        pagos = pagina if pagina is not None else list(queryset)
+        prefetch_operaciones(pagos)
+        serializer = self.get_serializer(pagos, many=True)
+        if pagina is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -45,19 +98,8 @@ class PagoViewSet(viewsets.ModelViewSet):
         if not user.puede_registrar_pagos:
             raise PermissionDenied('No tienes permiso para registrar pagos')
         
-        pago = serializer.save(usuario=user)
-        
-        registrar_accion(
-            usuario=user,
-            accion='REGISTRAR_PAGO',
-            descripcion=f'Pago registrado: ${pago.monto:,.2f} para {pago.ticket.comentarios}',
-            modelo='Pago',
-            objeto_id=pago.id,
-            datos_nuevos={
-                'monto': str(pago.monto),
-                'fecha_pago': str(pago.fecha_pago),
-                'dias_retraso': pago.dias_retraso
-            }
+        serializer.instance = registrar_pago(
+            Pago(usuario=user, **serializer.validated_data), user, get_client_ip(self.request)
         )
     
     def perform_update(self, serializer):
@@ -73,6 +115,85 @@ class PagoViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
+class PagoOperacionViewSet(viewsets.ModelViewSet):
+    """
+    Base de los pagos tipados (FK directa a la operación).
+    Cada subclase define queryset (con select_related hasta contenedor y
+    cliente) y serializers. El alta pasa por registro.registrar_pago.
+    """
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    ordering_fields = ['fecha_pago', 'monto', 'fecha_registro']
+    ordering = ['-fecha_pago', '-fecha_registro']
+    serializer_class = None
+    create_serializer_class = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return self.request.user.filtrar_por_puerto(queryset, campo_puerto='operacion__contenedor__puerto')
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return self.create_serializer_class
+        return self.serializer_class
+
+    def validar_permiso_registro(self, serializer):
+        if not self.request.user.puede_registrar_pagos:
+            raise PermissionDenied('No tienes permiso para registrar pagos')
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        self.validar_permiso_registro(serializer)
+
+        modelo = self.create_serializer_class.Meta.model
+        serializer.instance = registrar_pago(
+            modelo(usuario=user, **serializer.validated_data), user, get_client_ip(self.request)
+        )
+
+    def perform_update(self, serializer):
+        if not self.request.user.es_admin:
+            raise PermissionDenied('Solo el administrador puede modificar pagos')
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        if not self.request.user.es_admin:
+            raise PermissionDenied('Solo el administrador puede eliminar pagos')
+        instance.delete()
+
+
+class PagoLogisticaViewSet(PagoOperacionViewSet):
+    """API de pagos de operaciones de logística"""
+    queryset = PagoLogistica.objects.select_related(
+        'operacion', 'operacion__contenedor', 'operacion__contenedor__cliente',
+        'operacion__contenedor__puerto', 'usuario'
+    ).all()
+    serializer_class = PagoLogisticaSerializer
+    create_serializer_class = PagoLogisticaCreateSerializer
+    filterset_fields = ['operacion', 'operacion__contenedor', 'operacion__contenedor__cliente', 'usuario']
+    search_fields = ['referencia_bancaria', 'operacion__comentarios', 'operacion__contenedor__numero']
+
+
+class PagoRevalidacionViewSet(PagoOperacionViewSet):
+    """
+    API de pagos de operaciones de revalidación.
+    Los pagos de demora los registra Revalidaciones (no Pagos).
+    """
+    queryset = PagoRevalidacion.objects.select_related(
+        'operacion', 'operacion__contenedor', 'operacion__contenedor__cliente',
+        'operacion__contenedor__puerto', 'usuario'
+    ).all()
+    serializer_class = PagoRevalidacionSerializer
+    create_serializer_class = PagoRevalidacionCreateSerializer
+    filterset_fields = ['operacion', 'operacion__contenedor', 'operacion__contenedor__cliente', 'tipo_pago', 'usuario']
+    search_fields = ['referencia_bancaria', 'operacion__referencia', 'operacion__bl', 'operacion__contenedor__numero']
+
+    def validar_permiso_registro(self, serializer):
+        # El serializer ya valida puede_pagar_demoras para tipo_pago=demora
+        if serializer.validated_data.get('tipo_pago') == PagoRevalidacion.TipoPago.DEMORA:
+            return
+        super().validar_permiso_registro(serializer)
+
+
 class CierreOperacionViewSet(viewsets.ModelViewSet):
     """
     API de Cierres de Operación.
@@ -80,15 +201,19 @@ class CierreOperacionViewSet(viewsets.ModelViewSet):
     Genera el comprobante PDF al cerrar una operación.
     """
     queryset = CierreOperacion.objects.select_related(
-        'ticket', 'ticket__empresa', 'usuario'
+        'contenedor', 'contenedor__empresa', 'contenedor__cliente', 'usuario'
     ).all()
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['ticket', 'ticket__empresa', 'usuario']
-    search_fields = ['ticket__comentarios', 'ticket__contenedor']
+    filterset_fields = ['contenedor', 'contenedor__empresa', 'contenedor__cliente', 'usuario']
+    search_fields = ['contenedor__numero', 'contenedor__bl_master']
     ordering_fields = ['fecha_cierre', 'monto_final']
     ordering = ['-fecha_cierre']
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return self.request.user.filtrar_por_puerto(queryset, campo_puerto='contenedor__puerto')
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return CierreOperacionCreateSerializer
@@ -102,29 +227,338 @@ class CierreOperacionViewSet(viewsets.ModelViewSet):
         registrar_accion(
             usuario=user,
             accion='CERRAR_OPERACION',
-            descripcion=f'Operación cerrada: {cierre.ticket.comentarios}',
+            descripcion=f'Operación cerrada: {cierre.contenedor.numero}',
             modelo='CierreOperacion',
             objeto_id=cierre.id,
             datos_nuevos={
                 'monto_final': str(cierre.monto_final),
-                'ticket': cierre.ticket.id
+                'contenedor': cierre.contenedor.id
             }
         )
     
+    @action(detail=False, methods=['post'])
+    def cerrar_lote(self, request):
+        """
+        Cierra varios contenedores a la vez (cierre de mes).
+        Body: {"cierres": [{"contenedor": 1, "monto_final": "1500.00", "desglose": {...},
+                            "garantias_verificadas": true, "observaciones": ""}, ...]}
+        Todo o nada: si algún contenedor no se puede cerrar no se cierra ninguno.
+        """
+        user = request.user
+        serializer = CierreOperacionLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = {c['contenedor']: c for c in serializer.validated_data['cierres']}
+
+        # Una sola consulta: acceso por puerto, estatus, cierre previo y garantías sin verificar
+        contenedores = user.filtrar_por_puerto(
+            Contenedor.objects.filter(id__in=datos), campo_puerto='puerto'
+        ).annotate(
+            tiene_cierre=Exists(CierreOperacion.objects.filter(contenedor=OuterRef('pk'))),
+            garantias_depositadas=Exists(
+                Garantia.objects.filter(contenedor=OuterRef('pk'), estatus='depositada')
+            ),
+        ).values_list('id', 'numero', 'estatus', 'tiene_cierre', 'garantias_depositadas')
+
+        numeros = {}
+        errores = {}
+        for contenedor_id, numero, estatus, tiene_cierre, garantias_depositadas in contenedores:
+            numeros[contenedor_id] = numero
+            if estatus == 'completado':
+                errores[contenedor_id] = 'Este contenedor ya está cerrado'
+            elif tiene_cierre:
+                errores[contenedor_id] = 'Este contenedor ya tiene un cierre registrado'
+            elif garantias_depositadas and not datos[contenedor_id]['garantias_verificadas']:
+                errores[contenedor_id] = (
+                    'Hay garantías pendientes de verificar. Debe confirmar que se verificó el EIR.'
+                )
+        for contenedor_id in datos.keys() - numeros.keys():
+            errores[contenedor_id] = 'El contenedor no existe o no tienes acceso a él'
+        if errores:
+            return Response(
+                {'error': 'Hay contenedores que no se pueden cerrar', 'detalle': errores},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            with transaction.atomic():
+                cierres = CierreOperacion.objects.bulk_create([
+                    CierreOperacion(
+                        contenedor_id=contenedor_id,
+                        usuario=user,
+                        monto_final=d['monto_final'],
+                        desglose=d['desglose'],
+                        garantias_verificadas=d['garantias_verificadas'],
+                        observaciones=d['observaciones']
+                    )
+                    for contenedor_id, d in datos.items()
+                ])
+                # bulk_create no llama a save(): la cascada se aplica en conjunto
+                CierreOperacion.aplicar_cascada(list(datos))
+                registrar_acciones(
+                    usuario=user,
+                    accion='CERRAR_OPERACION',
+                    modelo='CierreOperacion',
+                    ip_address=get_client_ip(request),
+                    registros=[
+                        {
+                            'descripcion': f'Operación cerrada (lote): {numeros[c.contenedor_id]}',
+                            'objeto_id': c.id,
+                            'datos_nuevos': {
+                                'monto_final': str(c.monto_final),
+                                'contenedor': c.contenedor_id
+                            }
+                        }
+                        for c in cierres
+                    ]
+                )
+        except IntegrityError:
+            # Otro usuario cerró alguno de estos contenedores al mismo tiempo
+            return Response(
+                {'error': 'Alguno de los contenedores se cerró mientras tanto, intente de nuevo'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response({
+            'cerrados': len(cierres),
+            'cierres': [
+                {'id': c.id, 'contenedor': c.contenedor_id, 'contenedor_numero': numeros[c.contenedor_id]}
+                for c in cierres
+            ]
+        }, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['get'])
     def datos_comprobante(self, request, pk=None):
         """Obtener datos formateados para generar el comprobante PDF"""
         cierre = self.get_object()
-        ticket = cierre.ticket
+        return Response(datos_comprobante(cierre))
+    
+    @action(detail=True, methods=['get'])
+    def comprobante(self, request, pk=None):
+        """Comprobante PDF generado en el servidor (cacheado por hash de los datos)"""
+        cierre = self.get_object()
+        ruta = pdf_comprobante(cierre)
+        return FileResponse(
+            default_storage.open(ruta, 'rb'),
+            content_type='application/pdf',
+            filename=f'Cierre_{cierre.contenedor.numero}.pdf'
+        )
+    
+    @action(detail=False, methods=['get'])
+    def comprobantes_zip(self, request):
+        """
+        Comprobantes de varios cierres en un ZIP (p. ej. cierre de mes).
         
-        return Response({
-            'empresa': ticket.empresa.nombre if ticket.empresa else '',
-            'bl': ticket.bl_master,
-            'contenedor': ticket.contenedor,
-            'comentarios': ticket.comentarios,
-            'fecha_cierre': cierre.fecha_cierre.strftime('%d/%m/%Y'),
-            'monto_final': float(cierre.monto_final),
-            'divisa': ticket.divisa,
-            'desglose': cierre.desglose,
-            'observaciones': cierre.observaciones
-        })
+        Query params: ?ids=1,2,3 o ?desde=aaaa-mm-dd&hasta=aaaa-mm-dd
+        (acepta además los filtros normales del listado).
+        Los PDFs faltantes se generan en paralelo; los demás salen de la caché.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        ids = request.query_params.get('ids')
+        desde = request.query_params.get('desde')
+        hasta = request.query_params.get('hasta')
+        if not (ids or desde or hasta):
+            return Response(
+                {'error': 'Debe indicar ids o un rango de fechas (desde/hasta)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            if ids:
+                queryset = queryset.filter(id__in=[int(i) for i in ids.split(',') if i.strip()])
+            if desde:
+                queryset = queryset.filter(fecha_cierre__date__gte=parsear_fecha(desde))
+            if hasta:
+                queryset = queryset.filter(fecha_cierre__date__lte=parsear_fecha(hasta))
+        except ValueError:
+            return Response(
+                {'error': 'Parámetros inválidos: ids numéricos y fechas dd/mm/aaaa o aaaa-mm-dd'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        cierres = list(queryset)
+        if not cierres:
+            return Response(
+                {'error': 'No hay cierres para los criterios indicados'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        rutas = pdfs_comprobantes(cierres)
+        nombres = nombres_unicos(f'Cierre_{c.contenedor.numero}.pdf' for c in cierres)
+        archivos = (
+            (nombre, partial(default_storage.open, rutas[c.id], 'rb'))
+            for nombre, c in zip(nombres, cierres)
+        )
+        return respuesta_zip(f'comprobantes_cierre_{date.today():%Y%m%d}.zip', archivos)
+
+
+class AntiguedadSaldosViewSet(viewsets.ViewSet):
+    """
+    Antigüedad de saldos por pagar (tickets, logística y revalidación
+    pendientes o en proceso) en rangos 0-7, 8-15, 16-30 y 30+ días.
+
+    Parámetros: ?agrupar=empresa|proveedor|naviera (default empresa),
+    ?origenes=tickets,logistica,revalidacion y ?fecha= de corte (default hoy).
+    Solo Admin y Pagos.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def _parametros(self, request):
+        if not request.user.puede_registrar_pagos:
+            raise PermissionDenied('No tienes permiso para ver la antigüedad de saldos')
+        agrupar = request.query_params.get('agrupar', 'empresa')
+        if agrupar not in AGRUPACIONES:
+            raise ValidationError({'agrupar': f'Opciones: {", ".join(AGRUPACIONES)}'})
+        origenes = request.query_params.get('origenes')
+        origenes = [o.strip() for o in origenes.split(',') if o.strip()] if origenes else list(ORIGENES)
+        invalidos = set(origenes) - ORIGENES.keys()
+        if invalidos:
+            raise ValidationError({'origenes': f'Opciones: {", ".join(ORIGENES)}'})
+        try:
+            fecha = parsear_fecha(request.query_params['fecha']) if request.query_params.get('fecha') else None
+        except ValueError as e:
+            raise ValidationError({'fecha': str(e)})
+
+        querysets = {}
+        for origen in origenes:
+            modelo, _, campo_puerto, _ = ORIGENES[origen]
+            querysets[origen] = request.user.filtrar_por_puerto(modelo.objects.all(), campo_puerto=campo_puerto)
+        return querysets, agrupar, fecha
+
+    @cache_por_usuario('tickets', 'logistica', 'revalidaciones', 'catalogos')
+    def list(self, request):
+        querysets, agrupar, fecha = self._parametros(request)
+        return Response(reporte_a_float(antiguedad_saldos(querysets, agrupar, fecha)))
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """CSV con una fila por grupo y divisa"""
+        querysets, agrupar, fecha = self._parametros(request)
+        reporte = antiguedad_saldos(querysets, agrupar, fecha)
+        encabezados = [agrupar.capitalize(), 'Divisa', 'Cantidad', *reporte['rangos'], 'Total']
+        filas = (
+            [
+                f['nombre'], f['divisa'], f['cantidad'],
+                *(f'{f[r]:.2f}' for r in reporte['rangos']), f"{f['total']:.2f}"
+            ]
+            for f in reporte['filas']
+        )
+        return respuesta_csv(f'antiguedad_saldos_{reporte["fecha_corte"]:%Y%m%d}.csv', encabezados, filas)
+
+
+class MovimientoBancarioViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Movimientos de los estados de cuenta importados (comando
+    importar_estado_cuenta) y su conciliación. Filtrar ?estatus=ambiguo o
+    sin_coincidencia para revisar a mano. Solo Admin y Pagos.
+    """
+    queryset = MovimientoBancario.objects.select_related('estado_cuenta', 'content_type').all()
+    serializer_class = MovimientoBancarioSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_fields = ['estado_cuenta', 'estatus', 'fecha']
+    search_fields = ['referencia', 'descripcion']
+    ordering_fields = ['fecha', 'monto']
+    ordering = ['fecha', 'id']
+
+    def get_queryset(self):
+        if not self.request.user.puede_registrar_pagos:
+            raise PermissionDenied('No tienes permiso para ver la conciliación bancaria')
+        return super().get_queryset()
+
+    @action(detail=False, methods=['post'])
+    def conciliar(self, request):
+        """Reintenta la conciliación de los movimientos no conciliados (?estado_cuenta= opcional)"""
+        resumen = conciliar(self.filter_queryset(self.get_queryset()))
+        registrar_accion(
+            usuario=request.user,
+            accion='CONCILIAR_MOVIMIENTOS',
+            descripcion=f"Conciliación bancaria: {resumen['conciliados']} conciliados",
+            modelo='MovimientoBancario',
+            datos_nuevos=resumen,
+            ip_address=get_client_ip(request)
+        )
+        return Response(resumen)
+
+
+class LotePagoViewSet(viewsets.ViewSet):
+    """
+    Archivo de pago masivo para el banco.
+
+    POST {logistica: [ids], revalidacion: [ids], layout} marca las
+    operaciones en proceso de pago, guarda el lote y devuelve el archivo con
+    una línea por beneficiario y divisa. Si alguna operación no se puede
+    incluir no se marca ninguna (400 con el motivo por operación).
+    GET  /lotes/{referencia}/archivo/?layout= regenera el archivo del lote.
+    POST /lotes/{referencia}/cancelar/ regresa las operaciones a pendiente.
+    Solo Admin y Pagos; con puerto asignado, solo los lotes propios.
+    """
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'referencia'
+
+    def _verificar_permiso(self, request):
+        if not request.user.puede_registrar_pagos:
+            raise PermissionDenied('No tienes permiso para generar lotes de pago')
+
+    def _lote(self, request, referencia):
+        self._verificar_permiso(request)
+        lotes = LotePago.objects.all()
+        user = request.user
+        if not (user.es_admin or (user.es_pagos and not user.puerto_asignado_id)):
+            lotes = lotes.filter(usuario=user)
+        return get_object_or_404(lotes, referencia=referencia)
+
+    def _archivo(self, lote, nombre_layout):
+        layout = settings.LAYOUTS_PAGO_MASIVO[nombre_layout]
+        response = StreamingHttpResponse(
+            generar_archivo(lineas_lote(lote), layout),
+            content_type='text/csv; charset=utf-8' if layout['tipo'] == 'csv' else 'text/plain; charset=ascii'
+        )
+        response['Content-Disposition'] = f'attachment; filename="lote_pago_{lote.referencia}.{layout["extension"]}"'
+        response['X-Lote-Referencia'] = lote.referencia
+        return response
+
+    def create(self, request):
+        self._verificar_permiso(request)
+        serializer = LotePagoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+        try:
+            lote = preparar_lote(request.user, datos, datos['layout'], get_client_ip(request))
+        except ErrorLote as e:
+            return Response({'error': str(e), 'detalle': e.detalle}, status=status.HTTP_400_BAD_REQUEST)
+        return self._archivo(lote, datos['layout'])
+
+    @action(detail=True, methods=['get'])
+    def archivo(self, request, referencia=None):
+        """Regenera el archivo de un lote guardado (?layout=, default: el original)"""
+        lote = self._lote(request, referencia)
+        nombre_layout = request.query_params.get('layout') or lote.layout
+        if nombre_layout not in settings.LAYOUTS_PAGO_MASIVO:
+            return Response({'error': f'Layout no válido: {nombre_layout}'}, status=status.HTTP_400_BAD_REQUEST)
+        if lote.estatus == LotePago.Estatus.CANCELADO:
+            return Response({'error': f'El lote {lote.referencia} está cancelado'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._archivo(lote, nombre_layout)
+
+    @action(detail=True, methods=['post'])
+    def cancelar(self, request, referencia=None):
+        """Cancela el lote; sus operaciones en proceso vuelven a pendiente"""
+        lote = self._lote(request, referencia)
+        try:
+            total = cancelar_lote(request.user, lote, get_client_ip(request))
+        except ErrorLote as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'referencia': lote.referencia, 'operaciones_pendientes': total})
+
+    @action(detail=False, methods=['get'])
+    def layouts(self, request):
+        """Layouts disponibles y sus campos"""
+        self._verificar_permiso(request)
+        return Response([
+            {
+                'nombre': nombre,
+                'tipo': layout['tipo'],
+                'campos': [c if isinstance(c, str) else c[0] for c in layout['campos']],
+            }
+            for nombre, layout in settings.LAYOUTS_PAGO_MASIVO.items()
+        ])
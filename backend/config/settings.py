@@ -31,6 +31,9 @@ INSTALLED_APPS = [
     'apps.pagos',
     'apps.cotizaciones',
     'apps.auditoria',
+    'apps.archivos',
+    'apps.eventos',
+    'apps.core',
 ]
 
 MIDDLEWARE = [
@@ -70,6 +73,37 @@ DATABASES = {
     'default': dj_database_url.parse(DATABASE_URL)
 }
 
+# Caché
+# Por defecto memoria local del proceso. Con REDIS_URL se usa Redis o cualquier
+# servidor compatible (p. ej. un redis-server local para pruebas); requiere el
+# paquete `redis`.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bmm-cache',
+        }
+    }
+
+# Segundos que vive una respuesta cacheada (dashboards, catálogos)
+CACHE_TIMEOUT_VISTAS = int(os.environ.get('CACHE_TIMEOUT_VISTAS', 300))
+
+# Tipo de cambio USD/MXN
+# Proveedor del comando actualizar_tipo_cambio: 'banxico', 'csv' o 'fijo'
+TIPO_CAMBIO_PROVEEDOR = os.environ.get('TIPO_CAMBIO_PROVEEDOR', 'banxico')
+BANXICO_TOKEN = os.environ.get('BANXICO_TOKEN', '')
+# Valor de respaldo si aún no hay histórico
+TIPO_CAMBIO_DEFAULT = os.environ.get('TIPO_CAMBIO_DEFAULT', '17.50')
+TIPO_CAMBIO_CACHE_SEGUNDOS = 3600
+
 # Modelo de usuario personalizado
 AUTH_USER_MODEL = 'usuarios.Usuario'
 
@@ -95,6 +129,76 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Procesos para generar PDFs en lote (cotizaciones, comprobantes)
+PDF_PROCESOS = int(os.environ.get('PDF_PROCESOS', os.cpu_count() or 2))
+
+# Cargas en partes (apps.archivos). Las partes se guardan fuera de MEDIA_ROOT;
+# conviene que esté en el mismo disco para que el archivo final se mueva sin copiarse.
+CARGAS_DIRECTORIO = os.environ.get('CARGAS_DIRECTORIO', str(BASE_DIR / 'cargas_tmp'))
+CARGA_TAMANO_MAXIMO = int(os.environ.get('CARGA_TAMANO_MAXIMO', 500 * 1024 * 1024))
+CARGA_TAMANO_PARTE = 5 * 1024 * 1024
+CARGA_TAMANO_PARTE_MINIMO = 256 * 1024
+CARGA_TAMANO_PARTE_MAXIMO = 32 * 1024 * 1024
+CARGA_EXPIRACION_HORAS = 48
+
+# Almacenamiento por contenido (apps.archivos.almacenamiento): subdirectorio de
+# MEDIA_ROOT y horas que un blob sin referencias se conserva antes de purgarse.
+ALMACENAMIENTO_CONTENIDO_DIRECTORIO = 'cas'
+ALMACENAMIENTO_CONTENIDO_GRACIA_HORAS = 24
+
+# Descarga protegida de media (apps.archivos.descargas). Con nginx:
+#   MEDIA_ENVIO=x-accel y
+#   location /media-protegida/ { internal; alias /ruta/a/MEDIA_ROOT/; }
+# Con Apache mod_xsendfile: MEDIA_ENVIO=x-sendfile. Vacío: Django sirve el archivo.
+MEDIA_ENVIO = os.environ.get('MEDIA_ENVIO', '')
+MEDIA_INTERNA_URL = os.environ.get('MEDIA_INTERNA_URL', '/media-protegida/')
+
+# Hilos para generar miniaturas/vistas previas de imágenes (apps.archivos.previews)
+PREVIEWS_HILOS = int(os.environ.get('PREVIEWS_HILOS', 2))
+
+# Stream SSE de cambios (apps.eventos). Cada conexión ocupa un hilo/worker:
+# se cierra tras EVENTOS_DURACION_SEGUNDOS y el navegador se reconecta.
+EVENTOS_LATIDO_SEGUNDOS = 20
+EVENTOS_DURACION_SEGUNDOS = int(os.environ.get('EVENTOS_DURACION_SEGUNDOS', 300))
+EVENTOS_REINTENTO_MS = 3000
+# Vigencia del token de ?token= para abrir el stream (POST /api/eventos/token/)
+EVENTOS_TOKEN_SEGUNDOS = int(os.environ.get('EVENTOS_TOKEN_SEGUNDOS', 60))
+
+# Layouts del archivo de pago masivo (apps.pagos.lotes). Campos disponibles:
+# beneficiario, banco, cuenta, clabe, aba_swift, moneda, importe (1234.50),
+# importe_centavos (123450), referencia, concepto, operaciones.
+# csv: lista de campos. ancho_fijo: (campo, ancho, 'izq'|'der', relleno);
+# el texto se pasa a ASCII en mayúsculas y se corta al ancho.
+LAYOUTS_PAGO_MASIVO = {
+    'csv': {
+        'tipo': 'csv',
+        'separador': ',',
+        'encabezado': True,
+        'extension': 'csv',
+        'campos': ['clabe', 'cuenta', 'aba_swift', 'beneficiario', 'banco', 'moneda',
+                   'importe', 'referencia', 'concepto', 'operaciones'],
+    },
+    'ancho_fijo': {
+        'tipo': 'ancho_fijo',
+        'extension': 'txt',
+        'campos': [
+            ('clabe', 18, 'izq', ' '),
+            ('cuenta', 20, 'izq', ' '),
+            ('importe_centavos', 15, 'der', '0'),
+            ('moneda', 3, 'izq', ' '),
+            ('beneficiario', 40, 'izq', ' '),
+            ('referencia', 15, 'izq', ' '),
+            ('concepto', 30, 'izq', ' '),
+        ],
+    },
+}
+
+# Comandos que ejecuta `manage.py tareas_nocturnas` (una sola entrada en cron)
+TAREAS_NOCTURNAS = [
+    'recalcular_semaforos',
+    'calcular_demoras',
+]
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Configuración de Django REST Framework
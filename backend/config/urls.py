@@ -18,6 +18,8 @@ urlpatterns = [
     path('api/pagos/', include('apps.pagos.urls')),
     path('api/cotizaciones/', include('apps.cotizaciones.urls')),
     path('api/auditoria/', include('apps.auditoria.urls')),
+    path('api/archivos/', include('apps.archivos.urls')),
+    path('api/eventos/', include('apps.eventos.urls')),
 ]
 
 if settings.DEBUG: